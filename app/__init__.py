@@ -1,10 +1,12 @@
 import os
+import logging
 from flask import Flask
 from dotenv import load_dotenv
 
 load_dotenv()
 
 def create_app():
+    logging.basicConfig(level=logging.INFO)
     app = Flask(__name__)
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev')
     app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, '..', 'uploads')
@@ -0,0 +1,166 @@
+import os
+import time
+import hashlib
+import logging
+from .resume_utils import check_ats_compatibility
+from .document_store import load_document, discard
+from .vector_store import get_vector_store
+from .prompt_builder import build_feedback_prompt
+from .metrics import span
+from .coverage import coverage_map
+from .jd_catalog import get_catalog
+from .similarity_engine import get_embeddings, compute_cosine_similarity, extract_skills, top_missing_skills, section_similarities
+
+logger = logging.getLogger(__name__)
+
+# Keep every analyzed resume's embedding for reverse search (/api/search)
+RESUME_INDEX = os.getenv('RESUME_INDEX', '1') == '1'
+
+
+def run_analysis(resume_text, job_text, layout=None, job_profile=None):
+    """Fit score, section scores, skill match, requirement coverage and ATS report for one resume/JD pair.
+
+    layout is the resume's PDF layout summary (pdf_engine), if it was a PDF.
+    job_profile is the JD's catalog profile (jd_catalog); its precomputed embedding,
+    skills and requirements are used instead of processing job_text again.
+    Every stage falls back to a neutral value on error; per-stage timings (seconds)
+    are returned under 'timings'.
+    """
+    timings = {}
+
+    with span('embed', timings):
+        try:
+            resume_emb = get_embeddings(resume_text)
+            job_emb = job_profile['embedding'] if job_profile else get_embeddings(job_text)
+            fit_score = int(compute_cosine_similarity(resume_emb, job_emb) * 100)
+            fit_score = max(0, min(100, fit_score))
+            section_scores = section_similarities(resume_text, job_emb)
+        except Exception as e:
+            logger.error(f"Error in similarity computation: {e}")
+            fit_score = 50  # Default neutral score
+            section_scores = []
+
+    with span('skills', timings):
+        try:
+            jd_skills = set(job_profile['skills'] if job_profile else extract_skills(job_text))
+            resume_skills = set(extract_skills(resume_text))
+            matched_skills = list(resume_skills & jd_skills)
+        except Exception as e:
+            logger.error(f"Error in skills extraction: {e}")
+            jd_skills, resume_skills = set(), set()
+            matched_skills = []
+
+    try:
+        coverage = coverage_map(resume_text, job_text, resume_skills, timings, requirements=job_profile)
+        weights = coverage.pop('skill_weights')
+    except Exception as e:
+        logger.error(f"Error in requirement coverage: {e}")
+        coverage, weights = None, {}
+    # Missing skills ranked by how much of the JD asks for them
+    missing_skills = top_missing_skills(jd_skills, resume_skills, limit=10, weights=weights)
+
+    with span('ats', timings):
+        ats_report = check_ats_compatibility(resume_text, job_text, matched_skills, layout=layout,
+                                             job_vocabulary=job_profile and job_profile['ats_vocabulary'])
+
+    return {
+        'fit_score': fit_score,
+        'section_scores': section_scores,
+        'matched_skills': matched_skills,
+        'missing_skills': missing_skills,
+        'coverage': coverage,
+        'ats_report': ats_report,
+        'layout': layout,
+        'timings': {k: round(v, 4) for k, v in timings.items()},
+    }
+
+
+def analyze_documents(resume_doc, job_doc=None, role_id=None):
+    """Load both stored documents, analyze them and discard them from the document store.
+
+    With role_id the job description is that role's catalog profile instead of job_doc.
+    The extracted texts and the token-budgeted feedback prompt are returned with the
+    analysis so feedback can be generated from them.
+    """
+    timings = {}
+    job_profile = None
+    with span('parse', timings):
+        resume_text, layout = load_document(resume_doc)
+        if role_id:
+            job_profile = get_catalog().get(role_id)
+            job_text = job_profile['text'] if job_profile else None
+        else:
+            job_text, _ = load_document(job_doc)
+    if role_id and job_profile is None:
+        discard(resume_doc)
+        raise ValueError(f'Unknown role {role_id}')
+    if resume_text is None or job_text is None:
+        raise ValueError('Uploaded documents expired before they could be analyzed')
+    result = run_analysis(resume_text, job_text, layout=layout, job_profile=job_profile)
+    if RESUME_INDEX:
+        with span('index', timings):
+            try:
+                result['resume_id'] = index_resume(resume_text)
+            except Exception as e:
+                logger.error(f"Could not index resume: {e}")
+    with span('cleanup', timings):
+        discard(resume_doc)
+        if job_doc:
+            discard(job_doc)
+    result['resume_text'] = resume_text
+    result['job_text'] = job_text
+    # Condensing long documents needs the encoder, which is loaded here and not in the web process
+    with span('prompt', timings):
+        try:
+            result['feedback_prompt'] = build_feedback_prompt(resume_text, job_text)
+        except Exception as e:
+            logger.error(f"Could not build feedback prompt: {e}")
+    result['timings'].update((k, round(v, 4)) for k, v in timings.items())
+    return result
+
+
+def index_resume(resume_text):
+    """Add a resume to the vector store (once per distinct text); returns its id, or None if it could not be embedded"""
+    store = get_vector_store()
+    resume_id = hashlib.sha1(resume_text.encode('utf-8')).hexdigest()[:16]
+    existing = store.get(resume_id)
+    # An all-zero vector is the encoder's failure fallback: never store one, and replace any stored earlier
+    if existing is None or not existing[0].any():
+        embedding = get_embeddings(resume_text)
+        if not embedding.any():
+            logger.warning(f"Resume {resume_id} not indexed: the encoder returned no embedding")
+            return None
+        meta = {'snippet': resume_text[:200], 'added_at': time.time()}
+        store.add([resume_id], embedding[None, :], [meta])
+    return resume_id
+
+
+def search_resumes(job_text, k=10, exact=False):
+    """Stored resumes ranked by similarity to a job description"""
+    timings = {}
+    with span('search_embed', timings):
+        job_emb = get_embeddings(job_text)
+    with span('search', timings):
+        results = get_vector_store().search(job_emb, k=k, exact=exact)
+    return {
+        'results': results,
+        'count': len(results),
+        'timings': {'embed': round(timings['search_embed'], 4), 'search': round(timings['search'], 4)},
+    }
+
+
+def match_roles(resume_doc, k=10):
+    """Catalog roles ranked for a stored resume (discarded afterwards)"""
+    timings = {}
+    with span('parse', timings):
+        resume_text, _ = load_document(resume_doc)
+    discard(resume_doc)
+    if resume_text is None:
+        raise ValueError('Uploaded resume expired before it could be matched')
+    with span('match', timings):
+        results = get_catalog().match(resume_text, k=k)
+    return {
+        'results': results,
+        'count': len(results),
+        'timings': {name: round(seconds, 4) for name, seconds in timings.items()},
+    }
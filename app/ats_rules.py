@@ -0,0 +1,252 @@
+"""Data-driven ATS rule engine.
+
+Rules are plain dicts (see resume_utils.ATS_RULES for the built-in pack):
+
+    {
+        "name": "Section Headers",
+        "description": "Shown in the report",
+        "suggestion": "Shown when the rule fails",
+        "keywords": ["experience", "education"],   # whole words, and/or
+        "patterns": ["\\|\\t"],                      # regular expressions
+        "min_matches": 3,       # pass with at least this many (distinct) matches
+        "max_matches": 0,       # or: pass with at most this many matches
+        "distinct": true,       # count distinct matched text instead of occurrences
+        "region": "edges",      # only count matches in the first/last EDGE_LINES lines
+        "check": "no_tables",   # optional named check (see CHECKS) for non-textual logic
+        "weight": 1.0
+    }
+
+Every rule is compiled once, however many are loaded: all keywords go into one
+token-level Aho-Corasick automaton (skill_matcher.SkillMatcher) and all regex
+patterns into one alternation with a named group per rule. A document is
+therefore scanned twice in total, not once per rule. Keyword matching works on
+whole tokens and pattern matching is case-insensitive with leftmost,
+non-overlapping matches. Extra rule packs (JSON files holding a list of rules,
+or {"rules": [...]}) are listed in ATS_RULE_PACKS, separated by os.pathsep. A
+rule with an existing name replaces it, and "enabled": false removes it. Rules
+are validated when the engine is built (the fields each check needs, regex
+syntax), so a broken pack fails with a ValueError at load, not while scoring.
+"""
+import os
+import re
+import json
+import logging
+import functools
+from .skill_matcher import SkillMatcher
+
+logger = logging.getLogger(__name__)
+
+ATS_RULE_PACKS = os.getenv('ATS_RULE_PACKS', '')
+EDGE_LINES = 5
+MAX_EVIDENCE = 5
+EVIDENCE_CHARS = 60
+
+CHECKS = {}
+# Rule fields each named check reads, validated when an engine is built
+CHECK_FIELDS = {}
+REGIONS = (None, 'edges')
+
+
+def register_check(name, requires=()):
+    """Register fn(rule, hits, context) -> (passed, score) under name for rules with "check": name.
+
+    requires lists the rule fields the check needs.
+    """
+    def decorator(fn):
+        CHECKS[name] = fn
+        CHECK_FIELDS[name] = tuple(requires)
+        return fn
+    return decorator
+
+
+def validate_rule(rule):
+    """Raise ValueError if the rule lacks a field its check needs or is otherwise unusable"""
+    if not rule.get('name'):
+        raise ValueError(f"ATS rule without a name: {rule!r}")
+    name, check = rule['name'], rule.get('check')
+    if check:
+        if check not in CHECKS:
+            raise ValueError(f"Unknown ATS check {check!r} in rule {name!r}")
+        missing = [field for field in CHECK_FIELDS[check] if not rule.get(field)]
+        if missing:
+            raise ValueError(f"ATS rule {name!r} uses check {check!r}, which needs {', '.join(missing)}")
+    elif not rule.get('keywords') and not rule.get('patterns'):
+        raise ValueError(f"ATS rule {name!r} needs keywords, patterns or a check")
+    if rule.get('region') not in REGIONS:
+        raise ValueError(f"ATS rule {name!r} has unknown region {rule['region']!r}")
+    for field in ('min_matches', 'max_matches', 'weight'):
+        if field in rule and not isinstance(rule[field], (int, float)):
+            raise ValueError(f"ATS rule {name!r}: {field} must be a number")
+    for pattern in rule.get('patterns') or ():
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"ATS rule {name!r} has an invalid pattern {pattern!r}: {e}") from None
+
+
+def load_rule_pack(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return data['rules'] if isinstance(data, dict) else data
+
+
+def merge_rules(base, packs):
+    """base rules overridden/extended by each pack in order"""
+    rules = {rule['name']: rule for rule in base}
+    for pack in packs:
+        for rule in pack:
+            # A rule without a name is kept, so RuleEngine can reject it with a clear error
+            if rule.get('enabled', True):
+                rules[rule.get('name')] = rule
+            else:
+                rules.pop(rule.get('name'), None)
+    return list(rules.values())
+
+
+@functools.lru_cache(maxsize=32)
+def unique_word_count(text):
+    return len(set(text.lower().split()))
+
+
+def _edge_bounds(text):
+    """(end of the first EDGE_LINES lines, start of the last EDGE_LINES lines)"""
+    top_end = -1
+    for _ in range(EDGE_LINES):
+        top_end = text.find('\n', top_end + 1)
+        if top_end == -1:
+            return len(text), 0
+    bottom_start = len(text)
+    for _ in range(EDGE_LINES):
+        bottom_start = text.rfind('\n', 0, bottom_start)
+        if bottom_start == -1:
+            return len(text), 0
+    return top_end, bottom_start
+
+
+class RuleEngine:
+    """Compiled rule set; evaluate() scans a document once per matcher kind and scores every rule"""
+
+    def __init__(self, rules):
+        self.rules = [dict(rule) for rule in rules]
+        parts = []
+        self._groups = {}
+        self._keyword_rules = {}
+        for i, rule in enumerate(self.rules):
+            validate_rule(rule)
+            if rule.get('patterns'):
+                pattern = '|'.join(f'(?:{p})' for p in rule['patterns'])
+                self._groups[f'r{i}'] = rule['name']
+                parts.append(f'(?P<r{i}>{pattern})')
+                rule['_pattern'] = re.compile(pattern, re.IGNORECASE)
+            for keyword in rule.get('keywords') or ():
+                self._keyword_rules.setdefault(keyword.lower(), []).append(rule['name'])
+        self._scanner = re.compile('|'.join(parts), re.IGNORECASE) if parts else None
+        self._matcher = SkillMatcher({k: k for k in self._keyword_rules}) if self._keyword_rules else None
+
+    def scan(self, text):
+        """{rule name: [(start, end, matched text), ...]}: one automaton pass plus one regex pass"""
+        hits = {rule['name']: [] for rule in self.rules}
+        if self._matcher is not None:
+            for start, end, keyword in self._matcher.finditer(text):
+                for name in self._keyword_rules[keyword]:
+                    hits[name].append((start, end, text[start:end]))
+        if self._scanner is not None:
+            for m in self._scanner.finditer(text):
+                hits[self._groups[m.lastgroup]].append((m.start(), m.end(), m.group()))
+        return hits
+
+    def evaluate(self, text, **context):
+        """Score every rule against text; context is passed to named checks (job_text, job_vocabulary, matched_skills, layout)"""
+        context['text'] = text
+        hits = self.scan(text)
+        bounds = None
+        results = {}
+        issues, suggestions = [], []
+        total = weights = 0.0
+        for rule in self.rules:
+            rule_hits = hits[rule['name']]
+            if rule.get('region') == 'edges':
+                bounds = bounds or _edge_bounds(text)
+                rule_hits = [h for h in rule_hits if h[0] < bounds[0] or h[1] > bounds[1]]
+            if rule.get('check'):
+                passed, score = CHECKS[rule['check']](rule, rule_hits, context)
+            else:
+                passed, score = count_check(rule, rule_hits)
+            results[rule['name']] = {
+                'passed': passed,
+                'score': round(score, 3),
+                'evidence': [
+                    {'start': s, 'end': e, 'text': t[:EVIDENCE_CHARS]} for s, e, t in rule_hits[:MAX_EVIDENCE]
+                ],
+            }
+            if not passed:
+                issues.append(rule['name'])
+                if rule.get('suggestion'):
+                    suggestions.append(rule['suggestion'])
+            weight = rule.get('weight', 1.0)
+            total += weight * score
+            weights += weight
+        return {
+            'criteria': [(rule['name'], rule.get('description', '')) for rule in self.rules],
+            'issues': issues,
+            'suggestions': suggestions,
+            'score': int(round(100 * total / weights)) if weights else 100,
+            'rules': results,
+        }
+
+
+def count_check(rule, hits):
+    """Default check: compare the number of (distinct) matches with min_matches / max_matches"""
+    count = len({t.lower() for _, _, t in hits}) if rule.get('distinct') else len(hits)
+    if 'max_matches' in rule:
+        passed = count <= rule['max_matches']
+        return passed, 1.0 if passed else 0.0
+    minimum = rule.get('min_matches', 1)
+    return count >= minimum, min(1.0, count / minimum) if minimum else 1.0
+
+
+@register_check('keyword_density')
+def keyword_density_check(rule, hits, context):
+    """Matched skills relative to the job description's distinct words"""
+    vocabulary = context.get('job_vocabulary') or unique_word_count(context.get('job_text') or '')
+    if not vocabulary:
+        return True, 1.0
+    ratio = len(context.get('matched_skills') or []) / vocabulary
+    minimum = rule.get('min_ratio', 0.5)
+    return ratio >= minimum, min(1.0, ratio / minimum)
+
+
+@register_check('no_tables')
+def no_tables_check(rule, hits, context):
+    """PDF layout data when available, otherwise the rule's text patterns"""
+    layout = context.get('layout')
+    if layout:
+        passed = layout['table_pages'] == 0 and layout['multi_column_pages'] == 0
+        return passed, 1.0 if passed else 0.0
+    return count_check(rule, hits)
+
+
+@register_check('contact_in_body', requires=('patterns',))
+def contact_in_body_check(rule, hits, context):
+    """With PDF layout: some contact detail must sit outside the header/footer bands"""
+    layout = context.get('layout')
+    if layout:
+        margins = layout['header_text'] + ' ' + layout['footer_text']
+        in_margins = len(rule['_pattern'].findall(margins))
+        passed = len(rule['_pattern'].findall(context['text'])) > in_margins
+        return passed, 1.0 if passed else 0.0
+    return count_check(rule, hits)
+
+
+_engines = {}
+
+
+def get_engine(base_rules, packs=ATS_RULE_PACKS):
+    """Compiled engine for base_rules plus the configured rule packs (built once per process)"""
+    key = (id(base_rules), packs)
+    if key not in _engines:
+        paths = [p for p in packs.split(os.pathsep) if p]
+        rules = merge_rules(base_rules, [load_rule_pack(p) for p in paths])
+        _engines[key] = RuleEngine(rules)
+        logger.info(f"Compiled {len(rules)} ATS rules ({len(paths)} rule packs)")
+    return _engines[key]
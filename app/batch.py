@@ -0,0 +1,215 @@
+"""Batch scoring: rank a pool of resumes against one job description.
+
+Usage:
+    python -m app.batch --job jd.pdf --resumes resumes/ --out ranking.csv
+    python -m app.batch --job jd.txt --resumes applicants.zip --format jsonl
+"""
+import io
+import os
+import csv
+import sys
+import json
+import time
+import zipfile
+import argparse
+import logging
+from .resume_utils import extract_text_from_pdf, clean_text
+from .document_store import load_text, discard
+from .metrics import span
+from .coverage import skill_weights
+from .similarity_engine import get_embeddings, get_embeddings_batch, cosine_similarity_matrix, extract_skills, extract_skills_batch, top_missing_skills
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt', '.md')
+REPORT_FIELDS = ['rank', 'name', 'fit_score', 'matched_skills', 'missing_skills']
+# Limits for one uploaded pool (/api/batch); zip limits are checked from the archive directory, before decompressing
+MAX_BATCH_RESUMES = int(os.getenv('MAX_BATCH_RESUMES', '500'))
+MAX_BATCH_BYTES = int(os.getenv('MAX_BATCH_BYTES', str(100 * 1024 * 1024)))
+
+
+class BatchTooLarge(ValueError):
+    pass
+
+
+def _text_from_bytes(name, data):
+    if name.lower().endswith('.pdf'):
+        return clean_text(extract_text_from_pdf(io.BytesIO(data)))
+    return clean_text(data.decode('utf-8', errors='ignore'))
+
+
+def _load_jsonl(lines):
+    resumes = []
+    for n, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='ignore')
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        name = record.get('name') or record.get('id') or f'resume_{n}'
+        resumes.append((str(name), clean_text(record.get('text', ''))))
+    return resumes
+
+
+def _load_zip(fileobj):
+    resumes = []
+    with zipfile.ZipFile(fileobj) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            resumes.append((os.path.basename(info.filename), _text_from_bytes(info.filename, zf.read(info))))
+    return resumes
+
+
+def load_resumes(source, filename=None):
+    """Load (name, text) pairs from a directory path, a .zip or a .jsonl (path or file object)"""
+    if isinstance(source, str) and os.path.isdir(source):
+        resumes = []
+        for entry in sorted(os.listdir(source)):
+            path = os.path.join(source, entry)
+            if os.path.isfile(path) and entry.lower().endswith(SUPPORTED_EXTENSIONS):
+                with open(path, 'rb') as f:
+                    resumes.append((entry, _text_from_bytes(entry, f.read())))
+        return resumes
+    name = (filename or (source if isinstance(source, str) else '')).lower()
+    if name.endswith('.jsonl'):
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                return _load_jsonl(f)
+        return _load_jsonl(source)
+    if name.endswith('.zip'):
+        return _load_zip(source)
+    raise ValueError('Resumes must be a directory, a .zip archive or a .jsonl file')
+
+
+def _check_pool_size(count, size):
+    if count > MAX_BATCH_RESUMES:
+        raise BatchTooLarge(f'At most {MAX_BATCH_RESUMES} resumes per batch (got {count})')
+    if size > MAX_BATCH_BYTES:
+        raise BatchTooLarge(f'Resumes may total at most {MAX_BATCH_BYTES // (1024 * 1024)} MB uncompressed')
+
+
+def read_pool(fileobj, filename):
+    """Unparsed resumes of an uploaded .zip or .jsonl: [(name, bytes)] for zip members, [(name, text)] for jsonl.
+
+    Raises BatchTooLarge past MAX_BATCH_RESUMES resumes or MAX_BATCH_BYTES (uncompressed).
+    """
+    name = (filename or '').lower()
+    if name.endswith('.zip'):
+        with zipfile.ZipFile(fileobj) as zf:
+            members = [info for info in zf.infolist()
+                       if not info.is_dir() and info.filename.lower().endswith(SUPPORTED_EXTENSIONS)]
+            # Declared sizes also bound what zf.read() will inflate
+            _check_pool_size(len(members), sum(info.file_size for info in members))
+            return [(os.path.basename(info.filename), zf.read(info)) for info in members]
+    if name.endswith('.jsonl'):
+        data = fileobj.read(MAX_BATCH_BYTES + 1)
+        _check_pool_size(0, len(data))
+        resumes = _load_jsonl(data.splitlines())
+        _check_pool_size(len(resumes), len(data))
+        return resumes
+    raise ValueError('Resumes must be a .zip archive or a .jsonl file')
+
+
+def load_job_text(path):
+    with open(path, 'rb') as f:
+        return _text_from_bytes(path, f.read())
+
+
+def score_resumes(job_text, resumes, batch_size=32):
+    """Score every resume against the job description in one vectorized pass.
+
+    Returns a dict with the ranked results and throughput stats.
+    """
+    start = time.perf_counter()
+    names = [name for name, _ in resumes]
+    texts = [text for _, text in resumes]
+
+    job_emb = get_embeddings(job_text)
+    resume_matrix = get_embeddings_batch(texts, batch_size=batch_size)
+    similarities = cosine_similarity_matrix(resume_matrix, job_emb) if texts else []
+
+    jd_skills = set(extract_skills(job_text))
+    weights = skill_weights(job_text)
+    resume_skills = extract_skills_batch(texts)
+
+    results = []
+    for name, similarity, skills in zip(names, similarities, resume_skills):
+        skills = set(skills)
+        results.append({
+            'name': name,
+            'fit_score': max(0, min(100, int(float(similarity) * 100))),
+            'matched_skills': sorted(skills & jd_skills),
+            'missing_skills': top_missing_skills(jd_skills, skills, limit=10, weights=weights),
+        })
+    results.sort(key=lambda r: r['fit_score'], reverse=True)
+    for rank, result in enumerate(results, 1):
+        result['rank'] = rank
+
+    elapsed = time.perf_counter() - start
+    return {
+        'count': len(results),
+        'elapsed_seconds': round(elapsed, 3),
+        'resumes_per_second': round(len(results) / elapsed, 2) if elapsed > 0 else 0.0,
+        'results': results,
+    }
+
+
+def score_documents(job_doc, resume_docs, batch_size=32):
+    """score_resumes for stored documents (job_doc, [(name, doc_id)]); runs in the analysis workers.
+
+    Every document is discarded afterwards.
+    """
+    doc_ids = [job_doc] + [doc_id for _, doc_id in resume_docs]
+    try:
+        with span('parse'):
+            job_text = load_text(job_doc)
+            resumes = [(name, load_text(doc_id)) for name, doc_id in resume_docs]
+    finally:
+        for doc_id in doc_ids:
+            discard(doc_id)
+    if job_text is None or any(text is None for _, text in resumes):
+        raise ValueError('Uploaded documents expired before they could be scored')
+    return score_resumes(clean_text(job_text), [(name, clean_text(text)) for name, text in resumes], batch_size=batch_size)
+
+
+def write_report(results, fp, fmt='jsonl'):
+    """Write ranked results as JSONL or CSV to a text file object"""
+    if fmt == 'csv':
+        writer = csv.DictWriter(fp, fieldnames=REPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for result in results:
+            row = dict(result)
+            row['matched_skills'] = '; '.join(result['matched_skills'])
+            row['missing_skills'] = '; '.join(result['missing_skills'])
+            writer.writerow(row)
+    else:
+        for result in results:
+            fp.write(json.dumps(result) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rank a pool of resumes against one job description.')
+    parser.add_argument('--job', required=True, help='Job description file (.pdf or .txt)')
+    parser.add_argument('--resumes', required=True, help='Directory, .zip or .jsonl of resumes')
+    parser.add_argument('--out', help='Report path (defaults to stdout)')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help='Report format (inferred from --out)')
+    parser.add_argument('--batch-size', type=int, default=32, help='SentenceTransformer encode batch size')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    fmt = args.format or ('csv' if args.out and args.out.lower().endswith('.csv') else 'jsonl')
+    report = score_resumes(load_job_text(args.job), load_resumes(args.resumes), batch_size=args.batch_size)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8', newline='') as f:
+            write_report(report['results'], f, fmt)
+    else:
+        write_report(report['results'], sys.stdout, fmt)
+    print(f"Scored {report['count']} resumes in {report['elapsed_seconds']}s "
+          f"({report['resumes_per_second']} resumes/sec)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
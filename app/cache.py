@@ -0,0 +1,279 @@
+import os
+import json
+import time
+import base64
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from .metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration (all optional)
+CACHE_DB_PATH = os.getenv('ANALYSIS_CACHE_DB')  # e.g. /tmp/resume-reviewer-cache.sqlite3
+CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', '86400'))
+CACHE_DISK_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_DISK_MAX_ENTRIES', '50000'))
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different copies of a document share a key"""
+    return ' '.join((text or '').split())
+
+
+def _encode_default(value):
+    # JSON extensions for what the caches and the document store hold: arrays, bytes and skill sets
+    if isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, (set, frozenset)):
+        return {'__set__': sorted(value)}
+    if hasattr(value, 'dtype') and hasattr(value, 'tobytes'):
+        if not value.shape:
+            return value.item()
+        return {'__ndarray__': base64.b64encode(value.tobytes()).decode('ascii'),
+                'dtype': str(value.dtype), 'shape': list(value.shape)}
+    raise TypeError(f'{type(value).__name__} cannot be stored')
+
+
+def _decode_object(obj):
+    if '__bytes__' in obj:
+        return base64.b64decode(obj['__bytes__'])
+    if '__set__' in obj:
+        return frozenset(obj['__set__'])
+    if '__ndarray__' in obj:
+        import numpy as np
+        return np.frombuffer(base64.b64decode(obj['__ndarray__']), dtype=obj['dtype']).reshape(obj['shape'])
+    return obj
+
+
+def make_key(texts, model, version=''):
+    """Content-addressed key: hash of the normalized text(s) plus model name and version"""
+    if isinstance(texts, str):
+        texts = (texts,)
+    h = hashlib.sha256()
+    h.update(f"{model}\x1f{version}".encode('utf-8'))
+    for text in texts:
+        h.update(b'\x1e')
+        h.update(normalize_text(text).encode('utf-8'))
+    return h.hexdigest()
+
+
+class LRUCache:
+    """Bounded in-process LRU with per-entry TTL"""
+
+    def __init__(self, maxsize=1024, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires and expires < time.time():
+                del self._data[key]
+                self.evictions += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.time() + ttl if ttl else 0
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteStore:
+    """Small key/value table in a SQLite file, safe to share between gunicorn workers"""
+
+    def __init__(self, path, table, ttl=CACHE_TTL, max_entries=CACHE_DISK_MAX_ENTRIES):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._init_schema()
+
+    def _connect(self):
+        # One connection per thread and per process (connections must not cross a fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_schema(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().execute(
+            f'CREATE TABLE IF NOT EXISTS {self.table} ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+            'created_at REAL NOT NULL, expires_at REAL NOT NULL)'
+        )
+        self._connect().execute(
+            f'CREATE INDEX IF NOT EXISTS {self.table}_created ON {self.table} (created_at)'
+        )
+
+    # Value encoding: JSON (plus arrays, bytes and sets), never pickle, since the file may sit in a
+    # shared directory where others can write to it. Subclasses can swap in a different format
+    def dumps(self, value):
+        return json.dumps(value, default=_encode_default, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, blob):
+        return json.loads(blob, object_hook=_decode_object)
+
+    def get(self, key):
+        row = self._connect().execute(
+            f'SELECT value, expires_at FROM {self.table} WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at and expires_at < time.time():
+            self.delete(key)
+            return None
+        try:
+            return self.loads(value)
+        except ValueError:
+            # Written in another format (e.g. pickled by an older version): treat as missing
+            logger.warning(f"Dropping undecodable {self.table} entry {key}")
+            self.delete(key)
+            return None
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        self._connect().execute(
+            f'INSERT OR REPLACE INTO {self.table} (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)',
+            (key, self.dumps(value), now, now + ttl if ttl else 0),
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.evict()
+
+    def delete(self, key):
+        self._connect().execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+
+    def evict(self):
+        """Drop expired rows, then the oldest rows beyond max_entries"""
+        conn = self._connect()
+        conn.execute(
+            f'DELETE FROM {self.table} WHERE expires_at > 0 AND expires_at < ?', (time.time(),)
+        )
+        if self.max_entries:
+            conn.execute(
+                f'DELETE FROM {self.table} WHERE key IN ('
+                f'SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            )
+
+    def __len__(self):
+        return self._connect().execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+
+
+class AnalysisCache:
+    """Two-tier cache: in-process LRU in front of an optional shared SQLite store"""
+
+    def __init__(self, name, maxsize=1024, ttl=CACHE_TTL, db_path=CACHE_DB_PATH):
+        self.name = name
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk = None
+        if db_path:
+            try:
+                self.disk = SQLiteStore(db_path, name, ttl=ttl)
+            except Exception as e:
+                logger.error(f"Could not open disk cache {db_path}: {e}")
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except Exception as e:
+                logger.error(f"Disk cache read failed ({self.name}): {e}")
+                value = None
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self.memory.set(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except Exception as e:
+                logger.error(f"Disk cache write failed ({self.name}): {e}")
+
+    def clear(self):
+        self.memory.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'size': len(self.memory),
+            'maxsize': self.memory.maxsize,
+            'evictions': self.memory.evictions,
+            'disk': bool(self.disk),
+        }
+
+
+# Embeddings, extracted skill sets and LLM feedback are memoized separately
+embedding_cache = AnalysisCache('embeddings', maxsize=int(os.getenv('EMBEDDING_CACHE_SIZE', '2048')))
+skills_cache = AnalysisCache('skills', maxsize=int(os.getenv('SKILLS_CACHE_SIZE', '2048')))
+feedback_cache = AnalysisCache('feedback', maxsize=int(os.getenv('FEEDBACK_CACHE_SIZE', '256')))
+
+
+def cache_stats():
+    return {c.name: c.stats() for c in (embedding_cache, skills_cache, feedback_cache)}
+
+
+def _cache_metrics():
+    stats = cache_stats()
+    return [
+        ('cache_hits_total', 'counter', 'Cache lookups answered from memory or disk',
+         [({'cache': name}, s['hits']) for name, s in stats.items()]),
+        ('cache_misses_total', 'counter', 'Cache lookups that missed both tiers',
+         [({'cache': name}, s['misses']) for name, s in stats.items()]),
+        ('cache_hit_ratio', 'gauge', 'Share of cache lookups that hit since the process started',
+         [({'cache': name}, s['hit_rate']) for name, s in stats.items()]),
+        ('cache_entries', 'gauge', 'Entries in the in-process cache tier',
+         [({'cache': name}, s['size']) for name, s in stats.items()]),
+    ]
+
+
+register_collector(_cache_metrics)
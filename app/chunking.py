@@ -0,0 +1,67 @@
+import re
+from .resume_utils import SECTION_HEADERS
+
+# all-MiniLM-L6-v2 truncates at 256 word pieces; ~150 words stays safely inside the window
+DEFAULT_CHUNK_WORDS = 150
+
+_HEADER_ALTERNATION = '|'.join(sorted((re.escape(h) for h in SECTION_HEADERS), key=len, reverse=True))
+# A header on its own line ("Experience", "WORK HISTORY:")
+_LINE_HEADER_RE = re.compile(rf'^[ \t]*({_HEADER_ALTERNATION})[ \t]*:?[ \t]*$', re.IGNORECASE | re.MULTILINE)
+# In flattened text only trust upper-case headers ("... EXPERIENCE Software Engineer ...")
+_UPPER_HEADER_RE = re.compile(rf'\b({_HEADER_ALTERNATION.upper()})\b')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?;])\s+|\s*[•●▪◦‣]\s*|\n+')
+
+
+def split_sections(text):
+    """Split a document into (section_name, text) pairs using the known section headers.
+
+    Text before the first header (or a document without headers) is labelled 'body'.
+    """
+    matches = list(_LINE_HEADER_RE.finditer(text))
+    if not matches:
+        matches = list(_UPPER_HEADER_RE.finditer(text))
+    sections = []
+    start, name = 0, 'body'
+    for match in matches:
+        chunk = text[start:match.start()].strip()
+        if chunk:
+            sections.append((name, chunk))
+        name = match.group(1).lower()
+        start = match.end()
+    chunk = text[start:].strip()
+    if chunk:
+        sections.append((name, chunk))
+    return sections
+
+
+def split_sentences(text):
+    """Split text into sentences / bullet items"""
+    return [s.strip() for s in _SENTENCE_SPLIT_RE.split(text) if s and s.strip()]
+
+
+def chunk_text(text, max_words=DEFAULT_CHUNK_WORDS):
+    """Pack sentences into section-aligned windows of at most max_words words.
+
+    Returns a list of (section_name, chunk_text) pairs. Chunks never cross a
+    section boundary, so editing one section leaves the other chunks (and their
+    cached embeddings) unchanged.
+    """
+    chunks = []
+    for section, section_text in split_sections(text):
+        window = []
+        for sentence in split_sentences(section_text):
+            words = sentence.split()
+            # Sentences longer than the window are hard-split on word boundaries
+            while len(words) > max_words:
+                if window:
+                    chunks.append((section, ' '.join(window)))
+                    window = []
+                chunks.append((section, ' '.join(words[:max_words])))
+                words = words[max_words:]
+            if len(window) + len(words) > max_words:
+                chunks.append((section, ' '.join(window)))
+                window = []
+            window.extend(words)
+        if window:
+            chunks.append((section, ' '.join(window)))
+    return chunks
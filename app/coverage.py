@@ -0,0 +1,150 @@
+"""Sentence-level coverage of a job description's requirements by the resume.
+
+The JD is split into requirement sentences and the resume into evidence
+sentences (bullets). Both go through one batched encode, and a single
+matrix product gives every requirement's similarity to every piece of
+evidence. Each requirement reports its best evidence, a similarity and a
+status (covered / partial / missing). The overall coverage is the
+emphasis-weighted mean of the per-requirement credit.
+
+Emphasis comes from wording ("must", "required" weigh 2, "nice to have",
+"preferred" weigh 0.5) or from the heading a line sits under
+("Requirements:", "Bonus points:"). skill_weights() sums the emphasis of
+the sentences that mention each skill, so missing skills can be ranked by
+how much of the JD asks for them.
+"""
+import os
+import re
+import numpy as np
+from .chunking import split_sentences
+from .metrics import span
+from .similarity_engine import encode_texts, match_skills
+
+# Best-evidence similarity at which a requirement counts as covered / partly covered
+COVERAGE_MATCH = float(os.getenv('COVERAGE_MATCH', '0.55'))
+COVERAGE_PARTIAL = float(os.getenv('COVERAGE_PARTIAL', '0.35'))
+# Sentence caps keep the batched encode and the matrix bounded for very long documents
+MAX_REQUIREMENTS = int(os.getenv('COVERAGE_MAX_REQUIREMENTS', '40'))
+MAX_EVIDENCE = int(os.getenv('COVERAGE_MAX_EVIDENCE', '200'))
+MIN_SENTENCE_WORDS = 3
+# Short lines ending in ':' (or too short to be a requirement) are headings; their emphasis carries to the lines below
+HEADING_MAX_WORDS = 5
+# Stripped from the start of bullet items
+BULLET_CHARS = '-*–• \t'
+
+EMPHASIS = (
+    (re.compile(r'\b(must|required|requirements?|essential|mandatory|minimum|qualifications)\b', re.IGNORECASE), 2.0),
+    (re.compile(r'\b(nice to have|preferred|a plus|bonus|desirable|ideally|optional)\b', re.IGNORECASE), 0.5),
+)
+
+
+def _emphasis(text):
+    for pattern, weight in EMPHASIS:
+        if pattern.search(text):
+            return weight
+    return None
+
+
+def _sentences(text):
+    return [s.lstrip(BULLET_CHARS) for s in split_sentences(text)]
+
+
+def requirement_sentences(job_text):
+    """[(sentence, emphasis)] for the JD, in order; headings set the emphasis of what follows them"""
+    sentences, context = [], 1.0
+    for line in job_text.split('\n'):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        words = len(stripped.split())
+        if (stripped.endswith(':') or words < MIN_SENTENCE_WORDS) and words <= HEADING_MAX_WORDS:
+            context = _emphasis(stripped) or 1.0
+            continue
+        for sentence in _sentences(stripped):
+            if len(sentence.split()) >= MIN_SENTENCE_WORDS:
+                sentences.append((sentence, _emphasis(sentence) or context))
+    return sentences
+
+
+def evidence_sentences(resume_text):
+    return [s for s in _sentences(resume_text) if len(s.split()) >= MIN_SENTENCE_WORDS][:MAX_EVIDENCE]
+
+
+def job_requirements(job_text):
+    """{'requirements': [[sentence, emphasis, skills]] (first MAX_REQUIREMENTS),
+    'skill_weights': {skill: summed emphasis of the JD sentences mentioning it}}; JSON-serializable"""
+    sentences = requirement_sentences(job_text)
+    sentence_skills = match_skills([s for s, _ in sentences])
+    # Weights count every sentence, even past MAX_REQUIREMENTS
+    weights = {}
+    for (_, emphasis), skills in zip(sentences, sentence_skills):
+        for skill in skills:
+            weights[skill] = weights.get(skill, 0.0) + emphasis
+    return {
+        'requirements': [[s, emphasis, sorted(skills)]
+                         for (s, emphasis), skills in zip(sentences[:MAX_REQUIREMENTS], sentence_skills)],
+        'skill_weights': weights,
+    }
+
+
+def skill_weights(job_text):
+    return job_requirements(job_text)['skill_weights']
+
+
+def _normalized(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def _credit(similarity):
+    """0-1 credit for a requirement: 0 at COVERAGE_PARTIAL and below, 1 from COVERAGE_MATCH"""
+    return float(np.clip((similarity - COVERAGE_PARTIAL) / (COVERAGE_MATCH - COVERAGE_PARTIAL), 0.0, 1.0))
+
+
+def coverage_map(resume_text, job_text=None, resume_skills=(), timings=None, requirements=None):
+    """Requirement-by-requirement coverage of the JD by resume_text.
+
+    requirements is job_requirements(job_text), when already computed (JD catalog).
+    Returns {'coverage': 0-100, 'covered'/'partial'/'missing': counts,
+    'requirements': [{'text', 'emphasis', 'evidence', 'similarity', 'status', 'skills', 'missing_skills'}],
+    'skill_weights': {skill: weight}}; resume_skills marks each requirement's skills as missing or not.
+    """
+    timings = {} if timings is None else timings
+    requirements = requirements or job_requirements(job_text)
+    weights, requirements = requirements['skill_weights'], requirements['requirements']
+    evidence = evidence_sentences(resume_text)
+    result = {'coverage': 0, 'covered': 0, 'partial': 0, 'missing': 0, 'requirements': [], 'skill_weights': weights}
+    if not requirements:
+        return result
+
+    with span('coverage_embed', timings):
+        matrix = encode_texts([r[0] for r in requirements] + evidence)
+    with span('coverage', timings):
+        req_matrix = _normalized(matrix[:len(requirements)])
+        if evidence:
+            # (requirements x evidence) cosine similarities in one product
+            similarities = req_matrix @ _normalized(matrix[len(requirements):]).T
+            best = similarities.argmax(axis=1)
+            best_scores = similarities[np.arange(len(requirements)), best]
+        else:
+            best = np.zeros(len(requirements), dtype=int)
+            best_scores = np.zeros(len(requirements), dtype=np.float32)
+        resume_skills = set(resume_skills)
+        credit_sum = weight_sum = 0.0
+        for (text, emphasis, skills), index, score in zip(requirements, best, best_scores):
+            score = float(score)
+            status = 'covered' if score >= COVERAGE_MATCH else 'partial' if score >= COVERAGE_PARTIAL else 'missing'
+            result[status] += 1
+            credit_sum += emphasis * _credit(score)
+            weight_sum += emphasis
+            result['requirements'].append({
+                'text': text,
+                'emphasis': emphasis,
+                'evidence': evidence[index] if evidence and status != 'missing' else None,
+                'similarity': max(0, min(100, int(round(score * 100)))),
+                'status': status,
+                'skills': skills,
+                'missing_skills': [skill for skill in skills if skill not in resume_skills],
+            })
+        result['coverage'] = int(round(100 * credit_sum / weight_sum))
+    return result
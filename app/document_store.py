@@ -0,0 +1,110 @@
+import os
+import time
+import uuid
+import logging
+import tempfile
+from .cache import SQLiteStore
+from .resume_utils import extract_pdf_with_layout, clean_text
+from .metrics import span
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_STORE_DB = os.getenv('DOCUMENT_STORE_DB', os.path.join(tempfile.gettempdir(), 'resume-reviewer-documents.sqlite3'))
+DOCUMENT_TTL = int(os.getenv('DOCUMENT_TTL', '3600'))
+MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+UPLOAD_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'uploads'))
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = SQLiteStore(DOCUMENT_STORE_DB, 'documents', ttl=DOCUMENT_TTL, max_entries=0)
+    return _store
+
+
+def save_text(text):
+    """Store pasted text; returns its document id"""
+    doc_id = uuid.uuid4().hex
+    get_store().set(doc_id, {'kind': 'text', 'text': clean_text(text)})
+    return doc_id
+
+
+def save_upload(file_storage):
+    """Store an uploaded file straight from the request stream (no temp file).
+
+    PDFs are kept as bytes and parsed once, on first load; plain text is decoded now.
+    """
+    data = file_storage.stream.read(MAX_UPLOAD_BYTES + 1)
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise UploadTooLarge(f'{file_storage.filename} is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB')
+    return save_bytes(file_storage.filename, data)
+
+
+def save_bytes(name, data):
+    """Store a file's contents (a PDF if name ends in .pdf, else text); returns its document id"""
+    doc_id = uuid.uuid4().hex
+    if name.lower().endswith('.pdf'):
+        document = {'kind': 'pdf', 'name': name, 'data': data}
+    else:
+        document = {'kind': 'text', 'name': name, 'text': data.decode('utf-8', errors='ignore')}
+    get_store().set(doc_id, document)
+    return doc_id
+
+
+def ingest_input(file_storage, text_input):
+    """Document id for an upload or pasted text (upload wins), or None if neither was given"""
+    if file_storage and file_storage.filename:
+        return save_upload(file_storage)
+    if text_input and text_input.strip():
+        return save_text(text_input)
+    return None
+
+
+def load_document(doc_id):
+    """(text, layout) of a stored document, or (None, None) if it expired.
+
+    layout is the pdf_engine layout summary for PDFs and None for text.
+    A PDF is parsed on first access and its text replaces the bytes, so it is never parsed twice.
+    """
+    store = get_store()
+    document = store.get(doc_id)
+    if document is None:
+        return None, None
+    if document['kind'] == 'pdf':
+        with span('pdf_parse'):
+            text, layout = extract_pdf_with_layout(document['data'])
+        store.set(doc_id, {'kind': 'text', 'name': document.get('name'), 'text': text, 'layout': layout})
+        return text, layout
+    return document['text'], document.get('layout')
+
+
+def load_text(doc_id):
+    """Extracted text of a stored document, or None if it expired"""
+    return load_document(doc_id)[0]
+
+
+def discard(doc_id):
+    get_store().delete(doc_id)
+
+
+def janitor(max_age=DOCUMENT_TTL):
+    """Reclaim abandoned documents and leftover files in the legacy uploads folder"""
+    get_store().evict()
+    if not os.path.isdir(UPLOAD_FOLDER):
+        return
+    cutoff = time.time() - max_age
+    for entry in os.listdir(UPLOAD_FOLDER):
+        path = os.path.join(UPLOAD_FOLDER, entry)
+        try:
+            if os.path.isfile(path) and not entry.startswith('.') and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                logger.info(f"Removed abandoned upload {entry}")
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
@@ -1,17 +1,52 @@
 import os
+import logging
+import threading
 from dotenv import load_dotenv
-from huggingface_hub import InferenceClient
+from .cache import feedback_cache, make_key
+from .metrics import register_collector
+from .llm_providers import create_provider, ResilientProvider, CircuitOpen, LLM_PROVIDER
+from .feedback_schema import (
+    FEEDBACK_FORMAT, FEEDBACK_SCHEMA, FEEDBACK_AREAS, FeedbackFormatError,
+    parse_structured, partial_feedback, parse_text, text_feedback,
+)
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 HF_TOKEN = os.getenv('HF_TOKEN')
 
-client = InferenceClient(
-    provider="novita",
-    api_key=HF_TOKEN,
-)
+LLM_MODEL = os.getenv('LLM_MODEL', "meta-llama/Meta-Llama-3-8B-Instruct")
+
+_provider = None
+_provider_lock = threading.Lock()
+
+def get_provider():
+    """The configured LLM provider (see llm_providers), created once per process"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = ResilientProvider(create_provider(LLM_PROVIDER, model=LLM_MODEL, token=HF_TOKEN))
+        return _provider
+
+def _llm_metrics():
+    # Only report a provider this process has actually used
+    if _provider is None:
+        return []
+    status = _provider.status()
+    return [
+        ('llm_provider_events_total', 'counter', 'LLM provider calls, retries, failures and breaker rejections',
+         [({'event': event}, status[event]) for event in ('calls', 'retries', 'failures', 'rejected')]),
+        ('llm_circuit_open', 'gauge', '1 while the LLM circuit breaker is open',
+         [({}, int(status['circuit'] == 'open'))]),
+    ]
+
+register_collector(_llm_metrics)
 
-PROMPT_TEMPLATE = '''Act as a professional resume reviewer. Given the following resume and job description:
+# Bump whenever a prompt template or the response parsing changes so cached feedback is invalidated
+PROMPT_VERSION = '2'
+
+PROMPT_INTRO = '''Act as a professional resume reviewer. Given the following resume and job description:
 
 Resume:
 {resume_text}
@@ -19,7 +54,9 @@ Resume:
 Job Description:
 {job_text}
 
-1. **AI Suggestions**: Provide detailed, categorized suggestions in these areas:
+'''
+
+TEXT_PROMPT_TEMPLATE = PROMPT_INTRO + '''1. **AI Suggestions**: Provide detailed, categorized suggestions in these areas:
    - Content Structure & Section Coverage
    - Grammar, Tone & Clarity
    - Role Relevance & Personalization
@@ -36,54 +73,89 @@ For each, give specific, actionable feedback with examples.
 Format your output with clear headings and bullet points for each section.
 '''
 
+# The schema's braces are doubled so the template still works with str.format
+JSON_PROMPT_TEMPLATE = PROMPT_INTRO + '''Respond with a single JSON object and nothing else (no markdown, no code fences), with exactly these keys:
+''' + FEEDBACK_SCHEMA.replace('{', '{{').replace('}', '}}') + '''
+Use one category per area: ''' + '; '.join(FEEDBACK_AREAS) + '''.
+'''
+
+PROMPT_TEMPLATE = JSON_PROMPT_TEMPLATE if FEEDBACK_FORMAT == 'json' else TEXT_PROMPT_TEMPLATE
+
+REPAIR_TEMPLATE = '''The following answer should be a JSON object matching the schema below, but {problem}.
+
+Schema:
+{schema}
+
+Answer:
+{response}
+
+Return only the corrected JSON object, keeping the original content.
+'''
+# Longest malformed response sent back for repair
+REPAIR_MAX_CHARS = 8000
+
+def feedback_cache_key(prompt):
+    return make_key(prompt, get_provider().model_id, PROMPT_VERSION)
+
+def build_prompt(resume_text, job_text):
+    """Token-budgeted prompt text (see prompt_builder)"""
+    # prompt_builder imports this module for the template
+    from .prompt_builder import build_feedback_prompt
+    return build_feedback_prompt(resume_text, job_text)['prompt']
+
+def error_message(e):
+    if isinstance(e, CircuitOpen):
+        return "[ERROR] The AI reviewer is temporarily unavailable. Please try again shortly."
+    if '401' in str(e) or 'Unauthorized' in str(e):
+        return "[ERROR] Invalid Hugging Face credentials or model access. Please check your HF_TOKEN and model permissions."
+    return f"[ERROR] LLM call failed: {e}"
+
+def stream_feedback(prompt):
+    """Yield the LLM response text piece by piece using the provider's streaming mode"""
+    yield from get_provider().stream(prompt)
+
+def parse_feedback(response, repair=True):
+    """Feedback payload (a Feedback dict) from a complete LLM response.
+
+    A JSON response that fails validation gets one repair call; if that fails too,
+    whatever sections are usable are kept, else the response is kept as text.
+    repair=False skips the extra call (used when the job is out of time).
+    """
+    if FEEDBACK_FORMAT != 'json':
+        return parse_text(response).to_dict()
+    try:
+        return parse_structured(response).to_dict()
+    except FeedbackFormatError as e:
+        problem = e
+    if repair:
+        logger.warning(f"Malformed feedback JSON ({problem}); asking the model to repair it")
+        try:
+            prompt = REPAIR_TEMPLATE.format(problem=problem, schema=FEEDBACK_SCHEMA,
+                                            response=response[:REPAIR_MAX_CHARS])
+            return parse_structured(get_provider().complete(prompt)).to_dict()
+        except Exception as e:
+            logger.warning(f"Feedback JSON repair failed: {e}")
+    return partial_feedback(response).to_dict()
+
+def is_cacheable(feedback):
+    """Unstructured JSON-mode answers are not cached so the next request tries the LLM again"""
+    return feedback['structured'] or FEEDBACK_FORMAT != 'json'
+
+def error_feedback(e):
+    return text_feedback(error_message(e)).to_dict()
+
 def generate_feedback(resume_text, job_text):
-    prompt = PROMPT_TEMPLATE.format(resume_text=resume_text, job_text=job_text)
+    prompt = build_prompt(resume_text, job_text)
+    key = feedback_cache_key(prompt)
+    cached = feedback_cache.get(key)
+    if cached is not None:
+        return dict(cached)
     try:
-        completion = client.chat.completions.create(
-            model="meta-llama/Meta-Llama-3-8B-Instruct",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        response = completion.choices[0].message.content if hasattr(completion.choices[0].message, 'content') else str(completion.choices[0].message)
+        response = get_provider().complete(prompt)
     except Exception as e:
-        if '401' in str(e) or 'Unauthorized' in str(e):
-            response = "[ERROR] Invalid Hugging Face credentials or model access. Please check your HF_TOKEN and model permissions."
-        else:
-            response = f"[ERROR] LLM call failed: {e}"
-    # Parse output: try to split by headings
-    ai_suggestions = ''
-    summary = ''
-    lines = response.split('\n')
-    current = None
-    buffer = []
-    for line in lines:
-        if 'AI Suggestions' in line:
-            if current:
-                if current == 'AI Suggestions':
-                    ai_suggestions = '\n'.join(buffer).strip()
-                elif current == 'Summary':
-                    summary = '\n'.join(buffer).strip()
-            current = 'AI Suggestions'
-            buffer = []
-        elif 'Summary' in line:
-            if current == 'AI Suggestions':
-                ai_suggestions = '\n'.join(buffer).strip()
-            buffer = []
-            current = 'Summary'
-        else:
-            buffer.append(line)
-    if current == 'Summary':
-        summary = '\n'.join(buffer).strip()
-    elif current == 'AI Suggestions':
-        ai_suggestions = '\n'.join(buffer).strip()
-    # Fallback if parsing fails
-    if not ai_suggestions:
-        ai_suggestions = response
-    if not summary:
-        summary = response
-    # Return as a single suggestion (for now, can be split further if needed)
-    return {
-        'improvements': [ai_suggestions],
-        'fit_score': 0,
-        'summary': summary,
-        'raw_output': response
-    } 
\ No newline at end of file
+        return error_feedback(e)
+    feedback = parse_feedback(response)
+    # Errors are not cached so the next request retries the LLM
+    if is_cacheable(feedback):
+        feedback_cache.set(key, feedback)
+    return dict(feedback)
@@ -0,0 +1,237 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .cache import feedback_cache
+from .feedback_generator import stream_feedback, parse_feedback, error_feedback, feedback_cache_key, is_cacheable
+from .feedback_schema import FEEDBACK_FORMAT, FeedbackStreamParser, normalize_section, text_feedback
+from .prompt_builder import build_feedback_prompt
+from .metrics import counter, histogram, span, register_collector
+
+logger = logging.getLogger(__name__)
+
+FEEDBACK_WORKERS = int(os.getenv('FEEDBACK_WORKERS', '4'))
+FEEDBACK_TIMEOUT = float(os.getenv('FEEDBACK_TIMEOUT', '90'))
+FEEDBACK_JOB_TTL = float(os.getenv('FEEDBACK_JOB_TTL', '3600'))
+
+PENDING, RUNNING, DONE, ERROR, CANCELLED = 'pending', 'running', 'done', 'error', 'cancelled'
+FINISHED = (DONE, ERROR, CANCELLED)
+CANCELLED_NOTE = 'AI feedback generation was cancelled. Analyze the resume again to regenerate it.'
+
+FEEDBACK_JOBS_TOTAL = counter('feedback_jobs_total', 'Finished feedback jobs', ('status',))
+LLM_FIRST_TOKEN_SECONDS = histogram('llm_first_token_seconds', 'Time from feedback job start to the first streamed piece')
+
+
+class FeedbackJob:
+    """LLM feedback generated in the background; readers wait on the condition for new text.
+
+    With FEEDBACK_FORMAT=json, sections holds (name, value) for each schema member
+    that has been streamed completely so far.
+    """
+
+    def __init__(self, prompt, prompt_tokens=None, on_finish=None):
+        self.id = uuid.uuid4().hex
+        self.prompt = prompt
+        self.prompt_tokens = prompt_tokens
+        self.status = PENDING
+        self.chunks = []
+        self.sections = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.cond = threading.Condition()
+        self.on_finish = on_finish
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def append(self, text):
+        with self.cond:
+            self.chunks.append(text)
+            self.cond.notify_all()
+
+    def add_section(self, name, value):
+        with self.cond:
+            self.sections.append((name, value))
+            self.cond.notify_all()
+
+    def start(self):
+        """Move a pending job to running and return its prompt; None if it was cancelled or already finished.
+
+        Shares the lock with cancel(), so a job is either started or cancelled before it runs, never both.
+        """
+        with self.cond:
+            if self.status != PENDING or self.cancel_event.is_set():
+                return None
+            self.status = RUNNING
+            return self.prompt
+
+    def cancel(self):
+        """Ask the job to stop; a job that has not started yet is finished right away"""
+        with self.cond:
+            self.cancel_event.set()
+            if self.status == PENDING:
+                self.finish(CANCELLED)
+
+    def finish(self, status, result=None, error=None):
+        """Set the final status; only the first call counts, later ones (e.g. after a timeout) return False.
+
+        A cancelled job gets a short note as its result, so the report it belongs to ends up
+        with final feedback instead of waiting for a job that will never finish.
+        """
+        if status == CANCELLED and result is None:
+            result = text_feedback(CANCELLED_NOTE).to_dict()
+        with self.cond:
+            if self.finished:
+                return False
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            # The prompt is no longer needed once the job is over
+            self.prompt = None
+            self.cond.notify_all()
+        FEEDBACK_JOBS_TOTAL.labels(status=status).inc()
+        if result is not None and self.on_finish is not None:
+            try:
+                self.on_finish(result)
+            except Exception:
+                logger.exception(f"Feedback job {self.id} completion callback failed")
+        return True
+
+    def wait(self, seen, seen_sections, timeout):
+        """Block until there are more than `seen` chunks or `seen_sections` sections, or the job finished"""
+        with self.cond:
+            if len(self.chunks) <= seen and len(self.sections) <= seen_sections and not self.finished:
+                self.cond.wait(timeout)
+            return self.chunks[seen:], self.sections[seen_sections:], self.finished
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'text': ''.join(self.chunks),
+            'sections': dict(self.sections),
+            'result': self.result,
+            'error': self.error,
+            'prompt_tokens': self.prompt_tokens,
+            'elapsed': round((self.finished_at or time.time()) - self.created_at, 3),
+        }
+
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+
+
+def _get_executor():
+    # Created lazily (and re-created after a fork) so no threads exist before gunicorn forks workers
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=FEEDBACK_WORKERS, thread_name_prefix='feedback')
+        _executor_pid = os.getpid()
+    return _executor
+
+
+def _expire_jobs():
+    cutoff = time.time() - FEEDBACK_JOB_TTL
+    with _jobs_lock:
+        for job_id in [k for k, j in _jobs.items() if j.finished and j.finished_at < cutoff]:
+            del _jobs[job_id]
+
+
+def _time_out(job):
+    # Watchdog: fires even while the provider is stalled between pieces; the stream stops at its next piece
+    job.finish(ERROR, parse_feedback(''.join(job.chunks), repair=False),
+               error=f'Feedback timed out after {FEEDBACK_TIMEOUT:.0f}s')
+
+
+def _run(job):
+    prompt = job.start()
+    if prompt is None:
+        job.finish(CANCELLED)
+        return
+    watchdog = threading.Timer(max(0.0, job.created_at + FEEDBACK_TIMEOUT - time.time()), _time_out, (job,))
+    watchdog.daemon = True
+    watchdog.start()
+    key = feedback_cache_key(prompt)
+    parser = FeedbackStreamParser() if FEEDBACK_FORMAT == 'json' else None
+    started = time.perf_counter()
+    try:
+        with span('llm'):
+            try:
+                for piece in stream_feedback(prompt):
+                    if not job.chunks:
+                        LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+                    if job.cancel_event.is_set():
+                        job.finish(CANCELLED)
+                        return
+                    if job.finished:
+                        return
+                    job.append(piece)
+                    if parser is not None:
+                        for name, value in parser.feed(piece):
+                            value = normalize_section(name, value)
+                            if value not in (None, '', []):
+                                job.add_section(name, value)
+            except Exception as e:
+                logger.error(f"Feedback job {job.id} failed: {e}")
+                job.finish(ERROR, error_feedback(e), error=str(e))
+                return
+            feedback = parse_feedback(''.join(job.chunks))
+    finally:
+        watchdog.cancel()
+    if is_cacheable(feedback):
+        feedback_cache.set(key, feedback)
+    if job.finish(DONE, feedback):
+        logger.info(f"Feedback job {job.id}: {job.prompt_tokens} prompt tokens, {job.finished_at - job.created_at:.2f}s")
+
+
+def start_feedback_job(resume_text, job_text, prompt=None, on_finish=None):
+    """Start generating feedback in the background and return the job id.
+
+    prompt is a prebuilt build_feedback_prompt() result (the analysis worker
+    makes one); otherwise it is built here. Cached feedback completes the job
+    immediately without calling the LLM. on_finish(result) is called once the
+    job has a result (possibly before this function returns).
+    """
+    _expire_jobs()
+    prompt = prompt or build_feedback_prompt(resume_text, job_text)
+    job = FeedbackJob(prompt['prompt'], prompt['prompt_tokens'], on_finish)
+    with _jobs_lock:
+        _jobs[job.id] = job
+    cached = feedback_cache.get(feedback_cache_key(job.prompt))
+    if cached is not None:
+        job.finish(DONE, dict(cached))
+    else:
+        _get_executor().submit(_run, job)
+    return job.id
+
+
+def _feedback_metrics():
+    with _jobs_lock:
+        statuses = [job.status for job in _jobs.values()]
+    return [('feedback_jobs', 'gauge', 'Feedback jobs held in this process by status',
+             [({'status': status}, statuses.count(status)) for status in (PENDING, RUNNING)])]
+
+
+register_collector(_feedback_metrics)
+
+
+def get_feedback_job(job_id):
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def cancel_feedback_job(job_id):
+    job = get_feedback_job(job_id)
+    if job is None:
+        return False
+    job.cancel()
+    return True
@@ -0,0 +1,278 @@
+"""Structured LLM feedback: the JSON schema, incremental parsing and validation.
+
+With FEEDBACK_FORMAT=json the model is asked for one JSON object (FEEDBACK_SCHEMA).
+FeedbackStreamParser picks top-level members out of the stream as they complete,
+so sections can be shown before generation ends. validate_feedback() turns the
+parsed object into a compact Feedback payload. FEEDBACK_FORMAT=text keeps the
+original free-form prompt and splits it on its headings (parse_text).
+"""
+import os
+import json
+from dataclasses import dataclass, field, asdict, fields as dataclass_fields
+
+FEEDBACK_FORMAT = os.getenv('FEEDBACK_FORMAT', 'json')  # json | text
+
+FEEDBACK_AREAS = (
+    'Content Structure & Section Coverage',
+    'Grammar, Tone & Clarity',
+    'Role Relevance & Personalization',
+    'Impact & Achievement Highlighting',
+    'Formatting & Readability',
+)
+
+FEEDBACK_SCHEMA = '''{
+  "summary": "2-3 sentence executive summary: overall impression and readiness for the job",
+  "score": <integer 0-100: how well the resume fits the job>,
+  "experience": "how the candidate's experience matches the role's requirements",
+  "strengths": ["2-3 key strengths"],
+  "gaps": ["red flags, gaps or missing requirements"],
+  "categories": [
+    {"name": "<area>", "suggestions": ["specific, actionable suggestion with an example"]}
+  ],
+  "verdict": "one-sentence final verdict"
+}'''
+
+# Payload limits; longer lists and strings are cut so results stay small in caches and sessions
+MAX_ITEMS = 8
+MAX_TEXT_CHARS = 1500
+
+
+class FeedbackFormatError(ValueError):
+    """The response is not a JSON object matching FEEDBACK_SCHEMA"""
+
+
+@dataclass
+class Feedback:
+    """Reviewer feedback. Unstructured responses (text format, or JSON that could not be
+    repaired) keep their text in notes instead of the structured fields."""
+    summary: str = ''
+    score: int = None
+    experience: str = ''
+    strengths: list = field(default_factory=list)
+    gaps: list = field(default_factory=list)
+    categories: list = field(default_factory=list)  # [{'name': area, 'suggestions': [...]}]
+    verdict: str = ''
+    notes: str = ''
+    structured: bool = True
+
+    def to_dict(self):
+        """Compact dict for caches and templates; empty fields are left out"""
+        return {k: v for k, v in asdict(self).items() if v not in ('', [], None)}
+
+    @classmethod
+    def from_dict(cls, data):
+        names = {f.name for f in dataclass_fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+
+class FeedbackStreamParser:
+    """Incremental scanner for a JSON object arriving in pieces.
+
+    feed() returns the top-level (key, value) members completed by the new text.
+    Text before the first '{' (prose, code fences) is skipped; once the object
+    closes, `complete` is set and object_text() returns exactly its source.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.fields = {}
+        self.start = None
+        self.end = None
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+    @property
+    def complete(self):
+        return self.end is not None
+
+    def object_text(self):
+        return self.text[self.start:self.end] if self.complete else None
+
+    def _close_member(self, i, completed):
+        if self._key is not None and self._value_start is not None:
+            try:
+                value = json.loads(self.text[self._value_start:i])
+            except ValueError:
+                pass  # validation reports the missing field
+            else:
+                self.fields[self._key] = value
+                completed.append((self._key, value))
+        self._key = None
+        self._value_start = None
+
+    def feed(self, piece):
+        self.text += piece
+        completed = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            if self.end is not None:
+                break
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        try:
+                            self._key = json.loads(text[self._key_start:i + 1])
+                        except ValueError:
+                            self._key = None
+                        self._key_start = None
+                continue
+            if self.start is None:
+                if c == '{':
+                    self.start = i
+                    self._depth = 1
+                continue
+            if c == '"':
+                self._in_string = True
+                # A string at the top level before any ':' is a member name
+                if self._depth == 1 and self._value_start is None:
+                    self._key_start = i
+            elif c in '{[':
+                self._depth += 1
+            elif c in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_member(i, completed)
+                    self.end = i + 1
+            elif self._depth == 1 and c == ':':
+                self._value_start = i + 1
+            elif self._depth == 1 and c == ',':
+                self._close_member(i, completed)
+        self._pos = len(text)
+        return completed
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        value = str(value)
+    return value.strip()[:MAX_TEXT_CHARS]
+
+
+def _items(value):
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return None
+    items = [_text(v) for v in value]
+    return [v for v in items if v][:MAX_ITEMS]
+
+
+def _score(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return max(0, min(100, int(round(float(value)))))
+    except (TypeError, ValueError):
+        return None
+
+
+def _categories(value):
+    # Models sometimes answer {"area": [...]} instead of a list of objects
+    if isinstance(value, dict):
+        value = [{'name': k, 'suggestions': v} for k, v in value.items()]
+    if not isinstance(value, list):
+        return None
+    categories = []
+    for item in value:
+        if not isinstance(item, dict):
+            continue
+        suggestions = _items(item.get('suggestions'))
+        if suggestions:
+            categories.append({'name': _text(item.get('name')) or 'General', 'suggestions': suggestions})
+    return categories[:len(FEEDBACK_AREAS) + 2]
+
+
+NORMALIZERS = {
+    'summary': _text,
+    'score': _score,
+    'experience': _text,
+    'strengths': _items,
+    'gaps': _items,
+    'categories': _categories,
+    'verdict': _text,
+}
+REQUIRED = ('summary', 'score', 'strengths', 'categories')
+
+
+def normalize_section(name, value):
+    """Cleaned value of one schema member, or None if it is unknown or unusable"""
+    normalizer = NORMALIZERS.get(name)
+    return normalizer(value) if normalizer else None
+
+
+def validate_feedback(obj, partial=False):
+    """Feedback from a parsed JSON object; raises FeedbackFormatError listing every problem.
+
+    partial=True accepts whatever members are usable (for truncated responses).
+    """
+    if not isinstance(obj, dict):
+        raise FeedbackFormatError(f'expected a JSON object, got {type(obj).__name__}')
+    values, problems = {}, []
+    for name in NORMALIZERS:
+        value = normalize_section(name, obj.get(name))
+        if value in (None, '', []):
+            if name in REQUIRED and not partial:
+                problems.append(f'"{name}" is missing or invalid')
+            continue
+        values[name] = value
+    if problems:
+        raise FeedbackFormatError('; '.join(problems))
+    return Feedback(**values)
+
+
+def parse_structured(response):
+    """Validated Feedback from a complete JSON response"""
+    parser = FeedbackStreamParser()
+    parser.feed(response or '')
+    if parser.start is None:
+        raise FeedbackFormatError('no JSON object in the response')
+    if not parser.complete:
+        raise FeedbackFormatError('the JSON object is incomplete')
+    try:
+        obj = json.loads(parser.object_text())
+    except ValueError as e:
+        raise FeedbackFormatError(f'invalid JSON: {e}')
+    return validate_feedback(obj)
+
+
+def partial_feedback(response):
+    """The usable members of a malformed or truncated JSON response, else the response as text"""
+    parser = FeedbackStreamParser()
+    parser.feed(response or '')
+    feedback = validate_feedback(parser.fields, partial=True)
+    if feedback.to_dict() == {'structured': True}:
+        return text_feedback(response)
+    return feedback
+
+
+def text_feedback(text):
+    return Feedback(notes=(text or '').strip(), structured=False)
+
+
+def parse_text(response):
+    """Split a free-form response on its "AI Suggestions" / "Summary" headings"""
+    sections, current = {}, None
+    for line in response.split('\n'):
+        if 'AI Suggestions' in line:
+            current = 'notes'
+        elif 'Summary' in line:
+            current = 'summary'
+        elif current:
+            sections.setdefault(current, []).append(line)
+    notes = '\n'.join(sections.get('notes', [])).strip()
+    summary = '\n'.join(sections.get('summary', [])).strip()
+    if not notes and not summary:
+        return text_feedback(response)
+    return Feedback(summary=summary, notes=notes, structured=False)
@@ -0,0 +1,253 @@
+"""Catalog of open roles: every job description is profiled once and reused for every candidate.
+
+Usage:
+    python -m app.jd_catalog add roles/                    # every .txt/.pdf file; role id = slug of the file name
+    python -m app.jd_catalog add backend.pdf --id backend --title "Backend Engineer"
+    python -m app.jd_catalog list
+    python -m app.jd_catalog remove backend
+    python -m app.jd_catalog match resume.pdf -k 5
+
+A role's profile holds its embedding, skill set, requirement sentences (with
+emphasis and skills, see coverage.job_requirements), skill weights and the
+ATS keyword vocabulary. Profiles are rows of a VectorStore at JD_CATALOG_PATH
+(embedding + profile metadata), so adding or changing one role appends one row
+and leaves the others alone. Re-adding unchanged text is a no-op (content
+hash). match() scores one resume against every role with one matrix-vector
+product for the embeddings and one role x skill matrix product for the
+weighted skill coverage.
+"""
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import logging
+import tempfile
+import threading
+import numpy as np
+from .vector_store import VectorStore
+from .coverage import job_requirements
+from .ats_rules import unique_word_count
+from .resume_utils import extract_text_from_pdf
+from .similarity_engine import get_embeddings, get_embeddings_batch, extract_skills, top_missing_skills, EMBEDDING_DIM
+
+logger = logging.getLogger(__name__)
+
+JD_CATALOG_PATH = os.getenv('JD_CATALOG_PATH', os.path.join(tempfile.gettempdir(), 'resume-reviewer-roles'))
+# Share of a role's match score that comes from weighted skill coverage (the rest is embedding similarity)
+MATCH_SKILL_WEIGHT = float(os.getenv('MATCH_SKILL_WEIGHT', '0.3'))
+# Bump when the profile contents change; older profiles are rebuilt the next time their role is added
+PROFILE_VERSION = '1'
+# Role ids are URL-safe slugs (they appear in /api/roles/<role_id>)
+ROLE_ID_MAX = 64
+ROLE_ID_RE = re.compile(r'[a-z0-9][a-z0-9_-]{0,%d}' % (ROLE_ID_MAX - 1))
+
+
+def role_slug(text):
+    """Default role id for a title or file name"""
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')[:ROLE_ID_MAX]
+
+
+def validate_role_id(role_id):
+    if not isinstance(role_id, str) or not ROLE_ID_RE.fullmatch(role_id):
+        raise ValueError(f'role_id must be 1-{ROLE_ID_MAX} characters of a-z, 0-9, "-" and "_", '
+                         f'starting with a letter or digit (got {role_id!r}).')
+
+
+def content_hash(title, text):
+    return hashlib.sha256(f'{PROFILE_VERSION}\x1f{title}\x1f{text}'.encode('utf-8')).hexdigest()[:16]
+
+
+def build_profile(title, text):
+    """Everything analysis needs from a JD except the embedding (which is the store row)"""
+    return dict(
+        job_requirements(text),
+        title=title,
+        text=text,
+        hash=content_hash(title, text),
+        skills=sorted(extract_skills(text)),
+        ats_vocabulary=unique_word_count(text),
+        updated_at=time.time(),
+    )
+
+
+class JobCatalog:
+    def __init__(self, path=JD_CATALOG_PATH):
+        self.store = VectorStore(path, dim=EMBEDDING_DIM)
+        self._lock = threading.Lock()
+        self._skill_index = None
+
+    def __len__(self):
+        return len(self.store)
+
+    def roles(self):
+        """Summaries of every role, in the order they were first added"""
+        return [{
+            'id': role_id,
+            'title': meta['title'],
+            'skills': meta['skills'],
+            'requirements': len(meta['requirements']),
+            'updated_at': meta['updated_at'],
+        } for role_id, meta in self.store.items()]
+
+    def get(self, role_id):
+        """The role's profile with its 'embedding', or None"""
+        item = self.store.get(role_id)
+        if item is None:
+            return None
+        embedding, meta = item
+        return dict(meta, id=role_id, embedding=embedding)
+
+    def add(self, roles):
+        """Profile and store [(role_id, title, text)]; unchanged roles are skipped.
+
+        New and changed roles are embedded in one batch. Returns {'added': [...], 'unchanged': [...]}.
+        Raises ValueError, before anything is stored, if a role id is not a valid slug.
+        """
+        roles = list(roles)
+        for role_id, _, _ in roles:
+            validate_role_id(role_id)
+        pending, unchanged = [], []
+        for role_id, title, text in roles:
+            existing = self.store.get(role_id)
+            if existing is not None and existing[1].get('hash') == content_hash(title, text):
+                unchanged.append(role_id)
+            else:
+                pending.append((role_id, title, text))
+        if pending:
+            embeddings = get_embeddings_batch([text for _, _, text in pending])
+            profiles = [build_profile(title, text) for _, title, text in pending]
+            self.store.add([role_id for role_id, _, _ in pending], embeddings, profiles)
+            logger.info(f"Catalog: profiled {len(pending)} role(s), {len(unchanged)} unchanged")
+        return {'added': [role_id for role_id, _, _ in pending], 'unchanged': unchanged}
+
+    def remove(self, role_ids):
+        return self.store.delete(role_ids)
+
+    def _skills(self):
+        """(role ids, {skill: column}, role x skill weight matrix), rebuilt when the catalog changes"""
+        items = self.store.items()
+        key = tuple((role_id, meta['hash']) for role_id, meta in items)
+        with self._lock:
+            if self._skill_index is None or self._skill_index[0] != key:
+                columns = {}
+                for _, meta in items:
+                    for skill in meta['skill_weights']:
+                        columns.setdefault(skill, len(columns))
+                weights = np.zeros((len(items), len(columns)), dtype=np.float32)
+                for row, (_, meta) in enumerate(items):
+                    for skill, weight in meta['skill_weights'].items():
+                        weights[row, columns[skill]] = weight
+                self._skill_index = (key, [role_id for role_id, _ in items], columns, weights)
+            return self._skill_index[1:]
+
+    def match(self, resume_text, k=10):
+        """Roles ranked for one resume: [{'id', 'title', 'match_score', 'fit_score', 'skill_coverage',
+        'matched_skills', 'missing_skills'}], best first"""
+        role_ids, columns, weights = self._skills()
+        if not role_ids:
+            return []
+        resume_skills = set(extract_skills(resume_text))
+        # Embedding similarity to every role in one exact pass over the store
+        similarity = {hit['id']: hit['score'] for hit in
+                      self.store.search(get_embeddings(resume_text), k=len(role_ids), exact=True)}
+        fit = np.array([similarity.get(role_id, 0.0) for role_id in role_ids], dtype=np.float32)
+        has_skill = np.zeros(len(columns), dtype=np.float32)
+        for skill in resume_skills:
+            if skill in columns:
+                has_skill[columns[skill]] = 1.0
+        totals = weights.sum(axis=1)
+        # Roles without any skills are scored on similarity alone
+        skill_coverage = np.where(totals > 0, (weights @ has_skill) / np.where(totals > 0, totals, 1.0), fit)
+        scores = (1 - MATCH_SKILL_WEIGHT) * fit + MATCH_SKILL_WEIGHT * skill_coverage
+        results = []
+        for row in np.argsort(-scores)[:k]:
+            meta = self.store.get(role_ids[row])[1]
+            jd_skills = set(meta['skills'])
+            results.append({
+                'id': role_ids[row],
+                'title': meta['title'],
+                'match_score': max(0, min(100, int(round(float(scores[row]) * 100)))),
+                'fit_score': max(0, min(100, int(float(fit[row]) * 100))),
+                'skill_coverage': int(round(float(skill_coverage[row]) * 100)),
+                'matched_skills': sorted(jd_skills & resume_skills),
+                'missing_skills': top_missing_skills(jd_skills, resume_skills, limit=10, weights=meta['skill_weights']),
+            })
+        return results
+
+
+_catalog = None
+
+
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        _catalog = JobCatalog()
+    return _catalog
+
+
+def _read_text(path):
+    # Line breaks are kept: requirement headings and bullets are found line by line
+    if path.lower().endswith('.pdf'):
+        return extract_text_from_pdf(path)
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+
+def _role_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(('.txt', '.pdf')):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Manage the catalog of open roles.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    add = sub.add_parser('add', help='Add or update roles from .txt/.pdf files or directories')
+    add.add_argument('paths', nargs='+')
+    add.add_argument('--id', help='Role id (single file only; defaults to the file name)')
+    add.add_argument('--title', help='Role title (single file only; defaults to the first line)')
+    sub.add_parser('list', help='List the roles')
+    remove = sub.add_parser('remove', help='Remove roles')
+    remove.add_argument('ids', nargs='+')
+    match = sub.add_parser('match', help='Rank the roles for a resume')
+    match.add_argument('resume')
+    match.add_argument('-k', type=int, default=10)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    catalog = get_catalog()
+
+    if args.command == 'add':
+        files = list(_role_files(args.paths))
+        if (args.id or args.title) and len(files) != 1:
+            parser.error('--id and --title need exactly one file')
+        roles = []
+        for path in files:
+            text = _read_text(path)
+            role_id = args.id or role_slug(os.path.splitext(os.path.basename(path))[0])
+            title = args.title or next((line.strip() for line in text.splitlines() if line.strip()), role_id)
+            roles.append((role_id, title[:200], text))
+        try:
+            result = catalog.add(roles)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Added {len(result['added'])}, unchanged {len(result['unchanged'])}, catalog size {len(catalog)}")
+    elif args.command == 'list':
+        for role in catalog.roles():
+            print(f"{role['id']:<24} {role['title'][:50]:<50} {len(role['skills']):>3} skills")
+    elif args.command == 'remove':
+        print(f"Removed {catalog.remove(args.ids)}")
+    else:
+        for result in catalog.match(_read_text(args.resume), k=args.k):
+            print(json.dumps(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
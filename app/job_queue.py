@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_DB = os.getenv('JOB_QUEUE_DB', os.path.join(tempfile.gettempdir(), 'resume-reviewer-jobs.sqlite3'))
+MAX_QUEUE_DEPTH = int(os.getenv('MAX_QUEUE_DEPTH', '32'))
+JOB_TIMEOUT = float(os.getenv('JOB_TIMEOUT', '120'))
+# Jobs whose worker still heartbeats get this long before they are failed anyway
+JOB_MAX_RUNTIME = float(os.getenv('JOB_MAX_RUNTIME', '1800'))
+JOB_RESULT_TTL = float(os.getenv('JOB_RESULT_TTL', '3600'))
+WORKER_HEARTBEAT_TTL = 30
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds MAX_QUEUE_DEPTH unfinished jobs"""
+
+
+class JobQueue:
+    """Analysis jobs in a SQLite file shared by the web workers and the analysis worker pool"""
+
+    def __init__(self, path=JOB_QUEUE_DB, max_depth=MAX_QUEUE_DEPTH):
+        self.path = path
+        self.max_depth = max_depth
+        self._local = threading.local()
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, '
+            'payload TEXT NOT NULL, result TEXT, error TEXT, worker TEXT, '
+            'enqueued_at REAL NOT NULL, started_at REAL, finished_at REAL)'
+        )
+        self._connect().execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, enqueued_at)')
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS workers ('
+            'name TEXT PRIMARY KEY, pid INTEGER, status TEXT NOT NULL, heartbeat_at REAL NOT NULL)'
+        )
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS metrics ('
+            'process TEXT PRIMARY KEY, snapshot TEXT NOT NULL, published_at REAL NOT NULL)'
+        )
+
+    def _connect(self):
+        # One connection per thread and per process (connections must not cross a fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def depth(self):
+        """Number of queued plus running jobs"""
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)', (QUEUED, RUNNING)
+        ).fetchone()[0]
+
+    def enqueue(self, payload, kind='analysis'):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            depth = conn.execute(
+                'SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)', (QUEUED, RUNNING)
+            ).fetchone()[0]
+            if depth >= self.max_depth:
+                raise QueueFull(f'{depth} jobs pending')
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                'INSERT INTO jobs (id, kind, status, payload, enqueued_at) VALUES (?, ?, ?, ?, ?)',
+                (job_id, kind, QUEUED, json.dumps(payload), time.time()),
+            )
+            conn.execute('COMMIT')
+            return job_id
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def claim(self, worker):
+        """Atomically take the oldest queued job; returns (id, kind, payload) or None"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT id, kind, payload FROM jobs WHERE status = ? ORDER BY enqueued_at LIMIT 1', (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    'UPDATE jobs SET status = ?, worker = ?, started_at = ? WHERE id = ?',
+                    (RUNNING, worker, time.time(), row['id']),
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        if row is None:
+            return None
+        return row['id'], row['kind'], json.loads(row['payload'])
+
+    def complete(self, job_id, result):
+        """Store the result of a running job; False if it was already failed (e.g. as stale)"""
+        return self._connect().execute(
+            'UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE id = ? AND status = ?',
+            (DONE, json.dumps(result), time.time(), job_id, RUNNING),
+        ).rowcount > 0
+
+    def fail(self, job_id, error):
+        """Mark a running job failed; False if it had already finished"""
+        return self._connect().execute(
+            'UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?',
+            (FAILED, str(error), time.time(), job_id, RUNNING),
+        ).rowcount > 0
+
+    def get(self, job_id):
+        row = self._connect().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        job['timings'] = {
+            'queue_wait': round(job['started_at'] - job['enqueued_at'], 4) if job['started_at'] else None,
+            'run': round(job['finished_at'] - job['started_at'], 4) if job['finished_at'] and job['started_at'] else None,
+        }
+        return job
+
+    def fail_stale(self, timeout=JOB_TIMEOUT, max_runtime=JOB_MAX_RUNTIME, max_age=WORKER_HEARTBEAT_TTL):
+        """Mark jobs running longer than timeout whose worker stopped heartbeating (it died) as failed.
+
+        Jobs of a live worker (e.g. a large batch) keep running up to max_runtime.
+        """
+        now = time.time()
+        self._connect().execute(
+            'UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status = ? AND ('
+            'started_at < ? OR (started_at < ? AND worker NOT IN '
+            '(SELECT name FROM workers WHERE heartbeat_at > ?)))',
+            (FAILED, f'Timed out after {timeout:.0f}s', now, RUNNING,
+             now - max_runtime, now - timeout, now - max_age),
+        )
+
+    def heartbeat(self, name, status):
+        """Record that a worker is alive; status is a JSON-serializable dict (model state, timings)"""
+        self._connect().execute(
+            'INSERT OR REPLACE INTO workers (name, pid, status, heartbeat_at) VALUES (?, ?, ?, ?)',
+            (name, os.getpid(), json.dumps(status), time.time()),
+        )
+
+    def workers(self, max_age=WORKER_HEARTBEAT_TTL):
+        """Workers that sent a heartbeat within max_age seconds"""
+        rows = self._connect().execute(
+            'SELECT name, pid, status, heartbeat_at FROM workers WHERE heartbeat_at > ?', (time.time() - max_age,)
+        ).fetchall()
+        return [dict(row, status=json.loads(row['status'])) for row in rows]
+
+    def publish_metrics(self, process, snapshot):
+        """Store a process's metrics snapshot (see metrics.Registry.snapshot) for /metrics"""
+        self._connect().execute(
+            'INSERT OR REPLACE INTO metrics (process, snapshot, published_at) VALUES (?, ?, ?)',
+            (process, json.dumps(snapshot), time.time()),
+        )
+
+    def metrics_snapshots(self, max_age=WORKER_HEARTBEAT_TTL):
+        """{process: snapshot} of processes that published within max_age seconds"""
+        rows = self._connect().execute(
+            'SELECT process, snapshot FROM metrics WHERE published_at > ?', (time.time() - max_age,)
+        ).fetchall()
+        return {row['process']: json.loads(row['snapshot']) for row in rows}
+
+    def purge(self, ttl=JOB_RESULT_TTL):
+        """Delete finished jobs older than ttl"""
+        self._connect().execute(
+            'DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?', (DONE, FAILED, time.time() - ttl)
+        )
+        self._connect().execute('DELETE FROM workers WHERE heartbeat_at < ?', (time.time() - ttl,))
+        self._connect().execute('DELETE FROM metrics WHERE published_at < ?', (time.time() - ttl,))
+
+
+_queue = None
+
+
+def get_queue():
+    global _queue
+    if _queue is None:
+        _queue = JobQueue()
+    return _queue
@@ -0,0 +1,270 @@
+"""LLM providers for feedback generation.
+
+A provider turns a prompt into text, either at once (complete) or as a stream
+of pieces (stream). feedback_generator.get_provider() wraps the configured
+provider in ResilientProvider. The wrapper bounds concurrent calls, retries
+transient failures with jittered exponential backoff, and opens a circuit
+breaker after repeated failures so a dead provider fails fast instead of
+holding up pages.
+
+LLM_PROVIDER:
+    huggingface   Hugging Face Inference Providers (HF_TOKEN, LLM_MODEL); one pooled client per process
+    local         deterministic offline stand-in (no network), for load tests and development
+"""
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'huggingface')
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '60'))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+# Seconds a call may wait for a concurrency slot before failing
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '30'))
+LLM_RETRIES = int(os.getenv('LLM_RETRIES', '2'))
+LLM_RETRY_BACKOFF = float(os.getenv('LLM_RETRY_BACKOFF', '0.5'))
+LLM_BREAKER_THRESHOLD = int(os.getenv('LLM_BREAKER_THRESHOLD', '5'))
+LLM_BREAKER_COOLDOWN = float(os.getenv('LLM_BREAKER_COOLDOWN', '30'))
+
+# Local stand-in: optional canned response file, simulated time to first token and streaming speed
+LOCAL_LLM_FIXTURE = os.getenv('LOCAL_LLM_FIXTURE')
+LOCAL_LLM_LATENCY = float(os.getenv('LOCAL_LLM_LATENCY', '0.2'))
+LOCAL_LLM_TOKENS_PER_SECOND = float(os.getenv('LOCAL_LLM_TOKENS_PER_SECOND', '200'))
+
+RETRYABLE_STATUS = (408, 425, 429, 500, 502, 503, 504)
+
+
+class ProviderError(Exception):
+    pass
+
+
+class ProviderBusy(ProviderError):
+    """No concurrency slot became free within LLM_QUEUE_TIMEOUT"""
+
+
+class CircuitOpen(ProviderError):
+    """The provider failed repeatedly and is not being called until the cooldown passes"""
+
+
+def is_retryable(e):
+    """Timeouts, connection errors, rate limits and 5xx are worth retrying; auth/validation errors are not"""
+    status = getattr(getattr(e, 'response', None), 'status_code', None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return isinstance(e, (TimeoutError, ConnectionError, OSError)) or 'timed out' in str(e).lower()
+
+
+class HuggingFaceProvider:
+    name = 'huggingface'
+
+    def __init__(self, model, token, provider='novita', timeout=LLM_TIMEOUT):
+        self.model = model
+        self.model_id = model
+        self.token = token
+        self.provider = provider
+        self.timeout = timeout
+        self._client = None
+        self._client_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        # One client per process (re-created after fork); it keeps HTTP connections alive between calls
+        with self._lock:
+            if self._client is None or self._client_pid != os.getpid():
+                from huggingface_hub import InferenceClient
+                self._client = InferenceClient(provider=self.provider, api_key=self.token, timeout=self.timeout)
+                self._client_pid = os.getpid()
+            return self._client
+
+    def _messages(self, prompt):
+        return [{"role": "user", "content": prompt}]
+
+    def complete(self, prompt):
+        completion = self.client.chat.completions.create(model=self.model, messages=self._messages(prompt))
+        message = completion.choices[0].message
+        return message.content if hasattr(message, 'content') else str(message)
+
+    def stream(self, prompt):
+        stream = self.client.chat.completions.create(model=self.model, messages=self._messages(prompt), stream=True)
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+class LocalProvider:
+    """Deterministic offline stand-in: the same prompt always yields the same response.
+
+    Responses follow the real prompt's format (a JSON object when the prompt asks
+    for JSON, else AI Suggestions / Summary headings), or come from LOCAL_LLM_FIXTURE, and are streamed word by word at a
+    configurable speed so latency-sensitive code paths behave realistically.
+    """
+    name = 'local'
+    model_id = 'local-standin'
+
+    def __init__(self, fixture=LOCAL_LLM_FIXTURE, latency=LOCAL_LLM_LATENCY, tokens_per_second=LOCAL_LLM_TOKENS_PER_SECOND):
+        self.fixture = None
+        if fixture:
+            with open(fixture, encoding='utf-8') as f:
+                self.fixture = f.read()
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+
+    def respond(self, prompt):
+        if self.fixture is not None:
+            return self.fixture
+        seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        words = sorted({w.strip('.,:;()').lower() for w in prompt.split() if len(w) > 6 and w.strip('.,:;()').isalpha()})
+        focus = rng.sample(words, min(3, len(words))) if words else ['impact']
+        areas = ['Content Structure & Section Coverage', 'Grammar, Tone & Clarity',
+                 'Role Relevance & Personalization', 'Impact & Achievement Highlighting',
+                 'Formatting & Readability']
+        readiness = rng.randint(55, 90)
+        if 'JSON' in prompt:
+            return json.dumps({
+                'summary': f'Solid match ({readiness}% readiness) with relevant {focus[0]} experience.',
+                'score': readiness,
+                'experience': f'Experience with {", ".join(focus)} lines up with the role.',
+                'strengths': focus,
+                'gaps': ['Few quantified results'],
+                'categories': [{'name': area, 'suggestions': [f'Emphasize {rng.choice(focus)} with a concrete, quantified example.']}
+                               for area in areas],
+                'verdict': 'Worth an interview after tailoring the resume to the job description.',
+            }, indent=1)
+        lines = ['**AI Suggestions**']
+        for area in areas:
+            lines.append(f'- **{area}**: Emphasize {rng.choice(focus)} with a concrete, quantified example.')
+        lines += ['', '**Summary**',
+                  f'- Overall impression: solid match ({readiness}% readiness).',
+                  f'- Strengths: {", ".join(focus)}.',
+                  '- Improve: quantify results and mirror the job description wording.']
+        return '\n'.join(lines)
+
+    def complete(self, prompt):
+        response = self.respond(prompt)
+        time.sleep(self.latency + len(response.split()) / self.tokens_per_second)
+        return response
+
+    def stream(self, prompt):
+        time.sleep(self.latency)
+        for word in self.respond(prompt).split(' '):
+            time.sleep(1 / self.tokens_per_second)
+            yield word + ' '
+
+
+class ResilientProvider:
+    """Concurrency limit, retries with jitter and a circuit breaker around any provider"""
+
+    def __init__(self, provider, max_concurrency=LLM_MAX_CONCURRENCY, retries=LLM_RETRIES,
+                 backoff=LLM_RETRY_BACKOFF, breaker_threshold=LLM_BREAKER_THRESHOLD,
+                 breaker_cooldown=LLM_BREAKER_COOLDOWN, queue_timeout=LLM_QUEUE_TIMEOUT):
+        self.provider = provider
+        self.name = provider.name
+        self.model_id = provider.model_id
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self.stats = {'calls': 0, 'retries': 0, 'failures': 0, 'rejected': 0}
+
+    def _check_breaker(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.time() - self._opened_at < self.breaker_cooldown:
+                self.stats['rejected'] += 1
+                raise CircuitOpen(f'{self.name} is unavailable; retrying after {self.breaker_cooldown:.0f}s cooldown')
+            # Half-open: let this call through as a probe; a failure re-opens the circuit
+            self._opened_at = None
+            self._failures = self.breaker_threshold - 1
+
+    def _record(self, ok):
+        with self._lock:
+            if ok:
+                self._failures = 0
+                return
+            self.stats['failures'] += 1
+            self._failures += 1
+            if self._failures >= self.breaker_threshold and self._opened_at is None:
+                self._opened_at = time.time()
+                logger.warning(f"LLM circuit opened after {self._failures} consecutive failures")
+
+    def _sleep_before_retry(self, attempt):
+        # Full jitter: uniform in [0, backoff * 2^attempt]
+        self.stats['retries'] += 1
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise ProviderBusy(f'All {self.name} slots busy for {self.queue_timeout:.0f}s')
+
+    def complete(self, prompt):
+        self._check_breaker()
+        self._acquire()
+        try:
+            for attempt in range(self.retries + 1):
+                self.stats['calls'] += 1
+                try:
+                    response = self.provider.complete(prompt)
+                except Exception as e:
+                    self._record(False)
+                    if attempt == self.retries or not is_retryable(e) or self._opened_at is not None:
+                        raise
+                    logger.warning(f"LLM call failed ({e}); retrying")
+                    self._sleep_before_retry(attempt)
+                    continue
+                self._record(True)
+                return response
+        finally:
+            self._slots.release()
+
+    def stream(self, prompt):
+        """Stream pieces; a failed call is retried only until its first piece was yielded"""
+        self._check_breaker()
+        self._acquire()
+        try:
+            for attempt in range(self.retries + 1):
+                self.stats['calls'] += 1
+                started = False
+                try:
+                    for piece in self.provider.stream(prompt):
+                        started = True
+                        yield piece
+                except Exception as e:
+                    self._record(False)
+                    if started or attempt == self.retries or not is_retryable(e) or self._opened_at is not None:
+                        raise
+                    logger.warning(f"LLM stream failed ({e}); retrying")
+                    self._sleep_before_retry(attempt)
+                    continue
+                self._record(True)
+                return
+        finally:
+            self._slots.release()
+
+    def status(self):
+        with self._lock:
+            return dict(self.stats, provider=self.name, model=self.model_id,
+                        circuit='open' if self._opened_at is not None else 'closed')
+
+
+def create_provider(name=LLM_PROVIDER, model=None, token=None):
+    if name == 'huggingface':
+        return HuggingFaceProvider(model, token)
+    if name == 'local':
+        return LocalProvider()
+    raise ValueError(f"Unknown LLM provider {name!r} (expected 'huggingface' or 'local')")
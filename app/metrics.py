@@ -0,0 +1,311 @@
+"""Counters, gauges, histograms and timing spans, exposed in Prometheus text format.
+
+Every process keeps its own registry. Analysis workers publish a snapshot with
+their heartbeat and web workers publish one every METRICS_PUBLISH_INTERVAL
+seconds (both through the job queue database). /metrics renders the scraping
+process's live registry plus every other process's latest snapshot, each series
+labelled with its process, so one scrape covers stages that run in the worker
+pool; aggregate with sum() by the other labels.
+
+    with span('embed', timings):   # stage_seconds{stage="embed"}, and timings['embed'] = seconds
+        ...
+
+SamplingProfiler samples one thread's stack at a fixed interval and aggregates
+collapsed stacks (flamegraph.pl / speedscope input); routes enables it per
+request with ?profile=1 when PROFILE_REQUESTS=1.
+"""
+import os
+import sys
+import math
+import time
+import logging
+import threading
+from collections import Counter as StackCounter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+METRICS_PREFIX = 'resume_reviewer_'
+METRICS_PUBLISH_INTERVAL = float(os.getenv('METRICS_PUBLISH_INTERVAL', '5'))
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f'expected labels {labelnames}, got {tuple(labels)}')
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = METRICS_PREFIX + name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+
+    def labels(self, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+            return child
+
+    def _default(self):
+        # Metrics without labels act as their own single child
+        return self.labels()
+
+    def samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        samples = []
+        for key, child in children:
+            labels = dict(zip(self.labelnames, key))
+            samples.extend(child.samples(labels))
+        return samples
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self, labels):
+        return [['', labels, self.value]]
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def samples(self, labels):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        samples, cumulative = [], 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            samples.append(['_bucket', dict(labels, le='+Inf' if bound == math.inf else repr(float(bound))), cumulative])
+        samples.append(['_sum', labels, total])
+        samples.append(['_count', labels, cumulative])
+        return samples
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != math.inf:
+            self.buckets += (math.inf,)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f'{name} is already registered as a {metric.type}')
+            return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def register_collector(self, collector):
+        """collector() returns [(name, type, help, [(labels, value), ...]), ...], read at snapshot time"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def snapshot(self):
+        """JSON-serializable {name: {'type', 'help', 'samples': [[suffix, labels, value], ...]}}"""
+        with self._lock:
+            metrics, collectors = list(self._metrics.values()), list(self._collectors)
+        families = {m.name: {'type': m.type, 'help': m.help, 'samples': m.samples()} for m in metrics}
+        for collector in collectors:
+            try:
+                for name, type, help, samples in collector():
+                    families[METRICS_PREFIX + name] = {
+                        'type': type, 'help': help, 'samples': [['', labels, value] for labels, value in samples],
+                    }
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return families
+
+
+registry = Registry()
+counter = registry.counter
+gauge = registry.gauge
+histogram = registry.histogram
+register_collector = registry.register_collector
+
+STAGE_SECONDS = histogram('stage_seconds', 'Time spent per pipeline stage', ('stage',))
+
+_last_publish = 0.0
+
+
+@contextmanager
+def span(stage, timings=None):
+    """Time a block as stage_seconds{stage}; also stores the seconds in timings[stage] if given"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+        if timings is not None:
+            timings[stage] = elapsed
+
+
+def publish_due():
+    """True at most once per METRICS_PUBLISH_INTERVAL in this process"""
+    global _last_publish
+    now = time.time()
+    if now - _last_publish < METRICS_PUBLISH_INTERVAL:
+        return False
+    _last_publish = now
+    return True
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    if value is None:
+        return 'NaN'
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def exposition(snapshots, extra=None):
+    """Prometheus text format for {process: snapshot}; extra families are rendered without a process label"""
+    merged = {}
+    for process, families in snapshots.items():
+        for name, family in families.items():
+            entry = merged.setdefault(name, {'type': family['type'], 'help': family['help'], 'samples': []})
+            entry['samples'].extend([suffix, dict(labels, process=process), value]
+                                    for suffix, labels, value in family['samples'])
+    for name, family in (extra or {}).items():
+        merged[name] = family
+    lines = []
+    for name in sorted(merged):
+        family = merged[name]
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for suffix, labels, value in family['samples']:
+            label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{suffix}{{{label_text}}} {_format_value(value)}" if label_text
+                         else f"{name}{suffix} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack every interval seconds from a background thread.
+
+    Cheap enough to leave on for a single request; the result is a count per
+    collapsed stack ("outer;inner;leaf"), see collapsed().
+    """
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = StackCounter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, name='profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def collapsed(self):
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common()) + '\n'
+
+    def top(self, n=5):
+        """The n most sampled leaf frames with their share of samples"""
+        total = sum(self.stacks.values()) or 1
+        leaves = StackCounter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return [(frame, round(count / total, 3)) for frame, count in leaves.most_common(n)]
@@ -0,0 +1,143 @@
+import io
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTTextContainer, LTRect, LTLine
+from pdfminer.pdfpage import PDFPage
+
+logger = logging.getLogger(__name__)
+
+MAX_PDF_PAGES = int(os.getenv('MAX_PDF_PAGES', '20'))
+MAX_PDF_BYTES = int(os.getenv('MAX_PDF_BYTES', str(10 * 1024 * 1024)))
+# Pages are fanned out over a process pool for documents with at least this many pages (0 disables the pool)
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', '0'))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '4'))
+# Share of the page height treated as header / footer region
+HEADER_FOOTER_MARGIN = 0.08
+
+
+class PdfTooLarge(Exception):
+    pass
+
+
+def _analyze_page(number, page):
+    """Text plus layout signals (columns, table rules, header/footer text) of one LTPage"""
+    width, height = page.width or 1, page.height or 1
+    boxes = []
+    rules = 0
+    for element in page:
+        if isinstance(element, LTTextContainer):
+            text = element.get_text()
+            if text.strip():
+                boxes.append((element.x0, element.y0, element.x1, element.y1, text))
+        elif isinstance(element, (LTRect, LTLine)):
+            rules += 1
+
+    header = [b[4] for b in boxes if b[1] > height * (1 - HEADER_FOOTER_MARGIN)]
+    footer = [b[4] for b in boxes if b[3] < height * HEADER_FOOTER_MARGIN]
+
+    # Two columns: substantial text entirely in the left half and entirely in the right half
+    left = sum(len(b[4]) for b in boxes if b[2] <= width * 0.55)
+    right = sum(len(b[4]) for b in boxes if b[0] >= width * 0.45)
+    total = sum(len(b[4]) for b in boxes) or 1
+    columns = 2 if left / total > 0.2 and right / total > 0.2 else 1
+
+    # Table: ruled grid, or several rows of three or more boxes sharing a baseline
+    rows = {}
+    for b in boxes:
+        rows.setdefault(round(b[1]), []).append(b)
+    aligned_rows = sum(1 for r in rows.values() if len(r) >= 3)
+    table = rules >= 6 or aligned_rows >= 3
+
+    return {
+        'number': number,
+        'text': ''.join(b[4] for b in boxes) + '\f',
+        'columns': columns,
+        'table': table,
+        'header_text': ' '.join(header).strip(),
+        'footer_text': ' '.join(footer).strip(),
+    }
+
+
+def iter_pages(fp, page_numbers=None, max_pages=MAX_PDF_PAGES):
+    """Lazily yield one analyzed page at a time; only the current page's layout is held in memory"""
+    pages = extract_pages(fp, page_numbers=page_numbers, maxpages=max_pages, laparams=LAParams())
+    for i, page in enumerate(pages):
+        yield _analyze_page(page_numbers[i] if page_numbers else i, page)
+
+
+def _extract_page_range(data, page_numbers):
+    # Runs in a pool process
+    return list(iter_pages(io.BytesIO(data), page_numbers=page_numbers, max_pages=0))
+
+
+_pool = None
+_pool_pid = None
+
+
+def _get_pool():
+    """Page pool for this process, or None where child processes are not allowed (daemonic workers)"""
+    global _pool, _pool_pid
+    if multiprocessing.current_process().daemon:
+        return None
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def shutdown_pool():
+    """Stop this process's page pool; a process exiting with an idle pool would wait on it forever"""
+    global _pool
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.shutdown(wait=True, cancel_futures=True)
+    _pool = None
+
+
+def count_pages(fp):
+    count = sum(1 for _ in PDFPage.get_pages(fp))
+    fp.seek(0)
+    return count
+
+
+def summarize_layout(pages, page_count):
+    """Document-level layout signals used by the ATS check"""
+    return {
+        'pages': page_count,
+        'truncated': page_count > len(pages),
+        'multi_column_pages': sum(1 for p in pages if p['columns'] > 1),
+        'table_pages': sum(1 for p in pages if p['table']),
+        'header_text': ' '.join(p['header_text'] for p in pages if p['header_text']),
+        'footer_text': ' '.join(p['footer_text'] for p in pages if p['footer_text']),
+    }
+
+
+def extract_pdf(source, max_pages=MAX_PDF_PAGES):
+    """Extract text and layout from a PDF path, bytes or binary file object.
+
+    Returns (text, layout). Raises PdfTooLarge above MAX_PDF_BYTES; pages past
+    max_pages are skipped and reported as truncated.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        data = bytes(source)
+    elif isinstance(source, str):
+        with open(source, 'rb') as f:
+            data = f.read(MAX_PDF_BYTES + 1)
+    else:
+        data = source.read(MAX_PDF_BYTES + 1)
+    if len(data) > MAX_PDF_BYTES:
+        raise PdfTooLarge(f'PDF is larger than {MAX_PDF_BYTES // (1024 * 1024)} MB')
+
+    fp = io.BytesIO(data)
+    page_count = count_pages(fp)
+    wanted = min(page_count, max_pages) if max_pages else page_count
+    pool = _get_pool() if PDF_WORKERS and wanted >= PDF_PARALLEL_MIN_PAGES else None
+    if pool is not None:
+        step = -(-wanted // PDF_WORKERS)
+        ranges = [list(range(i, min(i + step, wanted))) for i in range(0, wanted, step)]
+        pages = [p for part in pool.map(_extract_page_range, [data] * len(ranges), ranges) for p in part]
+    else:
+        pages = list(iter_pages(fp, max_pages=wanted))
+    return ''.join(p['text'] for p in pages), summarize_layout(pages, page_count)
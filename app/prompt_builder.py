@@ -0,0 +1,133 @@
+"""Token-budgeted feedback prompts.
+
+build_feedback_prompt() fills PROMPT_TEMPLATE and, if the result would exceed
+PROMPT_TOKEN_BUDGET, condenses the inputs by priority:
+    1. boilerplate job-description sentences (EEO statements, benefits, "about us") are dropped;
+    2. the job description is capped at PROMPT_JOB_SHARE of the space left for documents
+       (more if the resume is short);
+    3. resume chunks are ranked by embedding similarity to the job description
+       (weighted by section, see SECTION_WEIGHTS) and kept best-first until the
+       budget is met, then re-emitted in document order under their section headers.
+Short documents take the fast path and are never embedded.
+"""
+import os
+import re
+import logging
+import threading
+import numpy as np
+from .chunking import chunk_text, split_sentences
+from .feedback_generator import PROMPT_TEMPLATE, LLM_MODEL, HF_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# Input tokens for the whole prompt; Llama-3-8B has an 8k context and needs room for the answer
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '6000'))
+# Largest share of the document budget the job description may take (the resume gets the rest)
+PROMPT_JOB_SHARE = float(os.getenv('PROMPT_JOB_SHARE', '0.35'))
+PROMPT_CHUNK_WORDS = 80
+# Hugging Face tokenizer used for counting; 'approx' skips loading one (~4 characters per token)
+PROMPT_TOKENIZER = os.getenv('PROMPT_TOKENIZER', LLM_MODEL)
+
+JOB_BOILERPLATE_RE = re.compile(
+    r'equal opportunity|eeo\b|without regard to|reasonable accommodation|we offer|benefits include|'
+    r'about us|our mission|apply now|how to apply|privacy (?:notice|policy)|e-?verify|'
+    r'salary range|compensation range|401\(?k\)?|paid time off|pto\b',
+    re.IGNORECASE,
+)
+
+_tokenizer = None
+_tokenizer_loaded = False
+_tokenizer_lock = threading.Lock()
+
+
+def _get_tokenizer():
+    global _tokenizer, _tokenizer_loaded
+    with _tokenizer_lock:
+        if not _tokenizer_loaded:
+            _tokenizer_loaded = True
+            if PROMPT_TOKENIZER != 'approx':
+                try:
+                    from transformers import AutoTokenizer
+                    _tokenizer = AutoTokenizer.from_pretrained(PROMPT_TOKENIZER, token=HF_TOKEN)
+                except Exception as e:
+                    logger.warning(f"Could not load tokenizer {PROMPT_TOKENIZER} ({e}); estimating token counts")
+        return _tokenizer
+
+
+def count_tokens(text):
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return (len(text) + 3) // 4
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def condense_job(job_text, budget):
+    """Job description without boilerplate sentences, truncated at a sentence boundary to budget tokens"""
+    kept, used = [], 0
+    for sentence in split_sentences(job_text):
+        if JOB_BOILERPLATE_RE.search(sentence):
+            continue
+        tokens = count_tokens(sentence) + 1
+        if used + tokens > budget:
+            # Keep the part of the last sentence that still fits
+            words = sentence.split()
+            words = words[:len(words) * (budget - used) // tokens]
+            if words:
+                kept.append(' '.join(words))
+            break
+        kept.append(sentence)
+        used += tokens
+    return '\n'.join(kept)
+
+
+def condense_resume(resume_text, job_text, budget):
+    """Resume chunks most relevant to the job that fit in budget tokens; returns (text, dropped chunks)"""
+    # Embedding models are only needed on this slow path
+    from .similarity_engine import encode_texts, get_embeddings, cosine_similarity_matrix, SECTION_WEIGHTS
+    chunks = chunk_text(resume_text, PROMPT_CHUNK_WORDS) or [('body', resume_text)]
+    scores = cosine_similarity_matrix(encode_texts([c for _, c in chunks]), get_embeddings(job_text))
+    priority = [score * SECTION_WEIGHTS.get(section, 1.0) for (section, _), score in zip(chunks, scores)]
+    keep, used = set(), 0
+    for i in np.argsort(priority)[::-1]:
+        tokens = count_tokens(chunks[i][1]) + 2
+        if used + tokens <= budget:
+            keep.add(int(i))
+            used += tokens
+    lines, section = [], None
+    for i, (chunk_section, chunk) in enumerate(chunks):
+        if i not in keep:
+            continue
+        if chunk_section != section and chunk_section != 'body':
+            lines.append(f'{chunk_section.upper()}:')
+        section = chunk_section
+        lines.append(chunk)
+    return '\n'.join(lines), len(chunks) - len(keep)
+
+
+def build_feedback_prompt(resume_text, job_text, budget=PROMPT_TOKEN_BUDGET):
+    """Feedback prompt within budget input tokens.
+
+    Returns {'prompt', 'prompt_tokens', 'budget', 'condensed', 'resume_tokens', 'job_tokens', 'dropped_chunks'}.
+    """
+    prompt = PROMPT_TEMPLATE.format(resume_text=resume_text, job_text=job_text)
+    prompt_tokens = count_tokens(prompt)
+    stats = {'budget': budget, 'condensed': False, 'dropped_chunks': 0}
+    if prompt_tokens > budget:
+        available = max(0, budget - count_tokens(PROMPT_TEMPLATE.format(resume_text='', job_text='')))
+        # A short resume leaves its unused share to the job description
+        job_budget = max(int(available * PROMPT_JOB_SHARE), available - count_tokens(resume_text))
+        job_text = condense_job(job_text, job_budget)
+        resume_budget = available - count_tokens(job_text)
+        if count_tokens(resume_text) > resume_budget:
+            resume_text, stats['dropped_chunks'] = condense_resume(resume_text, job_text, resume_budget)
+        prompt = PROMPT_TEMPLATE.format(resume_text=resume_text, job_text=job_text)
+        original_tokens, prompt_tokens = prompt_tokens, count_tokens(prompt)
+        stats['condensed'] = True
+        logger.info(f"Condensed feedback prompt from {original_tokens} to {prompt_tokens} tokens")
+    return dict(
+        stats,
+        prompt=prompt,
+        prompt_tokens=prompt_tokens,
+        resume_tokens=count_tokens(resume_text),
+        job_tokens=count_tokens(job_text),
+    )
@@ -0,0 +1,289 @@
+"""PDF reports, rendered once per report content and served from disk.
+
+get_report_pdf() hashes everything that appears in the PDF and returns the path
+of a cached file, rendering it first on a miss. Renders run on a small thread
+pool (REPORT_RENDER_WORKERS), which bounds how many wkhtmltopdf processes a web
+process starts at once; concurrent requests for the same content share one
+render. prerender() queues a render without waiting, so a report can be
+rendered as soon as its feedback is ready and the download is a plain file serve.
+
+REPORT_RENDERER:
+    auto          wkhtmltopdf when pdfkit and the binary are installed, else builtin
+    wkhtmltopdf   report_pdf.html through pdfkit/wkhtmltopdf (builtin if a render fails)
+    builtin       pure-Python text PDF, no dependencies
+"""
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .metrics import span, register_collector
+
+try:
+    import pdfkit
+except ImportError:
+    pdfkit = None
+
+logger = logging.getLogger(__name__)
+
+REPORT_RENDERER = os.getenv('REPORT_RENDERER', 'auto')
+REPORT_RENDER_WORKERS = int(os.getenv('REPORT_RENDER_WORKERS', '2'))
+REPORT_RENDER_TIMEOUT = float(os.getenv('REPORT_RENDER_TIMEOUT', '60'))
+REPORT_CACHE_DIR = os.getenv('REPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'resume-reviewer-reports'))
+REPORT_CACHE_TTL = int(os.getenv('REPORT_CACHE_TTL', str(7 * 86400)))
+# Render each report's PDF in the background once its feedback is ready
+REPORT_PRERENDER = os.getenv('REPORT_PRERENDER', '1') == '1'
+
+# Bump when report_pdf.html or the builtin layout changes so cached PDFs are re-rendered
+RENDER_VERSION = '1'
+
+_executor = None
+_executor_pid = None
+_inflight = {}
+# Re-entrant: a future that is already done runs its callback while the lock is held
+_inflight_lock = threading.RLock()
+stats = {'renders': 0, 'hits': 0, 'fallbacks': 0}
+
+
+def resolve_backend(name=REPORT_RENDERER):
+    if name == 'builtin':
+        return 'builtin'
+    available = pdfkit is not None and shutil.which('wkhtmltopdf') is not None
+    if name == 'wkhtmltopdf' and not available:
+        logger.warning("wkhtmltopdf requested but pdfkit or the binary is missing; using the builtin renderer")
+    return 'wkhtmltopdf' if available else 'builtin'
+
+
+def content_key(context, backend):
+    """Hash of the PDF's content, renderer and layout version"""
+    payload = json.dumps(context, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(f'{backend}\x1f{RENDER_VERSION}\x1f{payload}'.encode('utf-8')).hexdigest()
+
+
+def _cache_path(key):
+    return os.path.join(REPORT_CACHE_DIR, f'{key}.pdf')
+
+
+def _get_executor():
+    # Created lazily (and re-created after a fork) so no threads exist before gunicorn forks workers
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=REPORT_RENDER_WORKERS, thread_name_prefix='report-render')
+        _executor_pid = os.getpid()
+    return _executor
+
+
+def _write(path, data):
+    os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    # Atomic, so other workers never serve a half-written file
+    os.replace(tmp, path)
+
+
+def _render(context, render_html, backend):
+    path = _cache_path(content_key(context, backend))
+    if os.path.exists(path):
+        return path
+    with span('render'):
+        return _render_file(path, context, render_html, backend)
+
+
+def _render_file(path, context, render_html, backend):
+    start = time.perf_counter()
+    if backend == 'wkhtmltopdf':
+        try:
+            _write(path, pdfkit.from_string(render_html(), False))
+            stats['renders'] += 1
+            logger.info(f"Rendered report with wkhtmltopdf in {time.perf_counter() - start:.2f}s")
+            return path
+        except Exception as e:
+            logger.warning(f"wkhtmltopdf render failed ({e}); using the builtin renderer")
+            stats['fallbacks'] += 1
+            path = _cache_path(content_key(context, 'builtin'))
+            if os.path.exists(path):
+                return path
+    _write(path, render_builtin(context))
+    stats['renders'] += 1
+    logger.info(f"Rendered report with the builtin renderer in {time.perf_counter() - start:.2f}s")
+    return path
+
+
+def _submit(context, render_html, backend):
+    key = content_key(context, backend)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is None:
+            future = _get_executor().submit(_render, context, render_html, backend)
+            _inflight[key] = future
+            future.add_done_callback(lambda f: _forget(key))
+        return future
+
+
+def _forget(key):
+    with _inflight_lock:
+        _inflight.pop(key, None)
+
+
+def get_report_pdf(context, render_html, timeout=REPORT_RENDER_TIMEOUT):
+    """Path of the PDF for context (the template variables of report_pdf.html).
+
+    render_html() returns the report as HTML; it is only called for wkhtmltopdf
+    renders, from a pool thread.
+    """
+    backend = resolve_backend()
+    path = _cache_path(content_key(context, backend))
+    if os.path.exists(path):
+        stats['hits'] += 1
+        return path
+    return _submit(context, render_html, backend).result(timeout)
+
+
+def prerender(context, render_html):
+    """Queue a render of context's PDF without waiting for it"""
+    backend = resolve_backend()
+    if not os.path.exists(_cache_path(content_key(context, backend))):
+        _submit(context, render_html, backend)
+
+
+def purge_cache(max_age=REPORT_CACHE_TTL):
+    """Remove cached PDFs (and abandoned temp files) not rendered within max_age seconds"""
+    if not os.path.isdir(REPORT_CACHE_DIR):
+        return
+    cutoff = time.time() - max_age
+    for entry in os.listdir(REPORT_CACHE_DIR):
+        path = os.path.join(REPORT_CACHE_DIR, entry)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
+
+
+def render_stats():
+    return dict(stats, backend=resolve_backend(), workers=REPORT_RENDER_WORKERS)
+
+
+def _render_metrics():
+    return [('report_pdf_events_total', 'counter', 'PDF renders, cache hits and fallbacks to the builtin renderer',
+             [({'event': event}, count) for event, count in stats.items()])]
+
+
+register_collector(_render_metrics)
+
+
+# --- Builtin renderer: a plain text PDF using the standard Helvetica fonts ---
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+BULLET_INDENT = 14
+# style -> (font resource, size in points)
+STYLES = {'h1': ('F2', 18), 'h2': ('F2', 13), 'h3': ('F2', 11), 'p': ('F1', 10), 'li': ('F1', 10)}
+# Average Helvetica glyph width as a fraction of the font size, for line wrapping
+CHAR_WIDTH = 0.52
+MARKDOWN_RE = re.compile(r'\*\*|__|^#+\s*|^\s*[-*]\s+', re.MULTILINE)
+
+
+def _report_lines(context):
+    """(style, text) lines of the report, in the same order as report_pdf.html"""
+    lines = [('h1', 'AI Resume Reviewer & Job Matcher'),
+             ('h2', 'Resume–Job Fit Score'), ('p', f"{context.get('fit_score', 0)}%")]
+    for title, key, empty in (('Matched Skills', 'matched_skills', 'No matched skills found.'),
+                              ('Missing Skills', 'missing_skills', 'No missing skills found.')):
+        lines.append(('h2', title))
+        lines += [('li', skill) for skill in context.get(key) or []] or [('p', empty)]
+    ats = context.get('ats_report') or {}
+    lines.append(('h2', 'ATS Optimization Report'))
+    for label, desc in ats.get('criteria', []):
+        lines.append(('li', f"{'FAIL' if label in ats.get('issues', []) else 'PASS'}  {label}: {desc}"))
+    if ats.get('suggestions'):
+        lines.append(('h3', 'Suggestions'))
+        lines += [('li', s) for s in ats['suggestions']]
+    else:
+        lines.append(('p', 'Your resume is highly ATS compatible!'))
+
+    feedback = context.get('feedback') or {}
+    lines.append(('h2', 'Summary'))
+    if feedback.get('summary'):
+        lines.append(('p', feedback['summary']))
+    if feedback.get('score') is not None:
+        lines.append(('p', f"Reviewer rating: {feedback['score']}/100"))
+    if feedback.get('experience'):
+        lines += [('h2', 'Experience Match'), ('p', feedback['experience'])]
+    for title, key in (('Strengths', 'strengths'), ('Red Flags / Gaps', 'gaps')):
+        if feedback.get(key):
+            lines.append(('h2', title))
+            lines += [('li', item) for item in feedback[key]]
+    if feedback.get('categories') or feedback.get('notes'):
+        lines.append(('h2', 'AI Suggestions'))
+    for category in feedback.get('categories', []):
+        lines.append(('h3', category['name']))
+        lines += [('li', s) for s in category['suggestions']]
+    for paragraph in MARKDOWN_RE.sub('', feedback.get('notes', '')).split('\n'):
+        if paragraph.strip():
+            lines.append(('p', paragraph.strip()))
+    if feedback.get('verdict'):
+        lines += [('h2', 'Final Verdict'), ('p', feedback['verdict'])]
+    return lines
+
+
+def _pdf_string(text):
+    data = text.encode('cp1252', errors='replace')
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def render_builtin(context):
+    """PDF bytes for context, laid out as wrapped text"""
+    pages, ops, y = [], [], PAGE_HEIGHT - MARGIN
+    for style, text in _report_lines(context):
+        font, size = STYLES[style]
+        leading = size * 1.45
+        indent = BULLET_INDENT if style == 'li' else 0
+        width = int((PAGE_WIDTH - 2 * MARGIN - indent) / (size * CHAR_WIDTH))
+        if style in ('h1', 'h2', 'h3'):
+            y -= size * 0.6
+        for n, line in enumerate(textwrap.wrap(str(text), width) or ['']):
+            if y - leading < MARGIN:
+                pages.append(ops)
+                ops, y = [], PAGE_HEIGHT - MARGIN
+            y -= leading
+            if style == 'li' and n == 0:
+                ops.append(b'BT /%s %d Tf %.1f %.1f Td %s Tj ET' % (font.encode(), size, MARGIN, y, _pdf_string('•')))
+            ops.append(b'BT /%s %d Tf %.1f %.1f Td %s Tj ET' % (font.encode(), size, MARGIN + indent, y, _pdf_string(line)))
+    pages.append(ops)
+    return _pdf_document(pages)
+
+
+def _pdf_document(pages):
+    """Assemble content streams (one list of text operators per page) into a PDF file"""
+    objects = [b'', b'',
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>']
+    kids = []
+    for ops in pages:
+        stream = b'\n'.join(ops)
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+                       b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+                       % (PAGE_WIDTH, PAGE_HEIGHT, len(objects)))
+        kids.append(len(objects))
+    objects[0] = b'<< /Type /Catalog /Pages 2 0 R >>'
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % k for k in kids), len(kids))
+    out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
@@ -0,0 +1,67 @@
+"""Server-side store for finished reports.
+
+Each analysis is saved under a short random report id. The session only
+carries that id, and /report/<id> and /report/<id>.pdf re-serve the stored
+result without recomputing it. Reports are zlib-compressed JSON rows in a
+SQLite file shared by all workers, and expire RESULT_TTL seconds after their
+last update.
+"""
+import os
+import json
+import zlib
+import secrets
+import tempfile
+import threading
+from .cache import SQLiteStore
+
+RESULT_STORE_DB = os.getenv('RESULT_STORE_DB', os.path.join(tempfile.gettempdir(), 'resume-reviewer-results.sqlite3'))
+RESULT_TTL = int(os.getenv('RESULT_TTL', str(7 * 86400)))
+RESULT_MAX_ENTRIES = int(os.getenv('RESULT_MAX_ENTRIES', '100000'))
+# 8 random bytes -> 11 URL-safe characters
+REPORT_ID_BYTES = 8
+
+
+class CompressedJSONStore(SQLiteStore):
+    """SQLiteStore with zlib-compressed JSON values: a fraction of the size of
+    the plain JSON rows"""
+
+    def dumps(self, value):
+        return zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+    def loads(self, blob):
+        return json.loads(zlib.decompress(blob))
+
+
+_store = None
+_update_lock = threading.Lock()
+
+
+def get_result_store():
+    global _store
+    if _store is None:
+        _store = CompressedJSONStore(RESULT_STORE_DB, 'reports', ttl=RESULT_TTL, max_entries=RESULT_MAX_ENTRIES)
+    return _store
+
+
+def save_report(report):
+    """Store a report dict; returns its new id"""
+    report_id = secrets.token_urlsafe(REPORT_ID_BYTES)
+    get_result_store().set(report_id, report)
+    return report_id
+
+
+def load_report(report_id):
+    """The stored report, or None if it is unknown or expired"""
+    return get_result_store().get(report_id)
+
+
+def update_report(report_id, **fields):
+    """Merge fields into a stored report; False if it no longer exists"""
+    # Updates come from this process only (request thread and feedback thread)
+    with _update_lock:
+        report = load_report(report_id)
+        if report is None:
+            return False
+        report.update(fields)
+        get_result_store().set(report_id, report)
+        return True
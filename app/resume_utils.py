@@ -1,73 +1,71 @@
-import os
-from pdfminer.high_level import extract_text as pdf_extract_text
-import re
+import logging
+from .pdf_engine import extract_pdf
+from .ats_rules import get_engine
+
+logger = logging.getLogger(__name__)
 
 SECTION_HEADERS = [
     'experience', 'education', 'skills', 'projects', 'summary', 'contact', 'certifications', 'work history', 'profile', 'objective', 'achievements', 'publications', 'languages', 'interests', 'references'
 ]
 
-ATS_CRITERIA = [
-    ('Section Headers', 'Resume should have clear section headers like Experience, Education, Skills, etc.'),
-    ('Keyword Density', 'Important keywords from the job description should appear in the resume.'),
-    ('No Tables/Columns', 'Avoid using tables, columns, or graphics as they may confuse ATS.'),
-    ('Contact Info', 'Contact information should be in the main body, not in headers/footers.'),
+# Built-in ATS rule pack (see ats_rules for the rule format; ATS_RULE_PACKS adds to it)
+ATS_RULES = [
+    {
+        'name': 'Section Headers',
+        'description': 'Resume should have clear section headers like Experience, Education, Skills, etc.',
+        'suggestion': 'Add more clear section headers (e.g., Experience, Education, Skills).',
+        'keywords': SECTION_HEADERS,
+        'distinct': True,
+        'min_matches': 3,
+    },
+    {
+        'name': 'Keyword Density',
+        'description': 'Important keywords from the job description should appear in the resume.',
+        'suggestion': 'Include more relevant keywords from the job description in your resume.',
+        'check': 'keyword_density',
+        'min_ratio': 0.5,
+    },
+    {
+        'name': 'No Tables/Columns',
+        'description': 'Avoid using tables, columns, or graphics as they may confuse ATS.',
+        'suggestion': 'Avoid using tables, columns, or tabular formatting in your resume.',
+        # Without PDF layout data: table-like separators in the flattened text
+        'patterns': [r'\|\t', r'\n\s*\n'],
+        'max_matches': 0,
+        'check': 'no_tables',
+    },
+    {
+        'name': 'Contact Info',
+        'description': 'Contact information should be in the main body, not in headers/footers.',
+        'suggestion': 'Make sure your contact info is in the main body, not just in headers/footers.',
+        # Email or phone number; without PDF layout data it must appear in the first/last lines
+        'patterns': [r'[\w\.-]+@[\w\.-]+', r'\+?\d[\d\s\-]{7,}\d'],
+        'region': 'edges',
+        'check': 'contact_in_body',
+    },
 ]
 
+ATS_CRITERIA = [(rule['name'], rule['description']) for rule in ATS_RULES]
+
 def extract_text_from_pdf(pdf_path):
+    return extract_pdf_with_layout(pdf_path)[0]
+
+def extract_pdf_with_layout(pdf_source):
+    """(text, layout) for a PDF path, bytes or file object; ('', None) if it cannot be parsed"""
     try:
-        return pdf_extract_text(pdf_path)
+        return extract_pdf(pdf_source)
     except Exception as e:
-        print(f"PDF extraction error: {e}")
-        return ""
+        logger.error(f"PDF extraction error: {e}")
+        return "", None
 
 def clean_text(text):
     return ' '.join(text.strip().split())
 
-def get_text_from_input(file_storage, text_input, upload_folder, filename_prefix):
-    if file_storage and file_storage.filename:
-        filename = filename_prefix + '_' + file_storage.filename
-        file_path = os.path.join(upload_folder, filename)
-        file_storage.save(file_path)
-        if file_storage.filename.lower().endswith('.pdf'):
-            text = extract_text_from_pdf(file_path)
-        else:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-        return clean_text(text), file_path
-    elif text_input and text_input.strip():
-        return clean_text(text_input), None
-    else:
-        return '', None
-
-def check_ats_compatibility(resume_text, job_text, matched_skills):
-    issues = []
-    suggestions = []
-    # 1. Section headers
-    found_headers = [h for h in SECTION_HEADERS if re.search(rf'\b{h}\b', resume_text, re.IGNORECASE)]
-    if len(found_headers) < 3:
-        issues.append('Section Headers')
-        suggestions.append('Add more clear section headers (e.g., Experience, Education, Skills).')
-    # 2. Keyword density
-    if len(matched_skills) < 0.5 * len(set(job_text.lower().split())):
-        issues.append('Keyword Density')
-        suggestions.append('Include more relevant keywords from the job description in your resume.')
-    # 3. Tables/columns (simple check for table-like patterns)
-    if re.search(r'\|\t|\n\s*\n', resume_text):
-        issues.append('No Tables/Columns')
-        suggestions.append('Avoid using tables, columns, or tabular formatting in your resume.')
-    # 4. Contact info in header/footer (simple check for email/phone at top/bottom)
-    contact_pattern = r'([\w\.-]+@[\w\.-]+)|(\+?\d[\d\s\-]{7,}\d)'
-    lines = resume_text.split('\n')
-    if lines:
-        top = ' '.join(lines[:5])
-        bottom = ' '.join(lines[-5:])
-        if re.search(contact_pattern, top) or re.search(contact_pattern, bottom):
-            pass  # Good
-        else:
-            issues.append('Contact Info')
-            suggestions.append('Make sure your contact info is in the main body, not just in headers/footers.')
-    return {
-        'criteria': ATS_CRITERIA,
-        'issues': issues,
-        'suggestions': suggestions
-    } 
\ No newline at end of file
+def check_ats_compatibility(resume_text, job_text, matched_skills, layout=None, job_vocabulary=None):
+    """ATS report for a resume: criteria, failed rule names (issues), suggestions, an overall
+    0-100 score and per-rule score/evidence. With a PDF layout (see pdf_engine) tables,
+    columns and header/footer contact info are judged from real layout data.
+    job_vocabulary is the JD's distinct word count, when precomputed (JD catalog)."""
+    return get_engine(ATS_RULES).evaluate(
+        resume_text, job_text=job_text, matched_skills=matched_skills, layout=layout, job_vocabulary=job_vocabulary
+    )
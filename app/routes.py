@@ -1,11 +1,24 @@
+import io
 import os
-import uuid
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, session, send_file, make_response
+import json
+import time
+import logging
+import tempfile
+import threading
+from flask import Blueprint, render_template, get_template_attribute, g, request, redirect, url_for, flash, current_app, session, send_file, make_response, Response, stream_with_context
 from markupsafe import Markup
-from werkzeug.utils import secure_filename
-from .resume_utils import get_text_from_input, extract_text_from_pdf, check_ats_compatibility
-from .similarity_engine import get_embeddings, compute_cosine_similarity, extract_skills, top_missing_skills
-from .feedback_generator import generate_feedback
+from .resume_utils import extract_text_from_pdf
+from .document_store import ingest_input, save_text, save_bytes, discard, UploadTooLarge
+from .result_store import save_report, load_report, update_report
+from .report_renderer import get_report_pdf, prerender, render_stats, REPORT_PRERENDER
+from .job_queue import get_queue, QueueFull, QUEUED, RUNNING, DONE, FAILED
+from .feedback_generator import get_provider
+from .feedback_schema import FEEDBACK_FORMAT
+from .feedback_jobs import start_feedback_job, get_feedback_job, cancel_feedback_job, FEEDBACK_TIMEOUT
+from .cache import cache_stats
+from .jd_catalog import get_catalog, role_slug, validate_role_id
+from .batch import read_pool, write_report, BatchTooLarge
+from .metrics import registry, counter, histogram, span, publish_due, exposition, SamplingProfiler, STAGE_SECONDS, METRICS_PREFIX
 
 try:
     import markdown as md_lib
@@ -17,181 +30,598 @@ except ImportError:
         html = html.replace('<b>', '</b>', 1) if html.count('<b>') % 2 == 1 else html
         return Markup(html)
 
+logger = logging.getLogger(__name__)
+
+# ?profile=1 samples the request's stack and writes collapsed stacks to PROFILE_DIR (off unless enabled)
+PROFILE_REQUESTS = os.getenv('PROFILE_REQUESTS', '0') == '1'
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'resume-reviewer-profiles'))
+
+HTTP_REQUESTS_TOTAL = counter('http_requests_total', 'HTTP requests by endpoint and status', ('endpoint', 'method', 'status'))
+HTTP_REQUEST_SECONDS = histogram('http_request_seconds', 'Time to produce a response (streamed bodies excluded)', ('endpoint',))
+
 main = Blueprint('main', __name__)
+main.app_template_filter('markdown')(markdown_to_html)
+
+@main.before_app_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+    if PROFILE_REQUESTS and request.args.get('profile') == '1':
+        g.profile_path = os.path.join(
+            PROFILE_DIR, f'{time.strftime("%Y%m%d-%H%M%S")}-{request.endpoint or "unmatched"}-{os.getpid()}.collapsed')
+        g.profiler = SamplingProfiler(threading.get_ident()).start()
+
+@main.after_app_request
+def _record_request(response):
+    endpoint = request.endpoint or 'unmatched'
+    HTTP_REQUESTS_TOTAL.labels(endpoint=endpoint, method=request.method, status=response.status_code).inc()
+    if 'request_start' in g:
+        HTTP_REQUEST_SECONDS.labels(endpoint=endpoint).observe(time.perf_counter() - g.request_start)
+    if 'profile_path' in g:
+        response.headers['X-Profile'] = os.path.basename(g.profile_path)
+    if publish_due():
+        try:
+            get_queue().publish_metrics(_process_name(), registry.snapshot())
+        except Exception as e:
+            logger.warning(f"Could not publish metrics: {e}")
+    return response
+
+@main.teardown_app_request
+def _write_profile(exc):
+    # Teardown also runs when the view raised, so the sampler thread is always stopped
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+    profiler.stop()
+    path = g.pop('profile_path')
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(profiler.collapsed())
+    except OSError as e:
+        logger.warning(f"Could not write profile {path}: {e}")
+        return
+    logger.info(f"Profiled {request.path}{' (failed)' if exc else ''}: top frames {profiler.top()} -> {path}")
+
+def _process_name():
+    return f'web-{os.getpid()}'
+
+def _section_html(name, value):
+    """HTML of one feedback section, rendered by the same macro as the results page"""
+    return str(get_template_attribute('_feedback.html', 'section')(name, value))
+
+def _feedback_html(feedback):
+    return {name: _section_html(name, value) for name, value in feedback.items() if name != 'structured'}
 
-def save_text_to_tempfile(text, upload_folder, prefix):
-    filename = f"{prefix}_{uuid.uuid4().hex}.txt"
-    file_path = os.path.join(upload_folder, filename)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(text)
-    print(f"[DEBUG] Saved text to temp file: {file_path}")
-    return file_path
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _ingest_form(require_job=True):
+    """Store the submitted resume and job description (unless require_job is False); returns (resume_doc, job_doc, error)"""
+    try:
+        with span('ingest'):
+            resume_doc = ingest_input(request.files.get('resume_file'), request.form.get('resume_text'))
+            job_doc = ingest_input(request.files.get('job_file'), request.form.get('job_text')) if require_job else None
+    except UploadTooLarge as e:
+        return None, None, str(e)
+    if not resume_doc or (require_job and not job_doc):
+        for doc_id in (resume_doc, job_doc):
+            if doc_id:
+                discard(doc_id)
+        if not require_job:
+            return None, None, 'Please provide a resume (file or text).'
+        return None, None, 'Please provide both a resume and a job description (file or text).'
+    return resume_doc, job_doc, None
+
+def _index_page():
+    """The input form; open roles from the catalog can be picked instead of a job description"""
+    return render_template('index.html', roles=get_catalog().roles())
 
 @main.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
-        upload_folder = os.path.join(current_app.root_path, '..', 'uploads')
-        os.makedirs(upload_folder, exist_ok=True)
-        print(f"[DEBUG] Upload folder: {upload_folder}")
-        resume_file = request.files.get('resume_file')
-        resume_text_input = request.form.get('resume_text')
-        resume_text, resume_path = get_text_from_input(resume_file, resume_text_input, upload_folder, 'resume')
-        if not resume_path and resume_text:
-            resume_path = save_text_to_tempfile(resume_text, upload_folder, 'resume')
-        print(f"[DEBUG] Resume path: {resume_path}")
-        job_file = request.files.get('job_file')
-        job_text_input = request.form.get('job_text')
-        job_text, job_path = get_text_from_input(job_file, job_text_input, upload_folder, 'jd')
-        if not job_path and job_text:
-            job_path = save_text_to_tempfile(job_text, upload_folder, 'jd')
-        print(f"[DEBUG] JD path: {job_path}")
-        if not resume_path or not job_path:
-            flash('Please provide both a resume and a job description (file or text).', 'danger')
-            return render_template('index.html')
-        session['resume_path'] = resume_path
-        session['job_path'] = job_path
-        print(f"[DEBUG] Session resume_path: {session.get('resume_path')}")
-        print(f"[DEBUG] Session job_path: {session.get('job_path')}")
+        role_id = request.form.get('role_id') or None
+        if role_id and get_catalog().get(role_id) is None:
+            flash('That role is no longer open. Please pick another one.', 'danger')
+            return _index_page()
+        resume_doc, job_doc, error = _ingest_form(require_job=not role_id)
+        if error:
+            flash(error, 'danger')
+            return _index_page()
+        logger.debug(f"Stored documents: resume={resume_doc} jd={job_doc} role={role_id}")
+        session.pop('analysis_job_id', None)
+        session['resume_doc'] = resume_doc
+        session['job_doc'] = job_doc
+        session['role_id'] = role_id
         return redirect(url_for('main.results'))
-    return render_template('index.html')
+    return _index_page()
+
+def _enqueue_analysis(resume_doc, job_doc, role_id=None):
+    """Queue an analysis job (against a catalog role instead of job_doc when role_id is set);
+    returns (job_id, None) or (None, error message) when saturated"""
+    try:
+        return get_queue().enqueue({'resume_doc': resume_doc, 'job_doc': job_doc, 'role_id': role_id}), None
+    except QueueFull:
+        for doc_id in (resume_doc, job_doc):
+            if doc_id:
+                discard(doc_id)
+        return None, 'The analysis queue is full. Please try again in a minute.'
 
 @main.route('/results', methods=['GET'])
 def results():
-    resume_path = session.get('resume_path')
-    job_path = session.get('job_path')
-    print(f"[DEBUG] Results - resume_path: {resume_path}")
-    print(f"[DEBUG] Results - job_path: {job_path}")
-    if not resume_path or not job_path:
+    analysis_job_id = session.get('analysis_job_id')
+    if not analysis_job_id:
+        resume_doc = session.pop('resume_doc', None)
+        job_doc = session.pop('job_doc', None)
+        role_id = session.pop('role_id', None)
+        if not resume_doc or not (job_doc or role_id):
+            flash('Session expired or invalid. Please re-submit your documents.', 'danger')
+            return redirect(url_for('main.index'))
+        analysis_job_id, error = _enqueue_analysis(resume_doc, job_doc, role_id)
+        if error:
+            flash(error, 'danger')
+            return _index_page(), 429
+        session['analysis_job_id'] = analysis_job_id
+
+    job = get_queue().get(analysis_job_id)
+    if job is None:
+        session.pop('analysis_job_id', None)
         flash('Session expired or invalid. Please re-submit your documents.', 'danger')
         return redirect(url_for('main.index'))
-    try:
-        print(f"[DEBUG] Checking if resume file exists: {os.path.exists(resume_path)}")
-        print(f"[DEBUG] Checking if JD file exists: {os.path.exists(job_path)}")
-        if resume_path.lower().endswith('.pdf'):
-            resume_text = extract_text_from_pdf(resume_path)
-        else:
-            with open(resume_path, 'r', encoding='utf-8') as f:
-                resume_text = f.read()
-        if job_path.lower().endswith('.pdf'):
-            job_text = extract_text_from_pdf(job_path)
-        else:
-            with open(job_path, 'r', encoding='utf-8') as f:
-                job_text = f.read()
-    except Exception as e:
-        print(f"[DEBUG] Exception reading files: {e}")
-        flash('Could not read uploaded files. Please try again.', 'danger')
+    if job['status'] in (QUEUED, RUNNING):
+        return render_template('pending.html', job_id=analysis_job_id)
+    session.pop('analysis_job_id', None)
+    if job['timings']['queue_wait'] is not None:
+        STAGE_SECONDS.labels(stage='queue_wait').observe(job['timings']['queue_wait'])
+    if job['status'] == FAILED:
+        logger.warning(f"Analysis job {analysis_job_id} failed: {job['error']}")
+        flash('Could not analyze uploaded files. Please try again.', 'danger')
         return redirect(url_for('main.index'))
-    try:
-        resume_emb = get_embeddings(resume_text)
-        job_emb = get_embeddings(job_text)
-        fit_score = int(compute_cosine_similarity(resume_emb, job_emb) * 100)
-        fit_score = max(0, min(100, fit_score))
-    except Exception as e:
-        print(f"[DEBUG] Error in similarity computation: {e}")
-        fit_score = 50  # Default neutral score
-        
-    try:
-        jd_skills = set(extract_skills(job_text))
-        resume_skills = set(extract_skills(resume_text))
-        matched_skills = list(resume_skills & jd_skills)
-        missing_skills = top_missing_skills(jd_skills, resume_skills, limit=10)
-    except Exception as e:
-        print(f"[DEBUG] Error in skills extraction: {e}")
-        matched_skills = []
-        missing_skills = []
-        
-    try:
-        feedback = generate_feedback(resume_text, job_text)
-    except Exception as e:
-        print(f"[DEBUG] Error in feedback generation: {e}")
-        feedback = {'improvements': ['Unable to generate feedback due to technical issues.'], 'summary': 'Analysis completed with limited functionality.'}
-    def fallback_list(val, raw):
-        if not val or val == ['**'] or all(x.strip() in ('', '**') for x in val):
-            return [raw] if raw else ['[No data]']
-        return val
-    def fallback_str(val, raw):
-        if not val or val.strip() in ('', '**'):
-            return raw or '[No data]'
-        return val
-    improvements = fallback_list(feedback.get('improvements', []), feedback.get('raw_output', ''))
-    summary = fallback_str(feedback.get('summary', ''), feedback.get('raw_output', ''))
-    improvements_html = [markdown_to_html(s) for s in improvements]
-    summary_html = markdown_to_html(summary)
-    ats_report = check_ats_compatibility(resume_text, job_text, matched_skills)
-    try:
-        os.remove(resume_path)
-        os.remove(job_path)
-        print(f"[DEBUG] Temp files removed.")
-    except Exception as e:
-        print(f"[DEBUG] Exception removing temp files: {e}")
-        pass
-    session.pop('resume_path', None)
-    session.pop('job_path', None)
-    # Store results in session for PDF download
-    session['last_results'] = {
-        'fit_score': fit_score,
-        'matched_skills': matched_skills,
-        'missing_skills': missing_skills,
-        'improvements': improvements,
-        'summary': summary,
-        'ats_report': ats_report
+
+    analysis = job['result']
+    report = {
+        'fit_score': analysis['fit_score'],
+        'matched_skills': analysis['matched_skills'],
+        'missing_skills': analysis['missing_skills'],
+        'coverage': analysis.get('coverage'),
+        'ats_report': analysis['ats_report'],
+        'section_scores': analysis['section_scores'],
+        'feedback': None,
+        'created_at': time.time(),
     }
-    # Add debugging
-    print(f"[DEBUG] Rendering results with fit_score: {fit_score}")
-    print(f"[DEBUG] Matched skills: {matched_skills}")
-    print(f"[DEBUG] Missing skills: {missing_skills}")
-    print(f"[DEBUG] ATS report: {ats_report}")
-    
+    # The report lives server-side; the session only keeps its id
+    report_id = save_report(report)
+    session['report_id'] = report_id
+    # LLM feedback is generated in the background, streamed to the page and saved into the report when done
+    feedback_job_id = start_feedback_job(
+        analysis['resume_text'], analysis['job_text'], analysis.get('feedback_prompt'),
+        on_finish=_feedback_saver(report_id),
+    )
+    if get_feedback_job(feedback_job_id).result is None:
+        update_report(report_id, feedback_job_id=feedback_job_id)
+    report['feedback_job_id'] = feedback_job_id
+    # Formatting these is not free; skip it unless debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Report {report_id}: fit_score={report['fit_score']} matched={report['matched_skills']} "
+                     f"missing={report['missing_skills']} ats={report['ats_report']}")
+        logger.debug(f"Job timings: {job['timings']} stages: {analysis['timings']}")
+    return _render_report(report_id, report)
+
+FEEDBACK_PENDING = {'notes': 'AI feedback is still being generated. Reload this page in a moment.', 'structured': False}
+
+def _report_feedback(report):
+    """(feedback, live feedback job id): the saved feedback, or the running job in this process to stream"""
+    if report.get('feedback') is not None:
+        return report['feedback'], None
+    feedback_job = get_feedback_job(report.get('feedback_job_id') or '')
+    if feedback_job is None:
+        # Generated by another worker process, or lost with it
+        return FEEDBACK_PENDING, None
+    return feedback_job.result, (None if feedback_job.result is not None else feedback_job.id)
+
+def _pdf_context(report):
+    """Template variables of report_pdf.html; also the content the PDF cache is keyed on"""
+    feedback, _ = _report_feedback(report)
+    return {
+        'fit_score': report['fit_score'],
+        'matched_skills': report['matched_skills'],
+        'missing_skills': report['missing_skills'],
+        'ats_report': {k: v for k, v in report['ats_report'].items() if k != 'rules'},
+        'feedback': feedback or FEEDBACK_PENDING,
+    }
+
+def _pdf_html(app, context):
+    """report_pdf.html renderer that works outside the request (renders run on a pool thread)"""
+    def render():
+        with app.app_context():
+            return render_template('report_pdf.html', **context)
+    return render
+
+def _feedback_saver(report_id):
+    """Feedback job callback: save the feedback into the report, then render its PDF in the background"""
+    app = current_app._get_current_object()
+    def save(feedback):
+        update_report(report_id, feedback=feedback)
+        report = load_report(report_id)
+        if REPORT_PRERENDER and report is not None:
+            context = _pdf_context(report)
+            prerender(context, _pdf_html(app, context))
+    return save
+
+def _render_report(report_id, report):
+    feedback, feedback_job_id = _report_feedback(report)
     try:
         return render_template('results.html',
-            fit_score=fit_score,
-            matched_skills=matched_skills,
-            missing_skills=missing_skills,
-            improvements=improvements_html,
-            summary=summary_html,
-            ats_report=ats_report
+            fit_score=report['fit_score'],
+            matched_skills=report['matched_skills'],
+            missing_skills=report['missing_skills'],
+            coverage=report.get('coverage'),
+            feedback=feedback,
+            feedback_format=FEEDBACK_FORMAT,
+            ats_report=report['ats_report'],
+            section_scores=report['section_scores'],
+            feedback_job_id=feedback_job_id,
+            report_id=report_id
         )
     except Exception as e:
-        print(f"[DEBUG] Template rendering error: {e}")
+        logger.exception(f"Template rendering error: {e}")
         # Fallback to a simple error page
         return f"""
         <html>
         <head><title>Results</title></head>
         <body>
         <h1>Analysis Results</h1>
-        <p>Fit Score: {fit_score}%</p>
-        <p>Matched Skills: {matched_skills}</p>
-        <p>Missing Skills: {missing_skills}</p>
-        <p>Summary: {summary_html}</p>
+        <p>Fit Score: {report['fit_score']}%</p>
+        <p>Matched Skills: {report['matched_skills']}</p>
+        <p>Missing Skills: {report['missing_skills']}</p>
+        <p>Summary: {(feedback or {}).get('summary', '')}</p>
         <a href="/">Back to Home</a>
         </body>
         </html>
         """
 
+@main.route('/report/<report_id>')
+def report_page(report_id):
+    """Shareable results page, served from the result store"""
+    report = load_report(report_id)
+    if report is None:
+        return render_template('404.html'), 404
+    return _render_report(report_id, report)
+
+@main.route('/report/<report_id>.pdf')
+def report_pdf(report_id):
+    """The report as a PDF, rendered once per content and then served from the render cache"""
+    report = load_report(report_id)
+    if report is None:
+        return render_template('404.html'), 404
+    context = _pdf_context(report)
+    try:
+        path = get_report_pdf(context, _pdf_html(current_app._get_current_object(), context))
+    except Exception as e:
+        logger.error(f"PDF render failed for report {report_id}: {e}")
+        flash('PDF export is currently unavailable. Please try again in a moment.', 'danger')
+        return redirect(url_for('main.report_page', report_id=report_id))
+    return send_file(path, mimetype='application/pdf', as_attachment=True,
+                     download_name=f'resume_report_{report_id}.pdf')
+
 @main.route('/download_report')
 def download_report():
-    import pdfkit
-    results = session.get('last_results')
-    if not results:
+    """PDF of the last report analyzed in this session"""
+    report_id = session.get('report_id')
+    if not report_id:
         flash('No report available. Please analyze a resume first.', 'danger')
         return redirect(url_for('main.index'))
-    # Render a special template for PDF (no JS, print-friendly)
-    rendered = render_template('report_pdf.html', **results)
-    try:
-        # Generate PDF
-        pdf = pdfkit.from_string(rendered, False)
-        response = make_response(pdf)
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = 'attachment; filename=resume_report.pdf'
+    return redirect(url_for('main.report_pdf', report_id=report_id))
+
+@main.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Queue an analysis of the uploaded/pasted resume and job description, or of the resume against role_id"""
+    role_id = request.form.get('role_id')
+    if role_id and get_catalog().get(role_id) is None:
+        return {'error': f'Unknown role {role_id}'}, 404
+    resume_doc, job_doc, error = _ingest_form(require_job=not role_id)
+    if error:
+        return {'error': error}, 400
+    job_id, error = _enqueue_analysis(resume_doc, job_doc, role_id)
+    if error:
+        return {'error': error}, 429, {'Retry-After': '30'}
+    return {'id': job_id, 'status': QUEUED, 'status_url': url_for('main.job_status', job_id=job_id)}, 202
+
+@main.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    job = get_queue().get(job_id)
+    if job is None:
+        return {'error': 'Unknown or expired job'}, 404
+    result = job['result']
+    if result:
+        # Extracted texts are internal; don't send them back
+        result = {k: v for k, v in result.items() if k not in ('resume_text', 'job_text', 'feedback_prompt')}
+        if job['result'].get('feedback_prompt'):
+            result['prompt_stats'] = {k: v for k, v in job['result']['feedback_prompt'].items() if k != 'prompt'}
+    return {
+        'id': job['id'],
+        'status': job['status'],
+        'error': job['error'],
+        'timings': job['timings'],
+        'result': result,
+    }, 200
+
+@main.route('/feedback/<job_id>')
+def feedback_status(job_id):
+    """Polling fallback for clients that cannot use the event stream"""
+    job = get_feedback_job(job_id)
+    if job is None:
+        return {'error': 'Unknown or expired feedback job'}, 404
+    return job.to_dict(), 200
+
+@main.route('/feedback/<job_id>/stream')
+def feedback_stream(job_id):
+    """Server-sent events, then 'done', 'error' or 'cancelled' with every section's HTML.
+
+    FEEDBACK_FORMAT=json sends a 'section' event as each section completes;
+    FEEDBACK_FORMAT=text sends a 'token' event for each piece of LLM output.
+    """
+    job = get_feedback_job(job_id)
+    if job is None:
+        return {'error': 'Unknown or expired feedback job'}, 404
+
+    def events():
+        seen = seen_sections = 0
+        deadline = time.time() + FEEDBACK_TIMEOUT + 10
+        while True:
+            chunks, sections, finished = job.wait(seen, seen_sections, timeout=15)
+            if FEEDBACK_FORMAT != 'json':
+                for chunk in chunks:
+                    yield _sse('token', {'text': chunk})
+            for name, value in sections:
+                yield _sse('section', {'name': name, 'html': _section_html(name, value)})
+            seen += len(chunks)
+            seen_sections += len(sections)
+            if finished:
+                payload = {'error': job.error}
+                if job.result is not None:
+                    payload['sections'] = _feedback_html(job.result)
+                yield _sse(job.status, payload)
+                return
+            if time.time() > deadline:
+                yield _sse('error', {'error': 'Timed out waiting for feedback'})
+                return
+            if not chunks and not sections:
+                yield ': keep-alive\n\n'
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@main.route('/feedback/<job_id>/cancel', methods=['POST'])
+def feedback_cancel(job_id):
+    if not cancel_feedback_job(job_id):
+        return {'error': 'Unknown or expired feedback job'}, 404
+    return {'status': 'cancelled'}, 200
+
+def _batch_response(response, fmt):
+    """A finished ranking as a jsonl/csv download when asked for; anything else unchanged"""
+    report, status = response[0], response[1]
+    if status != 200 or fmt not in ('jsonl', 'csv'):
         return response
+    buffer = io.StringIO()
+    write_report(report['results'], buffer, fmt)
+    download = make_response(buffer.getvalue())
+    download.headers['Content-Type'] = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    download.headers['Content-Disposition'] = f'attachment; filename=ranking.{fmt}'
+    download.headers['X-Resumes-Per-Second'] = str(report['resumes_per_second'])
+    return download
+
+@main.route('/api/batch', methods=['POST'])
+def batch_score():
+    """Rank an uploaded pool of resumes (.zip or .jsonl) against one job description.
+
+    The pool is only unpacked here; parsing and scoring run in the analysis workers.
+    Answers with the ranking, or 202 with a status URL (GET /api/batch/<id>) for large pools.
+    """
+    resumes_file = request.files.get('resumes')
+    if not resumes_file or not resumes_file.filename:
+        return {'error': 'Provide job_text or job_file, and a resumes .zip or .jsonl upload.'}, 400
+    try:
+        pool = read_pool(resumes_file.stream, resumes_file.filename)
+    except BatchTooLarge as e:
+        return {'error': str(e)}, 413
     except Exception as e:
-        flash('PDF export is currently unavailable. Please install wkhtmltopdf or contact support if you need this feature.', 'danger')
-        return redirect(url_for('main.results'))
+        return {'error': f'Could not read resumes: {e}'}, 400
+    try:
+        job_doc = ingest_input(request.files.get('job_file'), request.form.get('job_text'))
+    except UploadTooLarge as e:
+        return {'error': str(e)}, 400
+    if not job_doc:
+        return {'error': 'Provide job_text or job_file, and a resumes .zip or .jsonl upload.'}, 400
+    with span('ingest'):
+        resume_docs = [[name, save_text(data) if isinstance(data, str) else save_bytes(name, data)]
+                       for name, data in pool]
+    response = _run_on_worker({'job_doc': job_doc, 'resume_docs': resume_docs}, 'batch',
+                              docs=[job_doc] + [doc_id for _, doc_id in resume_docs], status_endpoint='main.batch_result')
+    return _batch_response(response, request.args.get('format', 'json'))
+
+@main.route('/api/batch/<job_id>', methods=['GET'])
+def batch_result(job_id):
+    """A queued batch's ranking once it is done (?format=json|jsonl|csv), else its status"""
+    job = get_queue().get(job_id)
+    if job is None or job['kind'] != 'batch':
+        return {'error': 'Unknown or expired job'}, 404
+    if job['status'] == DONE:
+        return _batch_response((dict(job['result'], queue_timings=job['timings']), 200), request.args.get('format', 'json'))
+    if job['status'] == FAILED:
+        return {'error': job['error']}, 500
+    return {'id': job_id, 'status': job['status'], 'status_url': url_for('main.batch_result', job_id=job_id)}, 202
+
+# How long /api/search, /api/match, /api/roles and /api/batch wait for the worker before answering 202 with a job to poll
+SEARCH_WAIT = float(os.getenv('SEARCH_WAIT', '5'))
+
+def _run_on_worker(payload, kind, docs=(), status_endpoint='main.job_status'):
+    """Queue a job for the analysis workers (they hold the model) and wait up to SEARCH_WAIT.
+
+    Returns the result, or 202 with a status URL (status_endpoint) to poll; docs are discarded if the queue is full.
+    """
+    queue = get_queue()
+    try:
+        job_id = queue.enqueue(payload, kind=kind)
+    except QueueFull:
+        for doc_id in docs:
+            discard(doc_id)
+        return {'error': 'The analysis queue is full. Please try again in a minute.'}, 429, {'Retry-After': '30'}
+    deadline = time.time() + SEARCH_WAIT
+    while True:
+        # Checked at least once, so SEARCH_WAIT=0 answers 202 right away
+        job = queue.get(job_id)
+        if job['status'] == DONE:
+            return dict(job['result'], queue_timings=job['timings']), 200
+        if job['status'] == FAILED:
+            return {'error': job['error']}, 500
+        if time.time() >= deadline:
+            break
+        time.sleep(0.05)
+    return {'id': job_id, 'status': job['status'], 'status_url': url_for(status_endpoint, job_id=job_id)}, 202
+
+def _request_k(data, default=10):
+    """k from the request, clamped to 1-100; None if it is not an integer"""
+    try:
+        return max(1, min(100, int(data.get('k', default))))
+    except (TypeError, ValueError):
+        return None
+
+def _request_data():
+    """The JSON object body, else the form; None for JSON that is not an object"""
+    data = request.get_json(silent=True)
+    if data is None:
+        return request.form
+    return data if isinstance(data, dict) else None
+
+def _text_fields(data, *names):
+    """Values of the named text fields ('' when absent); None if any of them is not a string"""
+    values = [data.get(name, '') for name in names]
+    return values if all(isinstance(value, str) for value in values) else None
+
+@main.route('/api/search', methods=['POST'])
+def search_resumes():
+    """Top-k previously analyzed resumes for a job description (JSON or form: job_text/job_file, k, exact)"""
+    data = _request_data()
+    fields = _text_fields(data, 'job_text') if data is not None else None
+    if fields is None:
+        return {'error': 'Send a JSON object or form with job_text as a string.'}, 400
+    job_text = fields[0]
+    job_file = request.files.get('job_file')
+    if job_file and job_file.filename:
+        if job_file.filename.lower().endswith('.pdf'):
+            job_text = extract_text_from_pdf(job_file.stream)
+        else:
+            job_text = job_file.read().decode('utf-8', errors='ignore')
+    job_text = ' '.join(job_text.split())
+    if not job_text:
+        return {'error': 'Provide job_text or job_file.'}, 400
+    k = _request_k(data)
+    if k is None:
+        return {'error': 'k must be an integer'}, 400
+    exact = str(data.get('exact', '')).lower() in ('1', 'true')
+    # Embedding runs in the analysis workers, which already hold the model
+    return _run_on_worker({'job_text': job_text, 'k': k, 'exact': exact}, 'search')
+
+@main.route('/api/match', methods=['POST'])
+def match_roles():
+    """Catalog roles ranked for one resume (form: resume_file/resume_text, k)"""
+    k = _request_k(request.form)
+    if k is None:
+        return {'error': 'k must be an integer'}, 400
+    resume_doc, _, error = _ingest_form(require_job=False)
+    if error:
+        return {'error': error}, 400
+    return _run_on_worker({'resume_doc': resume_doc, 'k': k}, 'match', docs=(resume_doc,))
+
+@main.route('/api/roles', methods=['GET'])
+def list_roles():
+    roles = get_catalog().roles()
+    return {'roles': roles, 'count': len(roles)}, 200
+
+@main.route('/api/roles', methods=['POST'])
+def add_role():
+    """Add or update a catalog role (JSON or form: title, job_text/job_file, optional role_id)"""
+    data = _request_data()
+    fields = _text_fields(data, 'job_text', 'title') if data is not None else None
+    if fields is None:
+        return {'error': 'Send a JSON object or form with title and job_text as strings.'}, 400
+    job_text, title = fields
+    job_file = request.files.get('job_file')
+    if job_file and job_file.filename:
+        if job_file.filename.lower().endswith('.pdf'):
+            job_text = extract_text_from_pdf(job_file.stream)
+        else:
+            job_text = job_file.read().decode('utf-8', errors='ignore')
+    title = ' '.join(title.split())[:200]
+    if not job_text.strip() or not title:
+        return {'error': 'Provide a title and job_text or job_file.'}, 400
+    role_id = str(data.get('role_id') or '') or role_slug(title)
+    # JobCatalog.add checks it again in the worker; this answers a bad id with a 400 instead of a failed job
+    try:
+        validate_role_id(role_id)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    # Profiling embeds the JD, so it runs in the analysis workers
+    return _run_on_worker({'role_id': role_id, 'title': title, 'job_text': job_text}, 'catalog')
+
+@main.route('/api/roles/<role_id>', methods=['GET'])
+def get_role(role_id):
+    role = get_catalog().get(role_id)
+    if role is None:
+        return {'error': 'Unknown role'}, 404
+    return {k: v for k, v in role.items() if k != 'embedding'}, 200
+
+@main.route('/api/roles/<role_id>', methods=['DELETE'])
+def delete_role(role_id):
+    if not get_catalog().remove([role_id]):
+        return {'error': 'Unknown role'}, 404
+    return {'deleted': role_id}, 200
 
 @main.route('/health')
 def health_check():
     """Health check endpoint for deployment monitoring"""
-    return {'status': 'healthy', 'service': 'resume-reviewer'}, 200
+    queue = get_queue()
+    return {
+        'status': 'healthy',
+        'service': 'resume-reviewer',
+        'ready': _is_ready(),
+        'analysis_workers': queue.workers(),
+        'queue_depth': queue.depth(),
+        'cache': cache_stats(),
+        'llm': get_provider().status(),
+        'reports': render_stats(),
+    }, 200
+
+@main.route('/metrics')
+def metrics():
+    """Prometheus text format: this process live, other web and analysis workers from their last snapshot"""
+    queue = get_queue()
+    own = _process_name()
+    snapshots = {name: snapshot for name, snapshot in queue.metrics_snapshots().items() if name != own}
+    snapshots[own] = registry.snapshot()
+    workers = queue.workers()
+    cluster = {
+        METRICS_PREFIX + 'queue_depth': {'type': 'gauge', 'help': 'Queued plus running analysis jobs',
+                                         'samples': [['', {}, queue.depth()]]},
+        METRICS_PREFIX + 'queue_max_depth': {'type': 'gauge', 'help': 'Queue depth at which new jobs are rejected',
+                                             'samples': [['', {}, queue.max_depth]]},
+        METRICS_PREFIX + 'analysis_workers': {'type': 'gauge', 'help': 'Analysis workers with a recent heartbeat',
+                                              'samples': [['', {'ready': str(ready).lower()},
+                                                           sum(bool(w['status'].get('ready')) == ready for w in workers)]
+                                                          for ready in (True, False)]},
+    }
+    return Response(exposition(snapshots, cluster), mimetype='text/plain; version=0.0.4')
+
+def _is_ready():
+    """Ready once an analysis worker has its models loaded; the web process itself never loads them"""
+    return any(w['status'].get('ready') for w in get_queue().workers())
+
+@main.route('/ready')
+def readiness_check():
+    """Readiness probe: 503 until the models are loaded and warm"""
+    if _is_ready():
+        return {'status': 'ready'}, 200
+    return {'status': 'loading'}, 503
 
 @main.route('/test')
 def test_endpoint():
@@ -205,8 +635,16 @@ def test_results():
         fit_score=75,
         matched_skills=['Python', 'Flask', 'Machine Learning'],
         missing_skills=['AWS', 'Docker'],
-        improvements=['Add cloud experience', 'Include containerization skills'],
-        summary='Strong technical background with room for improvement in cloud technologies.',
+        feedback={
+            'summary': 'Strong technical background with room for improvement in cloud technologies.',
+            'score': 72,
+            'strengths': ['Python and Flask experience', 'Applied machine learning projects'],
+            'gaps': ['No cloud deployment experience'],
+            'categories': [{'name': 'Role Relevance & Personalization',
+                            'suggestions': ['Add cloud experience', 'Include containerization skills']}],
+            'verdict': 'Good fit once cloud skills are covered.',
+            'structured': True,
+        },
         ats_report={
             'criteria': [('Section Headers', 'Clear section headers'), ('Keyword Density', 'Good keyword usage')],
             'issues': ['Contact Info'],
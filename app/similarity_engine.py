@@ -1,44 +1,100 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import spacy
+import os
+import time
 import numpy as np
 import logging
+from .cache import embedding_cache, skills_cache, make_key
+from .metrics import register_collector
+from .chunking import chunk_text, DEFAULT_CHUNK_WORDS
+from .skill_matcher import SkillMatcher, build_phrase_map, load_taxonomy
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SBERT_MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+
+# Encoder runtime: 'torch' (fp32 PyTorch), 'onnx' (ONNX Runtime) or 'onnx-int8' (dynamically quantized ONNX).
+# The ONNX backends need requirements-onnx.txt (optimum[onnxruntime]); loading falls back to torch otherwise.
+ENCODER_BACKEND = os.getenv('ENCODER_BACKEND', 'torch')
+ENCODER_BACKENDS = ('torch', 'onnx', 'onnx-int8')
+# Quantized graph shipped in the model repo (model_qint8_avx512_vnni.onnx / model_qint8_arm64.onnx for other CPUs)
+ENCODER_INT8_FILE = os.getenv('ENCODER_INT8_FILE', 'onnx/model_quint8_avx2.onnx')
+# ONNX Runtime intra-op threads (0 = all cores); set to 1 with several analysis worker processes
+ENCODER_THREADS = int(os.getenv('ENCODER_THREADS', '0'))
+
+# 'chunked' embeds section/sentence-aligned windows and pools them; 'whole' sends the full text (truncated by the model)
+EMBEDDING_MODE = os.getenv('EMBEDDING_MODE', 'chunked')
+EMBEDDING_POOLING = os.getenv('EMBEDDING_POOLING', 'mean')  # mean | max | section
+EMBEDDING_CHUNK_WORDS = int(os.getenv('EMBEDDING_CHUNK_WORDS', DEFAULT_CHUNK_WORDS))
+
+# Relative weight of each resume section for 'section' pooling (unlisted sections weigh 1.0)
+SECTION_WEIGHTS = {
+    'experience': 1.5, 'work history': 1.5, 'skills': 1.5, 'projects': 1.2,
+    'summary': 1.0, 'profile': 1.0, 'objective': 0.8, 'certifications': 1.0,
+    'education': 0.8, 'achievements': 1.0, 'publications': 0.8,
+    'contact': 0.2, 'languages': 0.5, 'interests': 0.3, 'references': 0.2,
+}
+
+# Optional extra skill taxonomy (.json or "skill: alias, alias" lines), merged into CURATED_SKILLS
+SKILL_TAXONOMY_PATH = os.getenv('SKILL_TAXONOMY_PATH')
+
 # Initialize models as None for lazy loading
 sbert_model = None
-nlp = None
+skill_matcher = None
+
+# Load state and timings reported by /health
+MODEL_STATUS = {
+    'sbert': {'loaded': False, 'load_seconds': None, 'error': None, 'backend': None, 'fallback': None},
+    'skill_matcher': {'loaded': False, 'load_seconds': None, 'error': None},
+    'warm_up_seconds': None,
+    'pid': None,
+}
+
+def load_encoder(backend=ENCODER_BACKEND):
+    """SentenceTransformer for SBERT_MODEL_NAME on the given backend"""
+    # Imported here so the web process (which never encodes) starts without torch
+    from sentence_transformers import SentenceTransformer
+    if backend == 'torch':
+        return SentenceTransformer(SBERT_MODEL_NAME)
+    if backend in ('onnx', 'onnx-int8'):
+        model_kwargs = {'file_name': ENCODER_INT8_FILE} if backend == 'onnx-int8' else {}
+        if ENCODER_THREADS:
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = ENCODER_THREADS
+            model_kwargs['session_options'] = options
+        return SentenceTransformer(SBERT_MODEL_NAME, backend='onnx', model_kwargs=model_kwargs)
+    raise ValueError(f"Unknown encoder backend {backend!r} (expected one of {', '.join(ENCODER_BACKENDS)})")
 
 def _load_models():
     """Lazy load models only when needed"""
-    global sbert_model, nlp
+    global sbert_model
     
     if sbert_model is None:
+        start = time.perf_counter()
+        backend = ENCODER_BACKEND
         try:
-            sbert_model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("Successfully loaded SBERT model")
+            try:
+                sbert_model = load_encoder(backend)
+            except Exception as e:
+                if backend == 'torch':
+                    raise
+                logger.error(f"ENCODER_BACKEND={backend} is configured but could not be loaded ({e}). "
+                             f"FALLING BACK to the torch encoder: slower and more memory. "
+                             f"Install requirements-onnx.txt or set ENCODER_BACKEND=torch.")
+                MODEL_STATUS['sbert']['fallback'] = f"{backend} unavailable: {e}"
+                backend = 'torch'
+                sbert_model = load_encoder(backend)
+            MODEL_STATUS['sbert'].update(loaded=True, error=None, backend=backend, load_seconds=round(time.perf_counter() - start, 3))
+            logger.info(f"Successfully loaded SBERT model ({backend})")
         except Exception as e:
             logger.error(f"Error loading SBERT model: {e}")
+            MODEL_STATUS['sbert'].update(loaded=False, error=str(e))
             sbert_model = None
-    
-    if nlp is None:
-        try:
-            nlp = spacy.load('en_core_web_sm')
-            logger.info("Successfully loaded spaCy model")
-        except Exception as e:
-            logger.error(f"Error loading spaCy model: {e}")
-            # Try to download spaCy model if not available
-            try:
-                import subprocess
-                subprocess.run(['python', '-m', 'spacy', 'download', 'en_core_web_sm'], check=True)
-                nlp = spacy.load('en_core_web_sm')
-                logger.info("Successfully downloaded and loaded spaCy model")
-            except Exception as download_error:
-                logger.error(f"Failed to download spaCy model: {download_error}")
-                nlp = None
+
+def _encoder_tag():
+    """Cache-key namespace of the active encoder; quantized vectors must not mix with fp32 ones"""
+    backend = MODEL_STATUS['sbert']['backend'] or ENCODER_BACKEND
+    return SBERT_MODEL_NAME if backend == 'torch' else f'{SBERT_MODEL_NAME}:{backend}'
 
 # Curated list of common AI/ML/Data/Software skills
 CURATED_SKILLS = set([
@@ -48,21 +104,170 @@ CURATED_SKILLS = set([
 # Lowercase for matching
 CURATED_SKILLS = set(s.lower() for s in CURATED_SKILLS)
 
-def get_embeddings(text):
-    """Get embeddings with error handling and fallback"""
+# Synonyms folded into one canonical skill name
+SKILL_ALIASES = {
+    'scikit-learn': ['sklearn', 'scikit learn'],
+    'llm': ['llms', 'large language model', 'large language models'],
+    'nlp': ['natural language processing'],
+    'rag': ['retrieval augmented generation', 'retrieval-augmented generation'],
+    'hugging face': ['huggingface'],
+    'kubernetes': ['k8s'],
+    'aws': ['amazon web services'],
+    'gcp': ['google cloud', 'google cloud platform'],
+    'rest apis': ['rest api', 'restful api', 'restful apis'],
+    'ci/cd': ['cicd', 'ci-cd'],
+    'vector databases': ['vector database', 'vector db'],
+}
+
+# Bump when the skill extraction logic changes so cached skill sets are invalidated
+SKILLS_VERSION = '4'
+
+def _get_skill_matcher():
+    """Build the skill automaton once per process"""
+    global skill_matcher
+    if skill_matcher is None:
+        taxonomy = None
+        if SKILL_TAXONOMY_PATH:
+            try:
+                taxonomy = load_taxonomy(SKILL_TAXONOMY_PATH)
+                logger.info(f"Loaded {len(taxonomy)} skills from {SKILL_TAXONOMY_PATH}")
+            except Exception as e:
+                logger.error(f"Error loading skill taxonomy {SKILL_TAXONOMY_PATH}: {e}")
+        start = time.perf_counter()
+        skill_matcher = SkillMatcher(build_phrase_map(CURATED_SKILLS, SKILL_ALIASES, taxonomy))
+        MODEL_STATUS['skill_matcher'].update(loaded=True, load_seconds=round(time.perf_counter() - start, 3))
+    return skill_matcher
+
+def warm_up():
+    """Load every model and run one encode so the first request pays no load latency.
+
+    Called before forking (gunicorn preload / worker pool) so the weights are
+    shared copy-on-write by all child processes.
+    """
+    start = time.perf_counter()
     _load_models()
-    
-    if sbert_model is None:
-        logger.error("SBERT model not loaded, returning fallback embedding")
-        # Return a simple fallback embedding
-        return np.zeros(384)  # Default size for all-MiniLM-L6-v2
-    
-    try:
-        return sbert_model.encode([text])[0]
-    except Exception as e:
-        logger.error(f"Error getting embeddings: {e}")
-        # Return a simple fallback embedding
-        return np.zeros(384)
+    _get_skill_matcher()
+    if sbert_model is not None:
+        try:
+            sbert_model.encode(['Warm-up: Python developer with machine learning experience.'])
+        except Exception as e:
+            logger.error(f"Warm-up encode failed: {e}")
+    MODEL_STATUS['warm_up_seconds'] = round(time.perf_counter() - start, 3)
+    MODEL_STATUS['pid'] = os.getpid()
+    return model_status()
+
+def model_status():
+    """Model-load state of this process; 'ready' once SBERT and the skill matcher are loaded"""
+    status = {k: (dict(v) if isinstance(v, dict) else v) for k, v in MODEL_STATUS.items()}
+    status['ready'] = MODEL_STATUS['sbert']['loaded'] and MODEL_STATUS['skill_matcher']['loaded']
+    return status
+
+def _model_metrics():
+    return [('model_load_seconds', 'gauge', 'Seconds this process took to load each model',
+             [({'model': name}, MODEL_STATUS[name]['load_seconds'])
+              for name in ('sbert', 'skill_matcher') if MODEL_STATUS[name]['loaded']])]
+
+register_collector(_model_metrics)
+
+def encode_texts(texts, batch_size=32):
+    """Encode raw texts with batched encode calls, skipping cached ones.
+
+    Every text is cached on its own, so re-encoding a document only pays for the
+    chunks that changed. Returns a (len(texts), dim) float32 matrix.
+    """
+    tag = _encoder_tag()
+    keys = [make_key(text, tag) for text in texts]
+    vectors = [embedding_cache.get(key) for key in keys]
+    pending = [i for i, v in enumerate(vectors) if v is None]
+    if pending:
+        _load_models()
+        if _encoder_tag() != tag:
+            # The configured backend could not be loaded; cache under the one actually used
+            keys = [make_key(text, _encoder_tag()) for text in texts]
+        if sbert_model is None:
+            logger.error("SBERT model not loaded, using fallback embeddings")
+        else:
+            try:
+                encoded = sbert_model.encode([texts[i] for i in pending], batch_size=batch_size)
+                for i, embedding in zip(pending, encoded):
+                    embedding_cache.set(keys[i], embedding)
+                    vectors[i] = embedding
+            except Exception as e:
+                logger.error(f"Error getting embeddings: {e}")
+    # Fallback embedding for anything that could not be encoded
+    vectors = [v if v is not None else np.zeros(EMBEDDING_DIM) for v in vectors]
+    if not vectors:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+    return np.vstack(vectors).astype(np.float32)
+
+def pool_chunk_embeddings(matrix, chunks, pooling=None):
+    """Pool chunk embeddings of one document into a single vector (mean, max or section-weighted)"""
+    pooling = pooling or EMBEDDING_POOLING
+    if len(matrix) == 1:
+        return matrix[0]
+    if pooling == 'max':
+        return matrix.max(axis=0)
+    weights = np.array([len(text.split()) for _, text in chunks], dtype=np.float32)
+    if pooling == 'section':
+        weights *= np.array([SECTION_WEIGHTS.get(section, 1.0) for section, _ in chunks], dtype=np.float32)
+    if weights.sum() == 0:
+        return matrix.mean(axis=0)
+    return (weights[:, None] * matrix).sum(axis=0) / weights.sum()
+
+def _document_chunks(text):
+    return chunk_text(text, EMBEDDING_CHUNK_WORDS) or [('body', text)]
+
+def get_embeddings_batch(texts, batch_size=32, pooling=None):
+    """Embed many documents; in chunked mode all chunks of all documents go through one batched encode.
+
+    Returns a (len(texts), dim) float32 matrix.
+    """
+    if EMBEDDING_MODE != 'chunked':
+        return encode_texts(texts, batch_size=batch_size)
+    doc_chunks = [_document_chunks(text) for text in texts]
+    matrix = encode_texts([chunk for chunks in doc_chunks for _, chunk in chunks], batch_size=batch_size)
+    pooled = []
+    offset = 0
+    for chunks in doc_chunks:
+        pooled.append(pool_chunk_embeddings(matrix[offset:offset + len(chunks)], chunks, pooling))
+        offset += len(chunks)
+    if not pooled:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+    return np.vstack(pooled).astype(np.float32)
+
+def get_embeddings(text, pooling=None):
+    """Get embeddings with error handling and fallback"""
+    return get_embeddings_batch([text], pooling=pooling)[0]
+
+def section_similarities(text, target_embedding):
+    """Similarity (0-100) of each section of a document to a target embedding, in document order"""
+    chunks = _document_chunks(text)
+    matrix = encode_texts([chunk for _, chunk in chunks])
+    order = []
+    rows = {}
+    for (section, _), row in zip(chunks, matrix):
+        if section not in rows:
+            order.append(section)
+            rows[section] = []
+        rows[section].append(row)
+    result = []
+    for section in order:
+        similarity = compute_cosine_similarity(np.mean(rows[section], axis=0), target_embedding)
+        result.append({'section': section, 'similarity': max(0, min(100, int(similarity * 100)))})
+    return result
+
+def cosine_similarity_matrix(matrix, vector):
+    """Cosine similarity of every row of matrix against one vector in a single matrix-vector product"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    vector = np.asarray(vector, dtype=np.float32)
+    row_norms = np.linalg.norm(matrix, axis=1)
+    vec_norm = np.linalg.norm(vector)
+    if vec_norm == 0:
+        return np.zeros(len(matrix), dtype=np.float32)
+    scores = matrix @ vector
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(row_norms > 0, scores / (row_norms * vec_norm), 0.0)
+    return scores.astype(np.float32)
 
 def compute_cosine_similarity(emb1, emb2):
     """Compute cosine similarity with error handling"""
@@ -82,36 +287,34 @@ def compute_cosine_similarity(emb1, emb2):
 
 def extract_skills(text, skill_list=None):
     """Extract skills with error handling"""
-    _load_models()
-    
-    if nlp is None:
-        logger.error("spaCy model not loaded, returning empty skills list")
-        return []
-    
+    matcher = _get_skill_matcher()
+    key = make_key(text, 'skill-matcher-' + matcher.fingerprint, SKILLS_VERSION)
+    cached = skills_cache.get(key)
+    if cached is not None:
+        return list(cached)
+
     try:
-        doc = nlp(text)
-        found_skills = set()
-        for token in doc:
-            t = token.text.lower().strip()
-            if t in CURATED_SKILLS:
-                found_skills.add(t)
-        for chunk in doc.noun_chunks:
-            t = chunk.text.lower().strip()
-            if t in CURATED_SKILLS:
-                found_skills.add(t)
-        for ent in doc.ents:
-            t = ent.text.lower().strip()
-            if t in CURATED_SKILLS:
-                found_skills.add(t)
+        found_skills = frozenset(matcher.match(text))
+        skills_cache.set(key, found_skills)
         return list(found_skills)
     except Exception as e:
         logger.error(f"Error extracting skills: {e}")
         return []
 
-def top_missing_skills(jd_skills, resume_skills, limit=10):
-    """Get top missing skills with error handling"""
+def extract_skills_batch(texts):
+    """Extract skills for many documents"""
+    return [extract_skills(text) for text in texts]
+
+def match_skills(texts):
+    """Skill set of each of many short texts (sentences); not cached"""
+    matcher = _get_skill_matcher()
+    return [matcher.match(text) for text in texts]
+
+def top_missing_skills(jd_skills, resume_skills, limit=10, weights=None):
+    """JD skills missing from the resume, heaviest first (weights: {skill: JD weight}, see coverage.skill_weights)"""
     try:
-        missing = list(jd_skills - resume_skills)
+        weights = weights or {}
+        missing = sorted(jd_skills - resume_skills, key=lambda skill: (-weights.get(skill, 0), skill))
         return missing[:limit]
     except Exception as e:
         logger.error(f"Error computing missing skills: {e}")
@@ -0,0 +1,174 @@
+import re
+import json
+import hashlib
+from collections import deque
+
+# Skill-friendly tokens: keeps "c++", "c#", "ci/cd", "node.js", "end-to-end" intact.
+# ASCII-only and case-insensitive, so tokens are lowercased one by one and keep the offsets of the original text
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./\-'][a-z0-9+#]+)*", re.IGNORECASE | re.ASCII)
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text)]
+
+
+def split_compound(token, keep, sep):
+    """Split "python/java" or "education-history" on sep, keeping runs that form a known token ("ci/cd", "end-to-end")"""
+    parts = token.split(sep)
+    pieces, i = [], 0
+    while i < len(parts):
+        # Longest run of parts starting at i that is a known token; a single part otherwise
+        j = next((j for j in range(len(parts), i + 1, -1) if sep.join(parts[i:j]) in keep), i + 1)
+        pieces.append(sep.join(parts[i:j]))
+        i = j
+    return pieces
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over token sequences.
+
+    Every skill phrase (and alias) is compiled once into a trie with failure
+    links, so a document is matched in a single pass over its tokens no matter
+    how many skills the taxonomy holds. Matches report the canonical skill name.
+    Slash-separated lists ("python/java", "aws/gcp") and hyphenated words
+    ("Education-History", "machine-learning") are matched part by part, except
+    for slash and hyphen tokens that appear in a phrase themselves ("ci/cd",
+    "scikit-learn", "end-to-end").
+    """
+
+    def __init__(self, phrases):
+        # phrases: {phrase: canonical skill}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self.canonical = []
+        self._compound_tokens = set()
+        ids = {}
+        for phrase, canonical in phrases.items():
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            self._compound_tokens.update(t for t in tokens if '/' in t or '-' in t)
+            if canonical not in ids:
+                ids[canonical] = len(self.canonical)
+                self.canonical.append(canonical)
+            self._add(tokens, ids[canonical])
+        self._build_failure_links()
+        digest = hashlib.sha1()
+        for phrase in sorted(phrases):
+            digest.update(f"{phrase}\x1f{phrases[phrase]}\x1e".encode('utf-8'))
+        self.fingerprint = digest.hexdigest()[:12]
+        self.size = len(phrases)
+
+    def _add(self, tokens, skill_id):
+        node = 0
+        for token in tokens:
+            nxt = self._goto[node].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        # Outputs are (skill id, phrase length in tokens) so spans can be recovered
+        if (skill_id, len(tokens)) not in self._out[node]:
+            self._out[node] = self._out[node] + ((skill_id, len(tokens)),)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                # Inherit matches of the longest proper suffix ("senior data engineer" also yields "data engineer")
+                self._out[child] = self._out[child] + tuple(
+                    s for s in self._out[self._fail[child]] if s not in self._out[child]
+                )
+
+    def _split(self, token):
+        """Pieces of a token: slash lists first, then hyphenated words (see split_compound)"""
+        keep = self._compound_tokens
+        if token in keep or ('/' not in token and '-' not in token):
+            return (token,)
+        pieces = []
+        for part in split_compound(token, keep, '/'):
+            if '-' in part and part not in keep:
+                pieces.extend(split_compound(part, keep, '-'))
+            else:
+                pieces.append(part)
+        return pieces
+
+    def _tokens(self, text):
+        """(start, end, token) for text, lowercased, with compound tokens split; offsets index into text itself"""
+        for m in TOKEN_RE.finditer(text):
+            start = m.start()
+            for piece in self._split(m.group().lower()):
+                yield start, start + len(piece), piece
+                # Pieces are separated by exactly one '/' or '-'
+                start += len(piece) + 1
+
+    def match(self, text):
+        """Return the set of canonical skills found in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        for _, _, token in self._tokens(text):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if out[node]:
+                found.update(skill_id for skill_id, _ in out[node])
+        return {self.canonical[i] for i in found}
+
+    def finditer(self, text):
+        """Yield (start, end, canonical) for every phrase occurrence in text, in the same single pass"""
+        goto, fail, out = self._goto, self._fail, self._out
+        starts = []
+        node = 0
+        for start, end, token in self._tokens(text):
+            starts.append(start)
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for skill_id, length in out[node]:
+                yield starts[-length], end, self.canonical[skill_id]
+
+
+def load_taxonomy(path):
+    """Load a skill taxonomy file into {canonical: [aliases]}.
+
+    Supported formats:
+      - .json: a list of skills, or an object mapping each skill to a list of aliases
+      - anything else: one skill per line, optionally "skill: alias, alias"; lines starting with '#' are comments
+    """
+    taxonomy = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            data = json.load(f)
+            if isinstance(data, dict):
+                return {k.lower(): [a.lower() for a in (v or [])] for k, v in data.items()}
+            return {s.lower(): [] for s in data}
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            skill, _, aliases = line.partition(':')
+            taxonomy[skill.strip().lower()] = [a.strip().lower() for a in aliases.split(',') if a.strip()]
+    return taxonomy
+
+
+def build_phrase_map(skills, aliases=None, taxonomy=None):
+    """Merge skills, alias mapping and an optional loaded taxonomy into {phrase: canonical}"""
+    phrases = {s: s for s in skills}
+    for source in (aliases or {}, taxonomy or {}):
+        for canonical in source:
+            phrases[canonical] = canonical
+        for canonical, alias_list in source.items():
+            for alias in alias_list:
+                phrases[alias] = canonical
+    return phrases
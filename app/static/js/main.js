@@ -88,4 +88,77 @@ if (window.matchedSkills && window.missingSkills && typeof window.fitScore !== '
       if (x > wordCloud.width - 120) { x = 20; y += 32; }
     });
   }
-} 
\ No newline at end of file
+} 
+// --- Streaming AI feedback (server-sent events) ---
+const feedbackLive = document.getElementById('feedback-live');
+// main.js can be included twice on the results page; only attach one stream
+if (feedbackLive && window.EventSource && !feedbackLive.dataset.bound) {
+  feedbackLive.dataset.bound = '1';
+  const streamText = document.getElementById('feedback-stream-text');
+  const statusText = document.getElementById('feedback-live-status');
+  const source = new EventSource(feedbackLive.dataset.streamUrl);
+
+  const fillSection = function(name, html) {
+    document.querySelectorAll('[data-feedback-section~="' + name + '"]').forEach(function(el) {
+      el.innerHTML = html;
+    });
+  };
+
+  const finish = function(event) {
+    // Native connection errors carry no data; EventSource reconnects on its own
+    if (!event.data) return;
+    source.close();
+    const payload = JSON.parse(event.data);
+    Object.keys(payload.sections || {}).forEach(function(name) {
+      fillSection(name, payload.sections[name]);
+    });
+    if (event.type === 'done') {
+      feedbackLive.remove();
+    } else {
+      feedbackLive.querySelector('.spinner-border').remove();
+      statusText.textContent = payload.error || 'AI feedback is unavailable.';
+    }
+  };
+
+  // The server replays the stream from the start on (re)connect
+  source.addEventListener('open', function() {
+    if (streamText) streamText.textContent = '';
+  });
+  // Plain-text feedback streams token by token
+  source.addEventListener('token', function(event) {
+    if (!streamText) return;
+    streamText.textContent += JSON.parse(event.data).text;
+    streamText.scrollTop = streamText.scrollHeight;
+  });
+  // Structured feedback streams one finished section at a time
+  source.addEventListener('section', function(event) {
+    const section = JSON.parse(event.data);
+    fillSection(section.name, section.html);
+  });
+  ['done', 'error', 'cancelled'].forEach(function(name) {
+    source.addEventListener(name, finish);
+  });
+}
+
+// --- Queued analysis: poll the job until it finishes, then reload the results page ---
+const analysisPending = document.getElementById('analysis-pending');
+if (analysisPending && !analysisPending.dataset.bound) {
+  analysisPending.dataset.bound = '1';
+  const pendingStatus = document.getElementById('analysis-pending-status');
+  const poll = function() {
+    fetch(analysisPending.dataset.statusUrl)
+      .then(function(response) { return response.json(); })
+      .then(function(job) {
+        if (job.status === 'running') {
+          pendingStatus.textContent = 'Analysis in progress...';
+        }
+        if (job.status === 'queued' || job.status === 'running') {
+          setTimeout(poll, 1000);
+        } else {
+          window.location.reload();
+        }
+      })
+      .catch(function() { setTimeout(poll, 3000); });
+  };
+  poll();
+}
@@ -0,0 +1,310 @@
+"""Persistent embedding store for reverse matching: rank stored resumes against a new JD.
+
+Files for a store at PATH:
+    PATH.vectors.npy   (capacity, dim) float16/float32 matrix, memory-mapped; rows are L2-normalized
+    PATH.ids.jsonl     sidecar with one {"id", "meta"} line per row and {"delete": id} tombstones;
+                       a row exists once its line is written, so readers never see half-written vectors
+    PATH.ivf.npz       optional inverted-file index (k-means centroids + row lists) for approximate search
+    PATH.lock          writer lock; several worker processes may append concurrently
+
+Search is exact (blocked matrix-vector product) until the store has
+VECTOR_INDEX_MIN_ROWS rows and an index was built; rows appended after the
+index was built are scanned exactly until the next rebuild (see maintain()).
+Deleted rows are masked out, not reclaimed.
+"""
+import os
+import json
+import fcntl
+import contextlib
+import logging
+import tempfile
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VECTOR_STORE_PATH = os.getenv('VECTOR_STORE_PATH', os.path.join(tempfile.gettempdir(), 'resume-reviewer-vectors'))
+# float16 halves disk/page cache but exact search pays for the float32 conversion
+VECTOR_DTYPE = os.getenv('VECTOR_DTYPE', 'float32')
+VECTOR_INDEX_MIN_ROWS = int(os.getenv('VECTOR_INDEX_MIN_ROWS', '50000'))
+VECTOR_INDEX_NPROBE = int(os.getenv('VECTOR_INDEX_NPROBE', '8'))
+# Rebuild the index once this share of the rows was appended after it was built
+VECTOR_INDEX_REBUILD_RATIO = 0.1
+SEARCH_BLOCK_ROWS = 65536
+INITIAL_CAPACITY = 1024
+
+
+def _normalize(matrix):
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _blocked_dot(matrix, rows, q):
+    """matrix[:rows] @ q in float32, one block at a time (bounded memory for float16 / huge stores)"""
+    scores = np.empty(rows, dtype=np.float32)
+    for start in range(0, rows, SEARCH_BLOCK_ROWS):
+        end = min(start + SEARCH_BLOCK_ROWS, rows)
+        scores[start:end] = np.asarray(matrix[start:end], dtype=np.float32) @ q
+    return scores
+
+
+def _top_k(scores, k):
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class IVFIndex:
+    """Inverted-file index: rows grouped by their nearest of nlist spherical k-means centroids"""
+
+    def __init__(self, centroids, order, offsets, rows):
+        self.centroids = centroids  # (nlist, dim) float32
+        self.order = order          # row ids grouped by list
+        self.offsets = offsets      # list i holds order[offsets[i]:offsets[i + 1]]
+        self.rows = rows            # rows covered by the index
+
+    @classmethod
+    def build(cls, matrix, rows, nlist=None, iterations=10, sample_per_list=64, seed=0):
+        rng = np.random.default_rng(seed)
+        nlist = nlist or max(1, int(np.sqrt(rows)))
+        sample_rows = np.sort(rng.choice(rows, size=min(rows, nlist * sample_per_list), replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(iterations):
+            assign = cls._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            empty = counts == 0
+            # Re-seed empty lists with random sample points
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = _normalize(sums)
+        assign = np.concatenate([
+            cls._assign(np.asarray(matrix[s:min(s + SEARCH_BLOCK_ROWS, rows)], dtype=np.float32), centroids)
+            for s in range(0, rows, SEARCH_BLOCK_ROWS)
+        ])
+        order = np.argsort(assign, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))])
+        return cls(centroids, order, offsets, rows)
+
+    @staticmethod
+    def _assign(vectors, centroids):
+        return np.argmax(vectors @ centroids.T, axis=1)
+
+    def candidates(self, q, nprobe=VECTOR_INDEX_NPROBE):
+        """Row ids in the nprobe lists closest to q"""
+        nprobe = min(nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ q), nprobe - 1)[:nprobe]
+        return np.concatenate([self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+
+    def save(self, path):
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, centroids=self.centroids, order=self.order, offsets=self.offsets, rows=self.rows)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['centroids'], data['order'], data['offsets'], int(data['rows']))
+
+
+class VectorStore:
+    def __init__(self, path=VECTOR_STORE_PATH, dim=384, dtype=VECTOR_DTYPE):
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.vectors_path = path + '.vectors.npy'
+        self.ids_path = path + '.ids.jsonl'
+        self.index_path = path + '.ivf.npz'
+        self.lock_path = path + '.lock'
+        self.ids = []
+        self.meta = []
+        self.row_of = {}
+        self._deleted = set()
+        self._deleted_rows = np.zeros(0, dtype=np.int64)
+        self._offset = 0
+        self._matrix = None
+        self.index = None
+        self._index_mtime = None
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def __len__(self):
+        self.refresh()
+        return len(self.row_of)
+
+    def __contains__(self, item_id):
+        self.refresh()
+        return item_id in self.row_of
+
+    def refresh(self):
+        """Pick up rows, deletions and index rebuilds written by other processes"""
+        with self._lock:
+            size = os.path.getsize(self.ids_path) if os.path.exists(self.ids_path) else 0
+            if size > self._offset:
+                with open(self.ids_path, 'rb') as f:
+                    f.seek(self._offset)
+                    data = f.read(size - self._offset)
+                # Only consume complete lines; a writer may be mid-append
+                end = data.rfind(b'\n') + 1
+                for line in data[:end].splitlines():
+                    record = json.loads(line)
+                    if 'delete' in record:
+                        row = self.row_of.pop(record['delete'], None)
+                        if row is not None:
+                            self._deleted.add(row)
+                        continue
+                    if record['id'] in self.row_of:
+                        self._deleted.add(self.row_of[record['id']])
+                    self.row_of[record['id']] = len(self.ids)
+                    self.ids.append(record['id'])
+                    self.meta.append(record.get('meta') or {})
+                self._offset += end
+                self._deleted_rows = np.fromiter(self._deleted, dtype=np.int64, count=len(self._deleted))
+            if self.ids and (self._matrix is None or self._matrix.shape[0] < len(self.ids)):
+                self._matrix = np.load(self.vectors_path, mmap_mode='r')
+            mtime = os.path.getmtime(self.index_path) if os.path.exists(self.index_path) else None
+            if mtime != self._index_mtime:
+                self.index = IVFIndex.load(self.index_path) if mtime else None
+                self._index_mtime = mtime
+
+    @contextlib.contextmanager
+    def _write_lock(self):
+        with self._lock, open(self.lock_path, 'a') as fp:
+            fcntl.flock(fp, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fp, fcntl.LOCK_UN)
+
+    def _writable_matrix(self, rows):
+        """Writable memmap with room for rows; grows the file (doubling) when needed"""
+        if not os.path.exists(self.vectors_path):
+            capacity = max(INITIAL_CAPACITY, rows)
+            return np.lib.format.open_memmap(self.vectors_path, mode='w+', dtype=self.dtype, shape=(capacity, self.dim))
+        matrix = np.load(self.vectors_path, mmap_mode='r+')
+        if matrix.shape[0] >= rows:
+            return matrix
+        tmp = self.vectors_path + '.tmp'
+        grown = np.lib.format.open_memmap(tmp, mode='w+', dtype=matrix.dtype, shape=(max(rows, 2 * matrix.shape[0]), self.dim))
+        for start in range(0, len(self.ids), SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, len(self.ids))
+            grown[start:end] = matrix[start:end]
+        grown.flush()
+        del matrix
+        os.replace(tmp, self.vectors_path)
+        return grown
+
+    def add(self, ids, vectors, metas=None):
+        """Append vectors (re-adding an id replaces its previous row)"""
+        vectors = _normalize(vectors)
+        metas = metas or [{}] * len(ids)
+        with self._write_lock():
+            self.refresh()
+            start = len(self.ids)
+            matrix = self._writable_matrix(start + len(ids))
+            matrix[start:start + len(ids)] = vectors.astype(matrix.dtype)
+            matrix.flush()
+            del matrix
+            with open(self.ids_path, 'ab') as f:
+                f.write(b''.join(
+                    json.dumps({'id': i, 'meta': m}).encode('utf-8') + b'\n' for i, m in zip(ids, metas)
+                ))
+            self._matrix = None
+            self.refresh()
+
+    def delete(self, ids):
+        with self._write_lock():
+            self.refresh()
+            lines = [json.dumps({'delete': i}).encode('utf-8') + b'\n' for i in ids if i in self.row_of]
+            if lines:
+                with open(self.ids_path, 'ab') as f:
+                    f.write(b''.join(lines))
+            self.refresh()
+        return len(lines)
+
+    def get(self, item_id):
+        """(float32 vector, meta) of a stored item, or None"""
+        self.refresh()
+        with self._lock:
+            row = self.row_of.get(item_id)
+            if row is None:
+                return None
+            return np.asarray(self._matrix[row], dtype=np.float32), self.meta[row]
+
+    def items(self):
+        """[(id, meta)] of every live item, in insertion order"""
+        self.refresh()
+        with self._lock:
+            return [(self.ids[row], self.meta[row]) for row in sorted(self.row_of.values())]
+
+    def search(self, query, k=10, exact=False, nprobe=VECTOR_INDEX_NPROBE):
+        """Top-k stored items by cosine similarity: [{'id', 'score', 'meta'}]"""
+        self.refresh()
+        with self._lock:
+            rows = len(self.ids)
+            matrix, index, deleted = self._matrix, self.index, self._deleted_rows
+        if not rows:
+            return []
+        q = _normalize(query)[0]
+        if index is not None and not exact:
+            candidates = np.concatenate([index.candidates(q, nprobe), np.arange(index.rows, rows)])
+            candidates = np.sort(candidates[candidates < rows])
+            scores = np.asarray(matrix[candidates], dtype=np.float32) @ q
+            scores[np.isin(candidates, deleted)] = -np.inf
+            top = _top_k(scores, k)
+            top_rows, top_scores = candidates[top], scores[top]
+        else:
+            scores = _blocked_dot(matrix, rows, q)
+            scores[deleted] = -np.inf
+            top_rows = _top_k(scores, k)
+            top_scores = scores[top_rows]
+        return [
+            {'id': self.ids[row], 'score': round(float(score), 4), 'meta': self.meta[row]}
+            for row, score in zip(top_rows, top_scores) if np.isfinite(score)
+        ]
+
+    def build_index(self, nlist=None):
+        with self._write_lock():
+            return self._build_index(nlist)
+
+    def _build_index(self, nlist=None):
+        # Caller holds the write lock
+        self.refresh()
+        rows = len(self.ids)
+        if not rows:
+            return None
+        index = IVFIndex.build(self._matrix, rows, nlist=nlist)
+        index.save(self.index_path)
+        self.refresh()
+        logger.info(f"Built vector index over {rows} rows ({len(index.centroids)} lists)")
+        return index
+
+    def maintain(self, min_rows=VECTOR_INDEX_MIN_ROWS):
+        """(Re)build the approximate index once the store is large enough or the index is stale"""
+        self.refresh()
+        if len(self.ids) < min_rows:
+            return False
+        with self._write_lock():
+            # Re-check under the lock: another worker may have just rebuilt it
+            self.refresh()
+            rows = len(self.ids)
+            if self.index is not None and rows - self.index.rows <= VECTOR_INDEX_REBUILD_RATIO * rows:
+                return False
+            self._build_index()
+        return True
+
+
+_store = None
+
+
+def get_vector_store():
+    global _store
+    if _store is None:
+        from .similarity_engine import EMBEDDING_DIM
+        _store = VectorStore(dim=EMBEDDING_DIM)
+    return _store
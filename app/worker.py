@@ -0,0 +1,181 @@
+"""Analysis worker pool.
+
+Each worker process loads the models once and then pulls jobs from the shared
+SQLite queue, so analysis throughput scales independently of the web workers.
+
+Usage:
+    python -m app.worker --processes 2
+"""
+import gc
+import os
+import sys
+import time
+import socket
+import signal
+import logging
+import argparse
+import threading
+import multiprocessing
+from .job_queue import get_queue
+from .analysis import analyze_documents, search_resumes, match_roles
+from .jd_catalog import get_catalog
+from .batch import score_documents
+from .document_store import janitor
+from .pdf_engine import shutdown_pool
+from .result_store import get_result_store
+from .report_renderer import purge_cache
+from .vector_store import get_vector_store
+from .similarity_engine import warm_up, model_status
+from .metrics import registry, counter, histogram, span
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = float(os.getenv('WORKER_POLL_INTERVAL', '0.2'))
+MAINTENANCE_INTERVAL = 30
+HEARTBEAT_INTERVAL = 5
+# Intra-op threads per worker process; keeps N workers from oversubscribing the CPU
+WORKER_TORCH_THREADS = int(os.getenv('WORKER_TORCH_THREADS', '1'))
+
+JOBS_TOTAL = counter('jobs_total', 'Queue jobs finished by this worker', ('kind', 'status'))
+JOB_SECONDS = histogram('job_seconds', 'Time to run one queue job', ('kind',))
+
+HANDLERS = {
+    'analysis': lambda payload: analyze_documents(payload['resume_doc'], payload.get('job_doc'), payload.get('role_id')),
+    'search': lambda payload: search_resumes(payload['job_text'], payload.get('k', 10), payload.get('exact', False)),
+    'match': lambda payload: match_roles(payload['resume_doc'], payload.get('k', 10)),
+    'catalog': lambda payload: get_catalog().add([(payload['role_id'], payload['title'], payload['job_text'])]),
+    'batch': lambda payload: score_documents(payload['job_doc'], payload['resume_docs']),
+}
+
+
+def _heartbeat(queue, name, status, stopped):
+    # On its own thread so a long job does not make the worker look dead (see JobQueue.fail_stale)
+    while True:
+        try:
+            queue.heartbeat(name, status)
+            queue.publish_metrics(name, registry.snapshot())
+        except Exception:
+            logger.exception(f"Worker {name} heartbeat failed")
+        if stopped.wait(HEARTBEAT_INTERVAL):
+            return
+
+
+def work(name, stop_event=None, poll_interval=POLL_INTERVAL):
+    """Claim and run jobs until stop_event is set"""
+    queue = get_queue()
+    # No-op when the models were preloaded before fork
+    status = model_status() if model_status()['ready'] else warm_up()
+    logger.info(f"Worker {name} ready")
+    stopped = threading.Event()
+    threading.Thread(target=_heartbeat, args=(queue, name, status, stopped),
+                     name=f'{name}-heartbeat', daemon=True).start()
+    try:
+        _work_loop(queue, name, stop_event, poll_interval)
+    finally:
+        stopped.set()
+
+
+def _work_loop(queue, name, stop_event, poll_interval):
+    last_maintenance = 0
+    while stop_event is None or not stop_event.is_set():
+        if time.time() - last_maintenance > MAINTENANCE_INTERVAL:
+            with span('maintenance'):
+                queue.fail_stale()
+                queue.purge()
+                janitor()
+                get_result_store().evict()
+                purge_cache()
+                try:
+                    get_vector_store().maintain()
+                except Exception:
+                    logger.exception("Vector index maintenance failed")
+            last_maintenance = time.time()
+        job = queue.claim(name)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        job_id, kind, payload = job
+        start = time.perf_counter()
+        try:
+            if not queue.complete(job_id, HANDLERS[kind](payload)):
+                logger.warning(f"Job {job_id} finished after it was marked failed; result discarded")
+            JOBS_TOTAL.labels(kind=kind, status='done').inc()
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            queue.fail(job_id, e)
+            JOBS_TOTAL.labels(kind=kind, status='failed').inc()
+        JOB_SECONDS.labels(kind=kind).observe(time.perf_counter() - start)
+
+
+def start_worker_thread():
+    """Run one worker inside the current process (development server)"""
+    thread = threading.Thread(target=work, args=(f'{socket.gethostname()}-{os.getpid()}-thread',), daemon=True)
+    thread.start()
+    return thread
+
+
+def _set_torch_threads(n):
+    try:
+        import torch
+        torch.set_num_threads(n)
+    except ImportError:
+        pass
+
+
+def _process_main(name):
+    _set_torch_threads(WORKER_TORCH_THREADS)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    # Ctrl-C is handled by the parent, which terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        work(name, stop_event)
+    finally:
+        shutdown_pool()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the analysis worker pool.')
+    parser.add_argument('--processes', type=int, default=int(os.getenv('ANALYSIS_WORKERS', '1')))
+    parser.add_argument('--no-preload', action='store_true', help='Load models in each worker instead of once before fork')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    context = multiprocessing.get_context('spawn' if args.no_preload else 'fork')
+    if not args.no_preload:
+        # Load once in the parent; forked workers share the weights copy-on-write
+        status = warm_up()
+        logger.info(f"Preloaded models in {status['warm_up_seconds']}s")
+        # Move everything allocated so far out of the GC's reach so collections
+        # in the children don't touch (and un-share) those pages
+        gc.freeze()
+
+    host = socket.gethostname()
+    # Not daemonic: workers start their own PDF page pool (pdf_engine), which daemonic processes may not
+    processes = [
+        context.Process(target=_process_main, args=(f'{host}-{i}',))
+        for i in range(args.processes)
+    ]
+
+    def shutdown(*_):
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    try:
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+    finally:
+        # Non-daemonic children are not killed with the parent; never leave them behind
+        shutdown()
+        for p in processes:
+            if p.pid is not None:
+                p.join()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Speed of the compiled ATS rule engine vs. the previous per-check regex implementation.
+
+Usage:
+    python benchmarks/bench_ats.py [--docs 500] [--extra-rules 0,50,200]
+
+Also grows the rule set with synthetic keyword rules, comparing the compiled
+scanner with running each rule's pattern as its own pass over the document.
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.ats_rules import RuleEngine
+from app.resume_utils import ATS_RULES, SECTION_HEADERS
+
+FILLER = ('led migration of services improving latency and reliability while mentoring '
+          'engineers and partnering with product on roadmap delivery').split()
+JOB_TEXT = ' '.join(FILLER * 10) + ' python java kubernetes aws sql'
+
+
+def make_corpus(n_docs, words_per_doc=700, seed=42):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n_docs):
+        lines = ['Jane Doe', 'jane.doe@example.com | +1 555 010 9999']
+        for header in rng.sample(SECTION_HEADERS, 5):
+            lines.append(header.title())
+            lines.extend(' '.join(rng.choice(FILLER) for _ in range(12)) for _ in range(words_per_doc // 60))
+            lines.append('')
+        corpus.append('\n'.join(lines))
+    return corpus
+
+
+def legacy_check(resume_text, job_text, matched_skills):
+    """The pre-engine implementation: one regex pass per header plus separate checks"""
+    issues = []
+    found_headers = [h for h in SECTION_HEADERS if re.search(rf'\b{h}\b', resume_text, re.IGNORECASE)]
+    if len(found_headers) < 3:
+        issues.append('Section Headers')
+    if len(matched_skills) < 0.5 * len(set(job_text.lower().split())):
+        issues.append('Keyword Density')
+    if re.search(r'\|\t|\n\s*\n', resume_text):
+        issues.append('No Tables/Columns')
+    contact_pattern = r'([\w\.-]+@[\w\.-]+)|(\+?\d[\d\s\-]{7,}\d)'
+    lines = resume_text.split('\n')
+    top = ' '.join(lines[:5])
+    bottom = ' '.join(lines[-5:])
+    if not (re.search(contact_pattern, top) or re.search(contact_pattern, bottom)):
+        issues.append('Contact Info')
+    return issues
+
+
+def synthetic_rules(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        {'name': f'rule {i}', 'keywords': [f'kw{rng.randrange(100000)}' for _ in range(10)], 'min_matches': 1}
+        for i in range(n)
+    ]
+
+
+def per_rule_passes(rules):
+    """Baseline for large rule sets: every rule scans the document separately"""
+    compiled = [
+        re.compile(rf"\b(?:{'|'.join(re.escape(k) for k in rule['keywords'])})\b", re.IGNORECASE)
+        for rule in rules if rule.get('keywords')
+    ]
+    return lambda text: [len(p.findall(text)) for p in compiled]
+
+
+def timed(name, fn, corpus):
+    start = time.perf_counter()
+    for text in corpus:
+        fn(text)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<40} {len(corpus) / elapsed:>10.1f} docs/s")
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=500)
+    parser.add_argument('--extra-rules', default='0,50,200')
+    args = parser.parse_args(argv)
+    corpus = make_corpus(args.docs)
+    matched = ['python', 'sql']
+
+    timed('legacy check_ats_compatibility', lambda t: legacy_check(t, JOB_TEXT, matched), corpus)
+    engine = RuleEngine(ATS_RULES)
+    timed('rule engine (built-in rules)', lambda t: engine.evaluate(t, job_text=JOB_TEXT, matched_skills=matched), corpus)
+
+    for n in [int(x) for x in args.extra_rules.split(',') if x]:
+        if not n:
+            continue
+        rules = ATS_RULES + synthetic_rules(n)
+        engine = RuleEngine(rules)
+        timed(f'rule engine (+{n} rules, compiled)', lambda t: engine.evaluate(t, job_text=JOB_TEXT, matched_skills=matched), corpus)
+        timed(f'per-rule passes (+{n} rules)', per_rule_passes(rules), corpus)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Throughput of the feedback pipeline (job pool + provider wrapper) without the network.
+
+Usage:
+    LLM_PROVIDER=local python benchmarks/bench_feedback.py [--jobs 40] [--latency 0.2] [--tokens-per-second 200]
+
+Runs feedback jobs through feedback_jobs exactly as the web app does, against
+the deterministic local stand-in provider, and reports jobs/s, time to first
+token and total time per job. The feedback cache is bypassed with unique inputs.
+"""
+import os
+import sys
+import time
+import uuid
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('LLM_PROVIDER', 'local')
+os.environ.setdefault('PROMPT_TOKENIZER', 'approx')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=40)
+    parser.add_argument('--latency', type=float, help='Override LOCAL_LLM_LATENCY')
+    parser.add_argument('--tokens-per-second', type=float, help='Override LOCAL_LLM_TOKENS_PER_SECOND')
+    args = parser.parse_args(argv)
+    if args.latency is not None:
+        os.environ['LOCAL_LLM_LATENCY'] = str(args.latency)
+    if args.tokens_per_second is not None:
+        os.environ['LOCAL_LLM_TOKENS_PER_SECOND'] = str(args.tokens_per_second)
+
+    from app.feedback_generator import get_provider
+    from app.feedback_jobs import start_feedback_job, get_feedback_job, FEEDBACK_WORKERS
+
+    start = time.perf_counter()
+    job_ids = [
+        start_feedback_job(f'Resume {uuid.uuid4().hex} Python engineer with experience', 'Senior Python developer')
+        for _ in range(args.jobs)
+    ]
+    first_token, finished = {}, {}
+    while len(finished) < len(job_ids):
+        for job_id in job_ids:
+            job = get_feedback_job(job_id)
+            if job_id not in first_token and job.chunks:
+                first_token[job_id] = time.perf_counter() - start
+            if job_id not in finished and job.finished:
+                finished[job_id] = time.perf_counter() - start
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+
+    statuses = [get_feedback_job(j).status for j in job_ids]
+    ttft = sorted(first_token.values())
+    print(f"provider {get_provider().name}, {FEEDBACK_WORKERS} feedback workers, {args.jobs} jobs")
+    print(f"  throughput        {args.jobs / elapsed:8.2f} jobs/s")
+    print(f"  first token p50   {ttft[len(ttft) // 2]:8.2f} s   (incl. queueing)")
+    print(f"  completed p50     {sorted(finished.values())[len(finished) // 2]:8.2f} s")
+    print(f"  statuses          {dict((s, statuses.count(s)) for s in set(statuses))}")
+    print(f"  structured        {sum(bool(get_feedback_job(j).result.get('structured')) for j in job_ids)}/{args.jobs}")
+    print(f"  provider stats    {get_provider().status()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
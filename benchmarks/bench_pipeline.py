@@ -0,0 +1,376 @@
+"""Per-stage timings and concurrent request throughput of the analysis pipeline, saved as JSON.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--pages 1,2,4] [--densities 0.01,0.05] [--per-cell 3] [--repeat 3]
+                                        [--clients 1,4,8] [--requests 24] [--workers 2] [--pdf-workers 0,2]
+                                        [--out FILE] [--compare BASELINE.json] [--threshold 0.2]
+
+Runs fully offline on a synthetic corpus (benchmarks/corpus.py):
+
+* stages: extract_text_from_pdf, get_embeddings, extract_skills,
+  check_ats_compatibility, generate_feedback (deterministic local LLM stand-in,
+  no latency) and the results page render, each timed per document with the
+  analysis caches disabled so every call does the real work;
+* load: for each --clients level, that many client threads drive the Flask app
+  (test client) through the browser flow (POST /, then GET /results until the
+  report renders) against a `python -m app.worker` pool of --workers processes;
+* worker_parse: for each --pdf-workers setting, the corpus PDFs are uploaded
+  through /api/jobs to a fresh worker pool started with that PDF_WORKERS, and
+  the workers' own parse time (and the whole job's) is reported per page count.
+  This is the production parse path, page pool included.
+
+Queue, document, report and vector stores live in a temporary directory.
+Results go to --out (default benchmarks/results/pipeline-<commit>.json) together
+with the commit, machine and arguments. --compare prints the change against an
+earlier results file and exits with status 1 when a stage's p50 or a load
+level's p95 latency got more than --threshold slower, or its throughput that
+much lower, so it can gate CI.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import threading
+import subprocess
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+WORKDIR = tempfile.mkdtemp(prefix='pipeline-bench-')
+# Everything the app and the worker pool persist goes to WORKDIR; must be set before app imports
+BENCH_ENV = {
+    'JOB_QUEUE_DB': os.path.join(WORKDIR, 'jobs.sqlite3'),
+    'DOCUMENT_STORE_DB': os.path.join(WORKDIR, 'documents.sqlite3'),
+    'RESULT_STORE_DB': os.path.join(WORKDIR, 'results.sqlite3'),
+    'VECTOR_STORE_PATH': os.path.join(WORKDIR, 'vectors'),
+    'REPORT_CACHE_DIR': os.path.join(WORKDIR, 'reports'),
+    'REPORT_PRERENDER': '0',
+    'MAX_QUEUE_DEPTH': '1000',
+    'EMBEDDING_CACHE_SIZE': '0',
+    'SKILLS_CACHE_SIZE': '0',
+    'FEEDBACK_CACHE_SIZE': '0',
+}
+os.environ.update(BENCH_ENV)
+os.environ.pop('ANALYSIS_CACHE_DB', None)
+# Overridable, e.g. LOCAL_LLM_LATENCY=1 to see the load test with a slow LLM
+os.environ.setdefault('LLM_PROVIDER', 'local')
+os.environ.setdefault('LOCAL_LLM_LATENCY', '0')
+os.environ.setdefault('LOCAL_LLM_TOKENS_PER_SECOND', '1000000')
+
+from corpus import make_corpus, write_pdf
+
+STAGES = ['extract_text_from_pdf', 'get_embeddings', 'extract_skills', 'check_ats_compatibility',
+          'generate_feedback', 'render_results']
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+READY_TIMEOUT = 600
+
+
+def summarize(samples):
+    """Milliseconds: count, mean, p50, p95, max"""
+    ms = np.asarray(samples) * 1000
+    return {
+        'n': len(ms),
+        'mean_ms': round(float(ms.mean()), 3),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'max_ms': round(float(ms.max()), 3),
+    }
+
+
+def timed(samples, stage, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    samples.setdefault(stage, []).append(time.perf_counter() - start)
+    return result
+
+
+def write_pdfs(docs):
+    for doc in docs:
+        if 'pdf' not in doc:
+            doc['pdf'] = os.path.join(WORKDIR, f"{doc['id']}.pdf")
+            doc['pdf_pages'] = write_pdf(doc['resume_text'], doc['pdf'])
+
+
+def bench_stages(docs, repeat):
+    from app import create_app
+    from app.analysis import run_analysis
+    from app.routes import _render_report
+    from app.resume_utils import extract_text_from_pdf, check_ats_compatibility
+    from app.similarity_engine import get_embeddings, extract_skills, warm_up
+    from app.feedback_generator import generate_feedback
+
+    warm_up()
+    app = create_app()
+    samples, by_pages = {}, {}
+    write_pdfs(docs)
+    for _ in range(repeat):
+        for doc in docs:
+            doc_samples = {}
+            resume_text = timed(doc_samples, 'extract_text_from_pdf', extract_text_from_pdf, doc['pdf'])
+            job_text = doc['job_text']
+            timed(doc_samples, 'get_embeddings', get_embeddings, resume_text)
+            matched = set(timed(doc_samples, 'extract_skills', extract_skills, resume_text)) & set(extract_skills(job_text))
+            timed(doc_samples, 'check_ats_compatibility', check_ats_compatibility, resume_text, job_text, list(matched))
+            feedback = timed(doc_samples, 'generate_feedback', generate_feedback, resume_text, job_text)
+            # The real results page, from a full analysis (not timed here; see the load test)
+            report = dict(run_analysis(resume_text, job_text), feedback=feedback)
+            with app.test_request_context('/results'):
+                timed(doc_samples, 'render_results', _render_report, doc['id'], report)
+            for stage, values in doc_samples.items():
+                samples.setdefault(stage, []).extend(values)
+                by_pages.setdefault(doc['pdf_pages'], {}).setdefault(stage, []).extend(values)
+    return (
+        {stage: summarize(samples[stage]) for stage in STAGES},
+        {str(pages): {stage: summarize(values)['p50_ms'] for stage, values in stages.items()}
+         for pages, stages in sorted(by_pages.items())},
+    )
+
+
+def start_workers(n, pdf_workers=None):
+    """`python -m app.worker` pool with the benchmark's environment; waits until it is ready"""
+    from app.job_queue import get_queue
+    env = dict(os.environ)
+    if pdf_workers is not None:
+        env['PDF_WORKERS'] = str(pdf_workers)
+    started = time.time()
+    proc = subprocess.Popen([sys.executable, '-m', 'app.worker', '--processes', str(n)],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.time() + READY_TIMEOUT
+    # Heartbeats of an earlier pool do not count
+    while sum(bool(w['status'].get('ready')) for w in get_queue().workers() if w['heartbeat_at'] >= started) < n:
+        if proc.poll() is not None:
+            raise RuntimeError(f'worker pool exited: {proc.stderr.read().decode(errors="replace")[-2000:]}')
+        if time.time() > deadline:
+            proc.terminate()
+            raise RuntimeError(f'worker pool not ready after {READY_TIMEOUT}s')
+        time.sleep(0.5)
+    return proc
+
+
+def browser_flow(client, doc, poll_interval=0.02):
+    """Submit one resume/JD pair and poll /results until the report renders; returns the outcome"""
+    response = client.post('/', data={'resume_text': doc['resume_text'], 'job_text': doc['job_text']})
+    if response.status_code != 302:
+        return 'failed'
+    while True:
+        response = client.get('/results')
+        if response.status_code == 429:
+            return 'rejected'
+        if response.status_code != 200:
+            return 'failed'
+        if b'id="analysis-pending"' not in response.data:
+            return 'ok'
+        time.sleep(poll_interval)
+
+
+def bench_load(docs, levels, n_requests):
+    from app import create_app
+    app = create_app()
+    results = []
+    for clients in levels:
+        outcomes, latencies, lock = [], [], threading.Lock()
+        work = [docs[i % len(docs)] for i in range(n_requests)]
+
+        def client_thread(index):
+            client = app.test_client()
+            for doc in work[index::clients]:
+                start = time.perf_counter()
+                outcome = browser_flow(client, doc)
+                with lock:
+                    outcomes.append(outcome)
+                    if outcome == 'ok':
+                        latencies.append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=client_thread, args=(i,)) for i in range(clients)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        level = {
+            'clients': clients,
+            'requests': n_requests,
+            'ok': outcomes.count('ok'),
+            'rejected': outcomes.count('rejected'),
+            'failed': outcomes.count('failed'),
+            'seconds': round(elapsed, 3),
+            'requests_per_second': round(outcomes.count('ok') / elapsed, 3),
+        }
+        if latencies:
+            level.update({f'latency_{k}': v for k, v in summarize(latencies).items() if k != 'n'})
+        results.append(level)
+        print(f"  {clients:>3} clients: {level['requests_per_second']:7.2f} req/s  "
+              f"p50 {level.get('latency_p50_ms', float('nan')):8.1f} ms  p95 {level.get('latency_p95_ms', float('nan')):8.1f} ms  "
+              f"ok {level['ok']} rejected {level['rejected']} failed {level['failed']}")
+    return results
+
+
+def bench_worker_parse(docs, pdf_workers, poll_interval=0.02):
+    """Upload every corpus PDF through /api/jobs, one at a time, and collect the workers' parse timings"""
+    from app import create_app
+    write_pdfs(docs)
+    client = create_app().test_client()
+    parse, jobs, by_pages = [], [], {}
+    for doc in docs:
+        start = time.perf_counter()
+        with open(doc['pdf'], 'rb') as f:
+            response = client.post('/api/jobs', data={'resume_file': (f, 'resume.pdf'), 'job_text': doc['job_text']},
+                                   content_type='multipart/form-data')
+        if response.status_code != 202:
+            raise RuntimeError(f"/api/jobs answered {response.status_code}: {response.get_json()}")
+        status_url = response.get_json()['status_url']
+        while True:
+            job = client.get(status_url).get_json()
+            if job['status'] in ('done', 'failed'):
+                break
+            time.sleep(poll_interval)
+        if job['status'] == 'failed':
+            raise RuntimeError(f"analysis job failed: {job['error']}")
+        jobs.append(time.perf_counter() - start)
+        parse.append(job['result']['timings']['parse'])
+        by_pages.setdefault(doc['pdf_pages'], []).append(job['result']['timings']['parse'])
+    return {
+        'pdf_workers': pdf_workers,
+        'parse': summarize(parse),
+        'job': summarize(jobs),
+        'parse_p50_ms_by_pages': {str(pages): summarize(values)['p50_ms'] for pages, values in sorted(by_pages.items())},
+    }
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def compare(current, baseline, threshold):
+    """Print the change against a baseline run; returns the list of regressions"""
+    regressions = []
+    print(f"\nvs. {baseline['meta']['commit']}{' (dirty)' if baseline['meta'].get('dirty') else ''}")
+    print(f"{'metric':<40} {'baseline':>10} {'current':>10} {'change':>8}")
+
+    def check(name, old, new, higher_is_better=False):
+        if old is None or new is None or old == 0:
+            return
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        flag = '  REGRESSION' if worse > threshold else ''
+        if flag:
+            regressions.append(name)
+        print(f"{name:<40} {old:>10.2f} {new:>10.2f} {change:>+7.1%}{flag}")
+
+    for stage, summary in current['stages'].items():
+        check(f'{stage} p50 ms', baseline['stages'].get(stage, {}).get('p50_ms'), summary['p50_ms'])
+    old_parse = {run['pdf_workers']: run for run in baseline.get('worker_parse', [])}
+    for run in current.get('worker_parse', []):
+        if run['pdf_workers'] in old_parse:
+            check(f"worker parse ({run['pdf_workers']} pdf workers) p50 ms",
+                  old_parse[run['pdf_workers']]['parse']['p50_ms'], run['parse']['p50_ms'])
+    old_levels = {level['clients']: level for level in baseline.get('load', [])}
+    for level in current.get('load', []):
+        old = old_levels.get(level['clients'])
+        if old is None:
+            continue
+        check(f"load {level['clients']} clients req/s", old['requests_per_second'], level['requests_per_second'],
+              higher_is_better=True)
+        check(f"load {level['clients']} clients p95 ms", old.get('latency_p95_ms'), level.get('latency_p95_ms'))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', default='1,2,4')
+    parser.add_argument('--densities', default='0.01,0.05')
+    parser.add_argument('--per-cell', type=int, default=3, help='Documents per pages x density combination')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--clients', default='1,4,8', help='Concurrency levels of the load test (empty to skip it)')
+    parser.add_argument('--requests', type=int, default=24, help='Requests per concurrency level')
+    parser.add_argument('--workers', type=int, default=2, help='Analysis worker processes')
+    parser.add_argument('--pdf-workers', default='0,2',
+                        help='PDF_WORKERS settings for the worker-path parse benchmark (empty to skip it)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative slowdown counted as a regression')
+    args = parser.parse_args(argv)
+
+    docs = make_corpus(pages=[int(p) for p in args.pages.split(',') if p],
+                       densities=[float(d) for d in args.densities.split(',') if d],
+                       per_cell=args.per_cell, seed=args.seed)
+    commit, dirty = git_revision()
+    from app.similarity_engine import ENCODER_BACKEND
+    results = {
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'encoder_backend': ENCODER_BACKEND,
+            'llm_provider': os.environ['LLM_PROVIDER'],
+            'args': vars(args),
+        },
+        'corpus': {'documents': len(docs), 'pages': args.pages, 'densities': args.densities, 'seed': args.seed},
+    }
+    try:
+        print(f"stages: {len(docs)} documents x {args.repeat}")
+        results['stages'], results['stages_by_pages'] = bench_stages(docs, args.repeat)
+        print(f"{'stage':<26} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+        for stage, s in results['stages'].items():
+            print(f"{stage:<26} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['mean_ms']:>9.2f}")
+
+        pdf_settings = [int(w) for w in args.pdf_workers.split(',') if w]
+        if pdf_settings:
+            results['worker_parse'] = []
+            print(f"worker parse: {len(docs)} PDFs through /api/jobs, {args.workers} analysis workers")
+            for pdf_workers in pdf_settings:
+                pool = start_workers(args.workers, pdf_workers=pdf_workers)
+                try:
+                    run = bench_worker_parse(docs, pdf_workers)
+                finally:
+                    pool.terminate()
+                    pool.wait()
+                results['worker_parse'].append(run)
+                print(f"  PDF_WORKERS={pdf_workers}: parse p50 {run['parse']['p50_ms']:8.1f} ms  "
+                      f"job p50 {run['job']['p50_ms']:8.1f} ms  by pages {run['parse_p50_ms_by_pages']}")
+
+        levels = [int(c) for c in args.clients.split(',') if c]
+        if levels:
+            print(f"load: {args.requests} requests per level, {args.workers} analysis workers")
+            pool = start_workers(args.workers)
+            try:
+                results['load'] = bench_load(docs, levels, args.requests)
+            finally:
+                pool.terminate()
+                pool.wait()
+    finally:
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"pipeline-{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"saved {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Speed and recall of the Aho-Corasick skill matcher vs. the previous spaCy matcher.
+
+Usage:
+    python benchmarks/bench_skill_matcher.py [--docs 200] [--taxonomy-size 50000]
+
+Synthetic documents embed a known set of skills in filler text, so recall is
+measured against ground truth. A second corpus writes the skills as slash lists
+("python/java, aws/gcp"), the way skills sections often do. The spaCy baseline is skipped when spaCy or
+en_core_web_sm is not installed.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.similarity_engine import CURATED_SKILLS, SKILL_ALIASES
+from app.skill_matcher import SkillMatcher, build_phrase_map
+
+FILLER = ('responsible for delivering results across teams while improving processes and '
+          'mentoring colleagues on best practices in a fast paced environment').split()
+
+
+def make_corpus(skills, n_docs, words_per_doc=600, skills_per_doc=15, seed=42, slash_lists=False):
+    rng = random.Random(seed)
+    skills = sorted(skills)
+    corpus = []
+    for _ in range(n_docs):
+        planted = rng.sample(skills, skills_per_doc)
+        words = [rng.choice(FILLER) for _ in range(words_per_doc)]
+        # Slash lists join two or three skills into one "word": "python/java/sql,"
+        groups, i = [], 0
+        while i < len(planted):
+            size = rng.randint(2, 3) if slash_lists else 1
+            groups.append(planted[i:i + size])
+            i += size
+        for group in groups:
+            words.insert(rng.randrange(len(words)), '/'.join(group) + ',')
+        corpus.append((' '.join(words), set(planted)))
+    return corpus
+
+
+def legacy_spacy_extract(nlp):
+    """The pre-automaton implementation: full spaCy pipeline, tokens/noun chunks/entities"""
+    def extract(text):
+        doc = nlp(text)
+        found = set()
+        for span in list(doc) + list(doc.noun_chunks) + list(doc.ents):
+            t = span.text.lower().strip()
+            if t in CURATED_SKILLS:
+                found.add(t)
+        return found
+    return extract
+
+
+def run(name, extract, corpus):
+    start = time.perf_counter()
+    outputs = [extract(text) for text, _ in corpus]
+    elapsed = time.perf_counter() - start
+    hits = sum(len(found & planted) for found, (_, planted) in zip(outputs, corpus))
+    total = sum(len(planted) for _, planted in corpus)
+    print(f"{name:<28} {len(corpus) / elapsed:>10.1f} docs/s   recall {hits / total:.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=200)
+    parser.add_argument('--taxonomy-size', type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    # Ground truth uses canonical names only, so alias folding does not count against recall
+    alias_names = {a for aliases in SKILL_ALIASES.values() for a in aliases}
+    skills = CURATED_SKILLS - alias_names
+    corpus = make_corpus(skills, args.docs)
+    slash_corpus = make_corpus(skills, args.docs, slash_lists=True)
+
+    start = time.perf_counter()
+    matcher = SkillMatcher(build_phrase_map(CURATED_SKILLS, SKILL_ALIASES))
+    print(f"Built curated automaton ({matcher.size} phrases) in {time.perf_counter() - start:.3f}s")
+    run('aho-corasick (curated)', matcher.match, corpus)
+    run('aho-corasick (slash lists)', matcher.match, slash_corpus)
+
+    # Large synthetic taxonomy: curated skills plus generated multi-word phrases
+    rng = random.Random(7)
+    vocab = [f"tech{i}" for i in range(5000)]
+    large = set(CURATED_SKILLS)
+    while len(large) < args.taxonomy_size:
+        large.add(' '.join(rng.sample(vocab, rng.randint(1, 3))))
+    start = time.perf_counter()
+    big_matcher = SkillMatcher(build_phrase_map(large, SKILL_ALIASES))
+    print(f"Built large automaton ({big_matcher.size} phrases) in {time.perf_counter() - start:.3f}s")
+    run(f'aho-corasick ({len(large) // 1000}k skills)', big_matcher.match, corpus)
+
+    try:
+        import spacy
+        nlp = spacy.load('en_core_web_sm')
+    except Exception as e:
+        print(f"spaCy baseline skipped: {e}")
+        return 0
+    run('spacy en_core_web_sm', legacy_spacy_extract(nlp), corpus)
+    run('spacy (slash lists)', legacy_spacy_extract(nlp), slash_corpus)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Recall and latency of exact vs. IVF search in the resume vector store.
+
+Usage:
+    python benchmarks/bench_vector_index.py [--sizes 10000,100000,1000000] [--queries 100] [--dtype float16]
+
+Vectors are synthetic (clustered, 384-dim like all-MiniLM-L6-v2) and written to
+a temporary store; recall@k is measured against exact search. 1M vectors
+take ~1.5 GB on disk as float32 (half with --dtype float16).
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.vector_store import VectorStore
+
+DIM = 384
+APPEND_BATCH = 50000
+
+
+def clustered_vectors(n, rng, clusters=2000, spread=0.35):
+    # Same topic centers for stored vectors and queries; rng only drives sampling
+    centers = np.random.default_rng(12345).normal(size=(clusters, DIM)).astype(np.float32)
+    for start in range(0, n, APPEND_BATCH):
+        size = min(APPEND_BATCH, n - start)
+        yield centers[rng.integers(clusters, size=size)] + spread * rng.normal(size=(size, DIM)).astype(np.float32)
+
+
+def bench(n, queries, k, dtype, nprobes, workdir):
+    rng = np.random.default_rng(0)
+    store = VectorStore(os.path.join(workdir, f'bench-{n}'), dim=DIM, dtype=dtype)
+    start = time.perf_counter()
+    for block in clustered_vectors(n, rng):
+        base = len(store.ids)
+        store.add([str(base + i) for i in range(len(block))], block)
+    print(f"\n{n:,} vectors ({dtype}): appended in {time.perf_counter() - start:.1f}s")
+
+    qs = next(clustered_vectors(queries, np.random.default_rng(1)))
+    start = time.perf_counter()
+    truth = [{r['id'] for r in store.search(q, k=k, exact=True)} for q in qs]
+    exact_ms = (time.perf_counter() - start) / queries * 1000
+    print(f"  exact           {exact_ms:8.2f} ms/query   recall@{k} 1.000")
+
+    start = time.perf_counter()
+    index = store.build_index()
+    print(f"  IVF build       {time.perf_counter() - start:8.1f} s ({len(index.centroids)} lists)")
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        found = [{r['id'] for r in store.search(q, k=k, nprobe=nprobe)} for q in qs]
+        ivf_ms = (time.perf_counter() - start) / queries * 1000
+        recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+        print(f"  IVF nprobe={nprobe:<4} {ivf_ms:8.2f} ms/query   recall@{k} {recall:.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--dtype', default='float32', choices=['float16', 'float32'])
+    parser.add_argument('--nprobe', default='4,8,32')
+    args = parser.parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='vector-bench-')
+    try:
+        for n in [int(x) for x in args.sizes.split(',') if x]:
+            bench(n, args.queries, args.k, args.dtype, [int(x) for x in args.nprobe.split(',')], workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Synthetic resume / job description corpus for the pipeline benchmarks.
+
+    from corpus import make_corpus, write_pdf
+    docs = make_corpus(pages=(1, 2, 4), densities=(0.01, 0.05), per_cell=3)
+
+Every document is generated from a seeded RNG, so the same arguments always
+give the same corpus and results stay comparable between commits. A document
+varies by page count (length), skill density (share of words that are skills
+from the curated list) and section layout. write_pdf() lays a resume out as a
+text PDF with the built-in report writer, one page per LINES_PER_PAGE lines.
+"""
+import os
+import sys
+import random
+import textwrap
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.similarity_engine import CURATED_SKILLS
+from app.report_renderer import _pdf_document, _pdf_string, PAGE_HEIGHT, MARGIN
+
+WORDS_PER_PAGE = 300
+LINES_PER_PAGE = 48
+LINE_CHARS = 95
+
+SECTIONS = ['Summary', 'Experience', 'Projects', 'Education', 'Skills', 'Certifications']
+FILLER = ('led migration of services improving latency and reliability while mentoring engineers '
+          'partnering with product on roadmap delivery owned design reviews reduced costs shipped '
+          'features for customers across regions measured results and automated releases').split()
+VERBS = ['Built', 'Led', 'Designed', 'Shipped', 'Automated', 'Reduced', 'Scaled', 'Migrated']
+JOB_INTRO = ['We are hiring a {title} to join our platform team.',
+             'You will own production systems end to end and work closely with product.']
+TITLES = ['Senior Python Engineer', 'Machine Learning Engineer', 'Data Engineer', 'Backend Developer']
+
+# Single words only, so planted skills are found as-is (multi-word aliases are covered by bench_skill_matcher)
+SKILLS = sorted(s for s in CURATED_SKILLS if s.isalpha() and len(s) > 2)
+
+
+def _sentence(rng, skills, density, length):
+    words = []
+    for _ in range(length):
+        words.append(rng.choice(skills) if rng.random() < density else rng.choice(FILLER))
+    return f"{rng.choice(VERBS)} {' '.join(words)}."
+
+
+def make_resume(rng, pages=1, density=0.03, skills=SKILLS):
+    """Resume text of about pages * WORDS_PER_PAGE words, density of them skills"""
+    target, words = pages * WORDS_PER_PAGE, 0
+    lines = ['Jane Doe', 'jane.doe@example.com | +1 555 010 9999', '']
+    sections = rng.sample(SECTIONS, rng.randint(4, len(SECTIONS)))
+    while words < target:
+        for header in sections:
+            lines.append(header.upper())
+            for _ in range(rng.randint(2, 5)):
+                sentence = _sentence(rng, skills, density, rng.randint(12, 24))
+                lines.append(f'- {sentence}')
+                words += len(sentence.split())
+                if words >= target:
+                    break
+            lines.append('')
+            if words >= target:
+                break
+    return '\n'.join(lines)
+
+
+def make_job(rng, density=0.08, skills=SKILLS):
+    """A job description of a few hundred words with its own required skills"""
+    required = rng.sample(skills, min(len(skills), rng.randint(6, 14)))
+    lines = [line.format(title=rng.choice(TITLES)) for line in JOB_INTRO]
+    lines.append('Requirements:')
+    lines += [f'- Experience with {skill} in production.' for skill in required]
+    lines.append('Responsibilities:')
+    lines += [f'- {_sentence(rng, required, density, rng.randint(10, 18))}' for _ in range(rng.randint(5, 10))]
+    return '\n'.join(lines)
+
+
+def make_corpus(pages=(1, 2, 4), densities=(0.01, 0.05), per_cell=3, seed=42):
+    """[{'id', 'pages', 'density', 'resume_text', 'job_text'}] for every pages x density cell"""
+    rng = random.Random(seed)
+    docs = []
+    for n_pages in pages:
+        for density in densities:
+            for i in range(per_cell):
+                docs.append({
+                    'id': f'p{n_pages}-d{density:g}-{i}',
+                    'pages': n_pages,
+                    'density': density,
+                    'resume_text': make_resume(rng, n_pages, density),
+                    'job_text': make_job(rng),
+                })
+    return docs
+
+
+def write_pdf(text, path):
+    """Write text as a plain PDF (Helvetica, LINES_PER_PAGE wrapped lines per page); returns the page count"""
+    lines = [wrapped for line in text.split('\n') for wrapped in (textwrap.wrap(line, LINE_CHARS) or [''])]
+    pages = []
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        y, ops = PAGE_HEIGHT - MARGIN, []
+        for line in lines[start:start + LINES_PER_PAGE]:
+            y -= 14.5
+            ops.append(b'BT /F1 10 Tf %d %.1f Td %s Tj ET' % (MARGIN, y, _pdf_string(line)))
+        pages.append(ops)
+    with open(path, 'wb') as f:
+        f.write(_pdf_document(pages or [[]]))
+    return len(pages)
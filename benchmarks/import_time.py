@@ -0,0 +1,115 @@
+"""Cold-start budget of the web app: import time, create_app() and the first /health.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 1500] [--top 20] [--out startup.json]
+
+A fresh interpreter runs `python -X importtime`, imports the app, calls
+create_app() and answers one /health request. The report lists the slowest
+imports (cumulative and self time, parsed from the -X importtime output) and
+the time to a healthy response. The script exits with status 1 when startup
+exceeds the budget or when an ML stack (torch, sentence_transformers, ...) was
+imported on the way, so it can gate CI. Those stacks belong to the analysis
+workers and must stay behind the lazy loaders.
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Process start to a 200 from /health, in milliseconds
+IMPORT_TIME_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', '1500'))
+# Modules the web process must not import while starting
+HEAVY_MODULES = ('torch', 'sentence_transformers', 'transformers', 'sklearn', 'spacy', 'huggingface_hub', 'onnxruntime')
+
+CHILD = '''
+import sys, json, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+status = app.test_client().get('/health').status_code
+done = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'health_ms': (done - created) * 1000,
+    'health_status': status,
+    'heavy_modules': [m for m in %r if m in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `python -X importtime` output, in import order"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        imports.append((module, int(fields[0]), int(fields[1]), (len(name) - len(module) - 1) // 2))
+    return imports
+
+
+def measure():
+    workdir = tempfile.mkdtemp(prefix='import-time-')
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(ROOT),
+               JOB_QUEUE_DB=os.path.join(workdir, 'jobs.sqlite3'))
+    try:
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD],
+                              cwd=ROOT, env=env, capture_output=True, text=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup failed:\n{proc.stderr[-4000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(proc.stderr)
+    result['startup_ms'] = result['import_ms'] + result['create_app_ms'] + result['health_ms']
+    result['modules'] = len(imports)
+    result['imports'] = [{'module': m, 'self_ms': s / 1000, 'cumulative_ms': c / 1000, 'depth': d}
+                         for m, s, c, d in imports]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_TIME_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=20, help='Slowest imports to list')
+    parser.add_argument('--out', help='Write the full report (every import) as JSON')
+    args = parser.parse_args(argv)
+
+    result = measure()
+    print(f"{'module':<48} {'cumulative ms':>14} {'self ms':>9}")
+    for item in sorted(result['imports'], key=lambda i: -i['cumulative_ms'])[:args.top]:
+        print(f"{'  ' * item['depth'] + item['module']:<48} {item['cumulative_ms']:>14.1f} {item['self_ms']:>9.1f}")
+    print(f"\n{result['modules']} modules; import {result['import_ms']:.0f} ms, create_app {result['create_app_ms']:.0f} ms, "
+          f"first /health {result['health_ms']:.0f} ms ({result['health_status']})")
+    print(f"startup {result['startup_ms']:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(dict(result, budget_ms=args.budget_ms), f, indent=2)
+        print(f"saved {args.out}")
+
+    failures = []
+    if result['heavy_modules']:
+        failures.append(f"heavy modules imported at startup: {', '.join(result['heavy_modules'])}")
+    if result['health_status'] != 200:
+        failures.append(f"/health answered {result['health_status']}")
+    if result['startup_ms'] > args.budget_ms:
+        failures.append(f"startup {result['startup_ms']:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,9 +5,14 @@ import os
 bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
 backlog = 2048
 
-# Worker processes - optimized for Render
-workers = 1  # Reduced for memory constraints
-worker_class = 'sync'
+# Worker processes - a single web worker.
+# LLM feedback jobs and their event streams live in the process that started
+# them, so a second worker would answer /feedback/<id>/stream and cancel with 404.
+# Scale the web tier with GUNICORN_THREADS and analysis with `python -m app.worker --processes`
+workers = 1
+# Threaded workers so streamed LLM feedback (SSE) does not block other requests
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
 worker_connections = 1000
 timeout = 120  # Increased timeout as per Render docs
 keepalive = 5
@@ -15,7 +20,8 @@ keepalive = 5
 # Memory management
 max_requests = 1000
 max_requests_jitter = 50
-preload_app = False  # Disable preloading to reduce memory usage
+# Models are loaded (and preloaded before fork) by the analysis worker pool, not here
+preload_app = False
 
 # Logging
 accesslog = '-'
@@ -37,4 +43,10 @@ keyfile = None
 certfile = None
 
 # Additional settings for Render
-worker_tmp_dir = '/dev/shm'  # Use shared memory for temp files 
\ No newline at end of file
+worker_tmp_dir = '/dev/shm'  # Use shared memory for temp files 
+
+def on_starting(server):
+    if int(os.environ.get('WEB_CONCURRENCY', '1')) > 1:
+        server.log.warning("WEB_CONCURRENCY is ignored: feedback jobs need a single web worker; "
+                           "raise GUNICORN_THREADS instead")
+
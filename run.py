@@ -5,4 +5,9 @@ app = create_app()
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 10000))
+    # The development server runs its own analysis worker (in the reloader child only);
+    # in production start `python -m app.worker`
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from app.worker import start_worker_thread
+        start_worker_thread()
     app.run(host='0.0.0.0', port=port, debug=True) 
\ No newline at end of file
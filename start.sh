@@ -7,8 +7,11 @@ export PYTHONPATH="${PYTHONPATH}:${PWD}"
 # Create uploads directory if it doesn't exist
 mkdir -p uploads
 
-# Download spaCy model if not present
-python -c "import spacy; spacy.load('en_core_web_sm')" 2>/dev/null || python -m spacy download en_core_web_sm
+# Page-parsing processes per analysis worker for long PDFs
+export PDF_WORKERS="${PDF_WORKERS:-2}"
+
+# Start the analysis worker pool in the background
+python -m app.worker --processes "${ANALYSIS_WORKERS:-1}" &
 
 # Start the application
-exec gunicorn run:app --bind 0.0.0.0:$PORT --timeout 120 --workers 1 --keep-alive 5 --max-requests 1000 
\ No newline at end of file
+exec gunicorn run:app -c gunicorn.conf.py 
\ No newline at end of file